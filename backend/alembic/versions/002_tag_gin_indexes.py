@@ -0,0 +1,35 @@
+"""GIN indexes on tag arrays
+
+Revision ID: 002_tag_gin_indexes
+Revises: 001_initial_schema
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002_tag_gin_indexes'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+TAGGED_TABLES = ('tour_packages', 'umrah_packages', 'visa_services')
+
+
+def upgrade() -> None:
+    # Serve `tags && ARRAY[...]` prefilters for similar items and
+    # recommendations. The tables may predate this migration (created by
+    # init_db.py), so only add what is missing.
+    for table in TAGGED_TABLES:
+        op.create_index(
+            f'ix_{table}_tags',
+            table,
+            ['tags'],
+            postgresql_using='gin',
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table in TAGGED_TABLES:
+        op.drop_index(f'ix_{table}_tags', table_name=table, if_exists=True)
@@ -0,0 +1,41 @@
+"""Materialized item recommendations
+
+Revision ID: 003_item_recommendations
+Revises: 002_tag_gin_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003_item_recommendations'
+down_revision = '002_tag_gin_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Top-N neighbours per item and category. Filled on application startup
+    # and kept up to date by the package and visa write handlers. init_db.py
+    # may already have created it.
+    if sa.inspect(op.get_bind()).has_table('item_recommendations'):
+        return
+    op.create_table(
+        'item_recommendations',
+        sa.Column('source_type', sa.Text(), nullable=False),
+        sa.Column('source_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('scoring', sa.Text(), nullable=False),
+        sa.Column('category', sa.Text(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('item_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('source_type', 'source_id', 'scoring', 'category', 'rank')
+    )
+    op.create_index('ix_item_recommendations_item', 'item_recommendations', ['category', 'item_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_recommendations_item', table_name='item_recommendations')
+    op.drop_table('item_recommendations')
@@ -0,0 +1,75 @@
+"""Full-text search vectors
+
+Revision ID: 004_full_text_search
+Revises: 003_item_recommendations
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_full_text_search'
+down_revision = '003_item_recommendations'
+branch_labels = None
+depends_on = None
+
+# {table: {column: weight}}, as in app.models.search_document()
+SEARCH_FIELDS = {
+    'tour_packages': {
+        'name': 'A', 'name_bn': 'A',
+        'destinations': 'B', 'destinations_bn': 'B',
+        'package_details': 'C', 'package_details_bn': 'C'
+    },
+    'umrah_packages': {
+        'name': 'A', 'name_bn': 'A',
+        'description': 'B', 'description_bn': 'B',
+        'hotel_info': 'C', 'hotel_info_bn': 'C',
+        'package_details': 'C', 'package_details_bn': 'C'
+    },
+    'visa_services': {
+        'country_name': 'A', 'country_name_bn': 'A',
+        'visa_details': 'C', 'visa_details_bn': 'C'
+    },
+    'blog_posts': {
+        'title': 'A', 'title_bn': 'A',
+        'excerpt': 'B', 'excerpt_bn': 'B',
+        'content': 'C', 'content_bn': 'C'
+    }
+}
+
+
+def search_document(weighted_fields) -> str:
+    parts = []
+    for column, weight in weighted_fields.items():
+        config = 'simple' if column.endswith('_bn') else 'english'
+        parts.append(f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')")
+    parts.append("setweight(to_tsvector('english', coalesce(tags_to_text(tags), '')), 'B')")
+    return ' || '.join(parts)
+
+
+def upgrade() -> None:
+    # Generation expressions must be immutable; array_to_string() is only stable
+    op.execute(
+        "CREATE OR REPLACE FUNCTION tags_to_text(text[]) RETURNS text "
+        "LANGUAGE sql IMMUTABLE AS $$ SELECT array_to_string($1, ' ') $$"
+    )
+    for table, fields in SEARCH_FIELDS.items():
+        # Adding a stored generated column rewrites the table once
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({search_document(fields)}) STORED"
+        )
+        op.create_index(
+            f'ix_{table}_search',
+            table,
+            ['search_vector'],
+            postgresql_using='gin',
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table in SEARCH_FIELDS:
+        op.drop_index(f'ix_{table}_search', table_name=table, if_exists=True)
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP FUNCTION IF EXISTS tags_to_text(text[])")
@@ -0,0 +1,41 @@
+"""Trigram indexes for fuzzy name lookups
+
+Revision ID: 005_trigram_indexes
+Revises: 004_full_text_search
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_trigram_indexes'
+down_revision = '004_full_text_search'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = (
+    ('tour_packages', 'name'),
+    ('umrah_packages', 'name'),
+    ('visa_services', 'country_name'),
+    ('visa_services', 'country_name_bn'),
+)
+
+
+def upgrade() -> None:
+    # pg_trgm ships with Postgres (contrib) and is a trusted extension, so the
+    # database owner can create it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f'ix_{table}_{column}_trgm',
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table, column in TRIGRAM_COLUMNS:
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table, if_exists=True)
@@ -0,0 +1,45 @@
+"""Composite indexes for keyset (cursor) pagination
+
+Revision ID: 006_keyset_pagination_indexes
+Revises: 005_trigram_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_keyset_pagination_indexes'
+down_revision = '005_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+# (table, sort column) walked by the /page endpoints; `id` breaks ties
+KEYSET_COLUMNS = (
+    ('profiles', 'created_at'),
+    ('homepage_banners', 'order'),
+    ('tour_packages', 'created_at'),
+    ('umrah_packages', 'created_at'),
+    ('flight_deals', 'created_at'),
+    ('blog_posts', 'created_at'),
+    ('contact_submissions', 'created_at'),
+    ('visa_services', 'created_at'),
+    ('hero_scenes', 'order'),
+    ('service_options', 'order'),
+)
+
+
+def upgrade() -> None:
+    # `WHERE (column, id) < (:value, :id) ORDER BY column, id` seeks straight
+    # into these; scanned backwards they serve the DESC pages too
+    for table, column in KEYSET_COLUMNS:
+        op.create_index(
+            f'ix_{table}_{column}_id',
+            table,
+            [column, 'id'],
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table, column in KEYSET_COLUMNS:
+        op.drop_index(f'ix_{table}_{column}_id', table_name=table, if_exists=True)
@@ -0,0 +1,56 @@
+"""Partial and composite indexes for the public list filters
+
+Revision ID: 007_partial_filter_indexes
+Revises: 006_keyset_pagination_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_partial_filter_indexes'
+down_revision = '006_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+CATALOGUE_TABLES = ('tour_packages', 'umrah_packages', 'visa_services', 'flight_deals')
+
+# (index name, table, columns, predicate). Each matches a query shape in
+# the routers: a boolean filter plus the ORDER BY of the endpoint, so
+# Postgres reads the first page straight off the index instead of scanning
+# and sorting the table. Ascending columns also serve the DESC pages,
+# scanned backwards.
+PARTIAL_INDEXES = (
+    # available_only lists and pages, newest first
+    *((f'ix_{table}_available_created_at_id', table, ['created_at', 'id'], 'is_available')
+      for table in CATALOGUE_TABLES),
+    # available_only + featured_only (homepage sections): equality on
+    # is_featured, then the same order
+    *((f'ix_{table}_available_featured', table, ['is_featured', 'created_at', 'id'], 'is_available')
+      for table in CATALOGUE_TABLES),
+    ('ix_blog_posts_published_created_at_id', 'blog_posts', ['created_at', 'id'], 'is_published'),
+    ('ix_contact_submissions_unread_created_at_id', 'contact_submissions', ['created_at', 'id'], 'NOT is_read'),
+    ('ix_homepage_banners_active_order_id', 'homepage_banners', ['order', 'id'], 'is_active'),
+    ('ix_hero_scenes_active_order_id', 'hero_scenes', ['order', 'id'], 'is_active'),
+    ('ix_service_options_active_order_id', 'service_options', ['order', 'id'], 'is_active'),
+    # The single active row behind /hero-content/active and /contact-info/active
+    ('ix_hero_content_active_created_at_id', 'hero_content', ['created_at', 'id'], 'is_active'),
+    ('ix_contact_info_active_created_at_id', 'contact_info', ['created_at', 'id'], 'is_active'),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns, predicate in PARTIAL_INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            postgresql_where=sa.text(predicate),
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in PARTIAL_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,31 @@
+"""Make the display `order` columns NOT NULL
+
+Revision ID: 008_display_order_not_null
+Revises: 007_partial_filter_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_display_order_not_null'
+down_revision = '007_partial_filter_indexes'
+branch_labels = None
+depends_on = None
+
+# Tables paged by (order, id) keysets. A NULL order never compares in the
+# row comparison, so such rows dropped out of every page after the first;
+# they get the create schemas' default instead.
+ORDERED_TABLES = ('homepage_banners', 'hero_scenes', 'service_options')
+
+
+def upgrade() -> None:
+    for table in ORDERED_TABLES:
+        op.execute(f'UPDATE {table} SET "order" = 0 WHERE "order" IS NULL')
+        op.alter_column(table, 'order', existing_type=sa.Integer(), nullable=False, server_default='0')
+
+
+def downgrade() -> None:
+    for table in ORDERED_TABLES:
+        op.alter_column(table, 'order', existing_type=sa.Integer(), nullable=True, server_default=None)
@@ -0,0 +1,218 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app import cache_sync
+from app.conditional import is_not_modified, make_validators, table_versions, validator_headers
+from app.config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+from app.localization import request_language
+from app.metrics import Counter, Gauge
+from app.serialization import compile_serializer
+
+# In-process response cache for public catalogue reads.
+#
+# Entries hold the fully serialized JSON body, keyed by route path and query
+# string, and remember which tables they were built from. Write handlers call
+# `invalidate(table)` after committing, which drops every entry that read that
+# table in this worker and, through `cache_sync`, in every other worker. The
+# TTL is only a safety net; LRU eviction bounds memory. Each entry also keeps
+# its ETag and Last-Modified validators (see `app.conditional`).
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by result",
+    label="result"
+)
+CACHE_EVICTIONS = Counter(
+    "response_cache_evictions_total",
+    "Response cache entries dropped by reason",
+    label="reason"
+)
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    tables: Tuple[str, ...]
+    expires_at: float
+    etag: str
+    last_modified: Optional[datetime]
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL and table-based invalidation"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_REQUESTS.inc("miss")
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                CACHE_EVICTIONS.inc("expired")
+                CACHE_REQUESTS.inc("miss")
+                return None
+            self._entries.move_to_end(key)
+            CACHE_REQUESTS.inc("hit")
+            return entry
+
+    def generations(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Snapshot the invalidation counters of some tables"""
+        with self._lock:
+            return (self._epoch, *(self._generations.get(table, 0) for table in tables))
+
+    def set(
+        self,
+        key: str,
+        tables: Tuple[str, ...],
+        body: bytes,
+        generations: Tuple[int, ...],
+        etag: str,
+        last_modified: Optional[datetime]
+    ) -> None:
+        """Store an entry unless one of its tables was invalidated meanwhile"""
+        with self._lock:
+            current = (self._epoch, *(self._generations.get(table, 0) for table in tables))
+            if current != generations:
+                return
+            expires_at = time.monotonic() + self.ttl_seconds
+            self._entries[key] = CacheEntry(body, tables, expires_at, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.inc("lru")
+
+    def invalidate(self, *tables: str) -> None:
+        """Drop every entry built from any of the given tables"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, entry in self._entries.items() if set(entry.tables) & set(tables)]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                CACHE_EVICTIONS.inc("invalidated", len(stale))
+
+    def clear(self) -> None:
+        """Drop every entry, including ones being built right now"""
+        with self._lock:
+            self._epoch += 1
+            if self._entries:
+                CACHE_EVICTIONS.inc("invalidated", len(self._entries))
+            self._entries.clear()
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL)
+
+Gauge(
+    "response_cache_entries",
+    "Entries currently held in the response cache",
+    lambda: {"": len(response_cache)}
+)
+
+def invalidate(*tables: str) -> None:
+    """Invalidate cached responses built from the given tables in every worker"""
+    response_cache.invalidate(*tables)
+    cache_sync.publish(tables)
+
+def _invalidate_from_remote(tables: Optional[Tuple[str, ...]]) -> None:
+    if tables is None:
+        response_cache.clear()
+    else:
+        response_cache.invalidate(*tables)
+
+cache_sync.on_remote_invalidation(_invalidate_from_remote)
+
+def cache_key(request: Request) -> str:
+    """Key a request by route path and sorted query parameters
+
+    `lang=auto` is keyed by the language it resolves to.
+    """
+    params = request.query_params.multi_items()
+    if request.query_params.get("lang") == "auto":
+        params = [(key, value) for key, value in params if key != "lang"]
+        params.append(("lang", request_language(request)))
+    query = "&".join(f"{key}={value}" for key, value in sorted(params))
+    return f"{request.url.path}?{query}"
+
+def cached(*tables: str, response_model: Any = None, exclude_unset: bool = False):
+    """Cache an async GET endpoint's serialized response
+
+    `tables` lists every table the endpoint reads; `response_model` must match
+    the route's response_model so cached bodies serialize identically. With
+    `exclude_unset`, keys missing from the endpoint's rows are left out (for
+    `fields=` projections). The wrapper adds a `request` parameter to the
+    endpoint signature if the endpoint does not declare one itself.
+
+    Endpoints taking `lang` (see `app.localization`) return neutral-keyed
+    rows when it is set; those are serialized without the `_bn` twins and
+    cached per language.
+
+    Responses carry ETag and Last-Modified. Conditional requests that still
+    match are answered with 304, on a cache miss before the endpoint runs;
+    `If-None-Match: *` only once the endpoint has returned (not raised 404).
+    """
+    serialize = compile_serializer(response_model, exclude_unset)
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        wants_request = "request" in signature.parameters
+        localizable = "lang" in signature.parameters
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"] if wants_request else kwargs.pop("request")
+            key = cache_key(request)
+            single_language = localizable and request_language(request) is not None
+            # `lang=auto` responses depend on Accept-Language
+            vary = {"Vary": "Accept-Language"} if localizable and request.query_params.get("lang") == "auto" else {}
+
+            entry = response_cache.get(key)
+            if entry is not None:
+                headers = {**validator_headers(entry.etag, entry.last_modified), **vary}
+                if is_not_modified(request, entry.etag, entry.last_modified):
+                    return Response(status_code=304, headers=headers)
+                return Response(content=entry.body, media_type="application/json", headers=headers)
+
+            generations = response_cache.generations(tables)
+            etag, last_modified = make_validators(key, await table_versions(tables))
+            headers = {**validator_headers(etag, last_modified), **vary}
+            # The resource may not exist (the endpoint raises 404), so `*` waits
+            if is_not_modified(request, etag, last_modified, exists=False):
+                return Response(status_code=304, headers=headers)
+
+            result = await endpoint(*args, **kwargs)
+            body = serialize(result, single_language)
+            response_cache.set(key, tables, body, generations, etag, last_modified)
+            if is_not_modified(request, etag, last_modified):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        if not wants_request:
+            request_parameter = inspect.Parameter(
+                "request",
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=Request
+            )
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), request_parameter]
+            )
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import text
+
+from app.config import CACHE_SYNC, DATABASE_URL, engine
+from app.metrics import Counter
+
+# Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+#
+# Every uvicorn worker keeps its own in-process caches. After a write commits,
+# the worker that handled it publishes the touched tables on CHANNEL; every
+# other worker holds a dedicated asyncpg connection LISTENing on the channel
+# and drops its stale entries as soon as the notification arrives. No extra
+# service is needed and notifications are only delivered for committed
+# transactions.
+
+CHANNEL = "cache_invalidation"
+
+# Identifies this process so it can ignore its own notifications
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+SYNC_MESSAGES = Counter(
+    "cache_sync_messages_total",
+    "Cross-worker invalidation messages by direction",
+    label="direction"
+)
+
+RemoteInvalidation = Callable[[Optional[Tuple[str, ...]]], None]
+
+_subscribers: List[RemoteInvalidation] = []
+
+def on_remote_invalidation(callback: RemoteInvalidation) -> None:
+    """Register a callback for invalidations published by other workers
+
+    The callback receives the invalidated tables, or None when notifications
+    may have been missed (listener reconnect) and everything must be dropped.
+    """
+    _subscribers.append(callback)
+
+def _dispatch(tables: Optional[Tuple[str, ...]]) -> None:
+    for callback in _subscribers:
+        try:
+            callback(tables)
+        except Exception as e:
+            print(f"Warning: Cache invalidation callback failed: {e}")
+
+def publish(tables: Iterable[str]) -> None:
+    """Tell the other workers that these tables changed
+
+    Uses the sync engine, so call it from sync write handlers (which FastAPI
+    runs in the threadpool), after the write has committed.
+    """
+    tables = sorted(set(tables))
+    if not CACHE_SYNC or not tables:
+        return
+    payload = json.dumps({"origin": ORIGIN, "tables": tables})
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": CHANNEL, "payload": payload}
+            )
+        SYNC_MESSAGES.inc("sent")
+    except Exception as e:
+        # Other workers fall back to the cache TTL
+        print(f"Warning: Could not publish cache invalidation: {e}")
+
+def _asyncpg_dsn(url: str) -> str:
+    """Strip a SQLAlchemy driver suffix (postgresql+psycopg2://) for asyncpg"""
+    scheme, _, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}://{rest}"
+
+class InvalidationListener:
+    """Background task holding a LISTEN connection, reconnecting on failure"""
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+        self._connection: Optional[asyncpg.Connection] = None
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == ORIGIN:
+            return
+        SYNC_MESSAGES.inc("received")
+        _dispatch(tuple(message.get("tables", ())))
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                self._connection.add_termination_listener(lambda connection: closed.set())
+                await self._connection.add_listener(self.channel, self._on_notification)
+                # Anything cached while we were not listening may be stale
+                _dispatch(None)
+                delay = 1
+                await closed.wait()
+                print("Warning: Cache invalidation listener disconnected, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: Cache invalidation listener failed: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+listener = InvalidationListener(_asyncpg_dsn(DATABASE_URL), CHANNEL)
+
+async def start() -> None:
+    if CACHE_SYNC:
+        await listener.start()
+
+async def stop() -> None:
+    await listener.stop()
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import func, literal, select, union_all
+
+from app import repository
+from app.config import Base
+
+# HTTP validators (ETag / Last-Modified) for public reads.
+#
+# Validators are derived from the state of the tables a response reads: the
+# newest `updated_at` and the row count of each table. Inserts and updates move
+# `updated_at`, deletes change the count, so the pair changes whenever the
+# response could. Checking them costs one small aggregate query and lets a
+# conditional request be answered with 304 before the endpoint runs.
+
+TableVersion = Tuple[Optional[datetime], int]
+
+async def table_versions(tables: Iterable[str]) -> Dict[str, TableVersion]:
+    """Fetch (max updated_at, row count) for each table in one round trip"""
+    queries = []
+    for name in tables:
+        table = Base.metadata.tables[name]
+        queries.append(
+            select(
+                literal(name).label("table_name"),
+                func.max(table.c.updated_at).label("updated_at"),
+                func.count().label("row_count")
+            ).select_from(table)
+        )
+    if not queries:
+        return {}
+    query = queries[0] if len(queries) == 1 else union_all(*queries)
+    rows = await repository.fetch_all(query)
+    return {row["table_name"]: (row["updated_at"], row["row_count"]) for row in rows}
+
+def make_validators(key: str, versions: Dict[str, TableVersion]) -> Tuple[str, Optional[datetime]]:
+    """Build a strong ETag and a Last-Modified time from table versions"""
+    digest = hashlib.sha1(key.encode())
+    for name in sorted(versions):
+        updated_at, row_count = versions[name]
+        stamp = updated_at.isoformat() if updated_at else ""
+        digest.update(f"|{name}:{stamp}:{row_count}".encode())
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    stamps = [updated_at for updated_at, _ in versions.values() if updated_at]
+    last_modified = max(stamps).astimezone(timezone.utc).replace(microsecond=0) if stamps else None
+    return etag, last_modified
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    # no-cache: caches may store the response but must revalidate it first
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime],
+    exists: bool = True
+) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since (RFC 9110 section 13.2.2)
+
+    `If-None-Match: *` matches any current representation, so it only counts
+    when `exists`; pass False when checking before it is known whether the
+    resource exists, and evaluate again once it does.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison and takes precedence
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return any((tag == "*" and exists) or tag.removeprefix("W/") == etag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
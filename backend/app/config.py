@@ -1,11 +1,13 @@
 import json
 import os
-from decouple import config
+from decouple import Csv, config
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from databases import Database
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from app.db_guard import install_blocking_call_guard
+from app.db_pool import InstrumentedQueuePool, compute_pool_settings, register_pool_metrics
 
 # Load project configuration
 def load_project_config():
@@ -38,6 +40,56 @@ SECRET_KEY = config("SECRET_KEY", default="your-super-secret-key-here")
 ALGORITHM = config("ALGORITHM", default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=30, cast=int)
 
+# Flag sync DB calls made on the event loop thread: off, warn or raise
+BLOCKING_DB_GUARD = config("BLOCKING_DB_GUARD", default="off")
+
+# Connection pools. Defaults are derived from the worker count and the
+# Postgres max_connections so that all workers together stay under the limit;
+# each value can still be overridden individually.
+UVICORN_WORKERS = config("UVICORN_WORKERS", default=1, cast=int)
+DB_MAX_CONNECTIONS = config("DB_MAX_CONNECTIONS", default=100, cast=int)
+DB_RESERVED_CONNECTIONS = config("DB_RESERVED_CONNECTIONS", default=10, cast=int)
+_pool_defaults = compute_pool_settings(UVICORN_WORKERS, DB_MAX_CONNECTIONS, DB_RESERVED_CONNECTIONS)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=_pool_defaults["pool_size"], cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=_pool_defaults["max_overflow"], cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=10, cast=int)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_ASYNC_POOL_MIN_SIZE = config("DB_ASYNC_POOL_MIN_SIZE", default=_pool_defaults["async_min_size"], cast=int)
+DB_ASYNC_POOL_MAX_SIZE = config("DB_ASYNC_POOL_MAX_SIZE", default=_pool_defaults["async_max_size"], cast=int)
+
+# In-process response cache for public reads
+RESPONSE_CACHE_MAX_ENTRIES = config("RESPONSE_CACHE_MAX_ENTRIES", default=2048, cast=int)
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=300, cast=int)
+# Broadcast cache invalidations to the other workers via LISTEN/NOTIFY
+CACHE_SYNC = config("CACHE_SYNC", default=True, cast=bool)
+
+# Recommendation scoring: "index" (in-memory tag index) or "sql" (GIN + array overlap)
+RECOMMENDATION_ENGINE = config("RECOMMENDATION_ENGINE", default="index")
+# Neighbours stored per item and category in item_recommendations
+RECOMMENDATION_TOP_N = config("RECOMMENDATION_TOP_N", default=8, cast=int)
+
+# Largest `limit` any list endpoint accepts
+MAX_PAGE_SIZE = config("MAX_PAGE_SIZE", default=100, cast=int)
+
+# Image transcoding processes per app worker; by default the cores are
+# shared out between the uvicorn workers
+IMAGE_WORKERS = config("IMAGE_WORKERS", default=max(1, (os.cpu_count() or 1) // UVICORN_WORKERS), cast=int)
+# Transcoding jobs running or queued per app worker before uploads get 503
+IMAGE_QUEUE_LIMIT = config("IMAGE_QUEUE_LIMIT", default=32, cast=int)
+# Widths of the narrower WebP copies made of every upload for srcset
+IMAGE_VARIANT_WIDTHS = config("IMAGE_VARIANT_WIDTHS", default="320,640,1280,2560", cast=Csv(int))
+# Also store AVIF renditions (needs pillow-avif-plugin)
+IMAGE_AVIF = config("IMAGE_AVIF", default=False, cast=bool)
+# On-demand derivatives (/static/img/...): cache directory, its size bound,
+# and the nginx internal location mapped to it, to serve hits with sendfile
+IMAGE_CACHE_DIR = config(
+    "IMAGE_CACHE_DIR",
+    default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "images")
+)
+IMAGE_CACHE_MAX_MB = config("IMAGE_CACHE_MAX_MB", default=1024, cast=int)
+IMAGE_CACHE_ACCEL_PREFIX = config("IMAGE_CACHE_ACCEL_PREFIX", default="")
+
 # Email configuration with project-specific defaults
 MAIL_USERNAME = config("MAIL_USERNAME", default=PROJECT_CONFIG['admin_email'])
 MAIL_PASSWORD = config("MAIL_PASSWORD", default="")
@@ -49,8 +101,33 @@ USE_CREDENTIALS = config("USE_CREDENTIALS", default=True, cast=bool)
 VALIDATE_CERTS = config("VALIDATE_CERTS", default=True, cast=bool)
 
 # Database setup
-database = Database(DATABASE_URL)
-engine = create_engine(DATABASE_URL)
+async def init_async_connection(connection):
+    """Decode json/jsonb columns on the asyncpg pool the same way psycopg2 does"""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+database = Database(
+    DATABASE_URL,
+    init=init_async_connection,
+    min_size=DB_ASYNC_POOL_MIN_SIZE,
+    max_size=DB_ASYNC_POOL_MAX_SIZE
+)
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+install_blocking_call_guard(engine, BLOCKING_DB_GUARD)
+register_pool_metrics(engine, database)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
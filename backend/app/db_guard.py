@@ -0,0 +1,43 @@
+import asyncio
+import traceback
+from sqlalchemy import event
+
+# Detector for blocking database calls made on the event loop thread.
+#
+# A sync `db.query(...)` inside an `async def` endpoint runs on the loop
+# thread and stalls every other request in the worker until Postgres answers.
+# Sync endpoints are fine: FastAPI runs them in the threadpool, where there
+# is no running loop. Enable with BLOCKING_DB_GUARD=warn (log with a stack
+# trace) or BLOCKING_DB_GUARD=raise (fail the request, useful in tests).
+
+GUARD_MODES = ("off", "warn", "raise")
+
+class BlockingDatabaseCallError(RuntimeError):
+    """Raised when a sync database call runs on the event loop thread"""
+
+def on_event_loop_thread() -> bool:
+    """Return True when called from the thread running an asyncio loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def install_blocking_call_guard(engine, mode: str = "warn") -> None:
+    """Flag any statement the sync engine executes on the event loop thread"""
+    if mode not in GUARD_MODES:
+        raise ValueError(f"BLOCKING_DB_GUARD must be one of {', '.join(GUARD_MODES)}")
+    if mode == "off":
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def check_blocking_call(conn, cursor, statement, parameters, context, executemany):
+        if not on_event_loop_thread():
+            return
+
+        message = f"Blocking database call on the event loop thread: {statement.strip()[:200]}"
+        if mode == "raise":
+            raise BlockingDatabaseCallError(message)
+
+        stack = "".join(traceback.format_stack(limit=15)[:-1])
+        print(f"Warning: {message}\n{stack}")
@@ -0,0 +1,79 @@
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+from app.metrics import Counter, Gauge, Histogram
+
+# Connection pool sizing and instrumentation.
+#
+# Every uvicorn worker owns a sync SQLAlchemy pool (admin writes, auth) and
+# an asyncpg pool (public reads through app.repository). Both are carved out
+# of the Postgres connection limit, divided evenly across workers.
+
+POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Sync pool checkout time, including waits for a free slot and new connections",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Sync pool checkouts that gave up after pool_timeout"
+)
+
+def compute_pool_settings(workers: int, max_connections: int, reserved_connections: int) -> Dict[str, int]:
+    """Split the Postgres connection budget between workers and their two pools
+
+    Half of each worker's share goes to the sync engine (pool_size steady
+    connections plus an equal overflow for bursts) and half to the asyncpg
+    pool that serves public reads.
+    """
+    per_worker = max(4, (max_connections - reserved_connections) // max(1, workers))
+    sync_total = per_worker // 2
+    pool_size = max(1, sync_total // 2)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max(0, sync_total - pool_size),
+        "async_min_size": min(2, per_worker - sync_total),
+        "async_max_size": max(1, per_worker - sync_total),
+    }
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+def register_pool_metrics(engine, database) -> None:
+    """Expose live sync and async pool occupancy as /metrics gauges"""
+
+    def sync_pool_state() -> Dict[str, float]:
+        pool = engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        }
+
+    def async_pool_state() -> Dict[str, float]:
+        pool = getattr(database._backend, "_pool", None)
+        if pool is None:
+            return {}
+        size = pool.get_size()
+        idle = pool.get_idle_size()
+        return {
+            "size": size,
+            "checked_out": size - idle,
+            "idle": idle,
+            "max_size": pool.get_max_size(),
+        }
+
+    Gauge("db_pool_connections", "Sync SQLAlchemy pool connections by state", sync_pool_state, label="state")
+    Gauge("db_async_pool_connections", "asyncpg pool connections by state", async_pool_state, label="state")
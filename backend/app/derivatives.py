@@ -0,0 +1,144 @@
+import asyncio
+import functools
+import hashlib
+import os
+import time
+from pathlib import Path
+from stat import S_ISREG
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB
+from app.image_pool import image_pool
+from app.imaging import render_derivative, source_width
+from app.metrics import Counter
+
+# Disk cache of on-demand image derivatives (`/static/img/...`).
+#
+# A derivative is rendered in the image process pool on first request and
+# written to `<cache>/<key[:2]>/<key>.<format>`. The key is a digest of the
+# source file's name, size and modification time plus the requested width,
+# quality and format, so it changes whenever the source does and no lookup
+# table is needed: every uvicorn worker finds the others' files. (Hashing
+# the source's bytes would mean reading it on every hit; upload names are
+# unique and never rewritten, so its identity is as good.)
+#
+# Widths at or above the source's own collapse to one full-size key, since
+# images are never enlarged; the routes also round `w` and `q` to a few
+# allowed values, so each upload has a small, fixed set of derivatives.
+#
+# The directory is bounded to IMAGE_CACHE_MAX_MB with least-recently-used
+# eviction. A file's mtime is its last use: hits bump it (at most once every
+# TOUCH_INTERVAL), and after every render the directory is scanned and, if
+# over the bound, the stalest files are deleted down to LOW_WATER of it.
+# The scan sees every worker's files, so the bound holds for the directory
+# as a whole; it costs far less than the render before it.
+
+TOUCH_INTERVAL = 3600
+LOW_WATER = 0.9
+
+DERIVATIVES = Counter(
+    "image_derivatives_total",
+    "On-demand image derivatives by cache outcome",
+    label="result"
+)
+
+class DerivativeCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._rendering: Dict[str, asyncio.Task] = {}
+
+    def key(self, source: Path, width: Optional[int], quality: int, image_format: str) -> str:
+        """Cache key (and ETag) of a derivative; widths the source cannot fill are stored as full size
+
+        Stats `source` and may read its header, so run it in a thread.
+        Raises FileNotFoundError if `source` is not a file.
+        """
+        stat = source.stat()
+        if not S_ISREG(stat.st_mode):
+            raise FileNotFoundError(source)
+        if width is not None:
+            full_width = fitted_width(str(source), stat.st_size, stat.st_mtime_ns)
+            if full_width is not None and width >= full_width:
+                width = None
+        identity = f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}:{width}:{quality}:{image_format}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def path(self, key: str, image_format: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{image_format}"
+
+    async def get(self, source: Path, key: str, width: Optional[int], quality: int, image_format: str) -> Path:
+        """Path of the derivative of `source` under `key` (from key()), rendered if not cached
+
+        Concurrent requests for the same missing derivative share one render.
+        Raises InvalidImage / ConversionError from rendering, and 503 when the
+        image pool is full.
+        """
+        path = self.path(key, image_format)
+        if await run_in_threadpool(self._touch, path):
+            DERIVATIVES.inc("hit")
+            return path
+        if key not in self._rendering:
+            task = asyncio.ensure_future(self._render(source, path, width, quality, image_format))
+            self._rendering[key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(key, None))
+        await asyncio.shield(self._rendering[key])
+        return path
+
+    def _touch(self, path: Path) -> bool:
+        """Whether a derivative is cached, marking it used if its mtime is stale"""
+        try:
+            last_used = path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if time.time() - last_used > TOUCH_INTERVAL:
+            os.utime(path)
+        return True
+
+    async def _render(self, source: Path, path: Path, width: Optional[int], quality: int, image_format: str) -> None:
+        with image_pool.reserve():
+            await image_pool.run(render_derivative, str(source), str(path), width, quality, image_format)
+        DERIVATIVES.inc("miss")
+        await run_in_threadpool(self.evict, path)
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete the least recently used derivatives if over the bound; returns the size left
+
+        `keep` (the derivative just rendered, about to be served) is spared.
+        """
+        if not self.directory.is_dir():
+            return 0
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return total
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * LOW_WATER:
+                break
+            if keep is not None and path == str(keep):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            DERIVATIVES.inc("evicted")
+        return total
+
+@functools.lru_cache(maxsize=4096)
+def fitted_width(source: str, size: int, mtime_ns: int) -> Optional[int]:
+    """source_width() of an upload, remembered per version of the file"""
+    return source_width(source)
+
+derivative_cache = DerivativeCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
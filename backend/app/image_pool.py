@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.config import IMAGE_QUEUE_LIMIT, IMAGE_WORKERS
+from app.metrics import Counter, Gauge
+
+# Process pool for image transcoding.
+#
+# Decoding, resizing and encoding an upload takes hundreds of milliseconds
+# to seconds of CPU and holds the GIL, so on the event loop it would stall
+# every other request in the worker. Jobs run in IMAGE_WORKERS processes
+# instead, several at once across cores.
+#
+# At most IMAGE_QUEUE_LIMIT jobs are running or queued per app worker. An
+# upload that would go over is turned away with 503 and Retry-After rather
+# than queued behind minutes of work. A multi-file upload claims a slot per
+# file up front, so it is accepted or rejected as a whole.
+#
+# Workers are spawned, not forked, so they share no database connections or
+# event loop with the app, and are started on the first upload.
+
+RETRY_AFTER_SECONDS = 5
+
+IMAGE_JOBS = Counter(
+    "image_pool_jobs_total",
+    "Image transcoding jobs by outcome",
+    label="result"
+)
+
+class ImagePool:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @contextlib.contextmanager
+    def reserve(self, jobs: int = 1):
+        """Claim queue slots for `jobs` jobs, or raise 503 if there are not enough
+
+        Call from the event loop; slots are freed when the block exits.
+        """
+        if self.pending + jobs > self.queue_limit:
+            IMAGE_JOBS.inc("rejected", jobs)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image processing is busy, please retry shortly",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+        self.pending += jobs
+        try:
+            yield
+        finally:
+            self.pending -= jobs
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run `function(*args)` in a worker process; inside reserve()"""
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool(), function, *args)
+        except BrokenProcessPool:
+            # A worker died (out of memory, killed); start a fresh pool next time
+            self._executor = None
+            IMAGE_JOBS.inc("failed")
+            raise
+        except Exception:
+            IMAGE_JOBS.inc("failed")
+            raise
+        IMAGE_JOBS.inc("done")
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+image_pool = ImagePool(IMAGE_WORKERS, IMAGE_QUEUE_LIMIT)
+
+Gauge(
+    "image_pool_pending_jobs",
+    "Image transcoding jobs running or queued",
+    lambda: {"": image_pool.pending}
+)
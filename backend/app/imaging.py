@@ -0,0 +1,234 @@
+import io
+import logging
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401  (registers an AVIF encoder with Pillow)
+except ImportError:
+    pass
+
+# Image transcoding for uploads.
+#
+# Everything here is CPU-bound and runs in the worker processes of
+# `app.image_pool`, so this module only imports Pillow: spawned workers
+# import it without loading the app, its config or database engines.
+# Errors are raised as plain exceptions, which pickle back to the caller.
+#
+# An upload is staged to disk by the route and decoded once, straight from
+# that file (downscaled during decode where the format allows). It is encoded
+# once per rendition: the full-size WebP, narrower WebP variants for srcset,
+# and optionally the same in AVIF. Each variant is resized from the next
+# wider one, and each is written to the uploads directory here rather than
+# sent back to the app. Uploads stored before the variants existed get
+# derivatives rendered on demand (render_derivative, see `app.derivatives`).
+
+logger = logging.getLogger(__name__)
+
+MAX_DIMENSION = 4096  # Maximum width/height for images
+
+# WebP conversion settings
+WEBP_QUALITY = 85  # Quality for WebP conversion (0-100)
+WEBP_LOSSLESS = False  # Use lossless compression for better quality
+WEBP_METHOD = 6  # Compression method (0-6, higher = better compression but slower)
+
+# AVIF renditions need an AVIF encoder (pillow-avif-plugin for Pillow 10)
+Image.init()
+AVIF_SUPPORTED = "AVIF" in Image.SAVE
+AVIF_QUALITY = 60  # Quality for AVIF conversion (0-100)
+AVIF_SPEED = 6  # Encoder speed (0-10, higher = faster but larger)
+
+# Resizes shrink by whole factors with reduce() down to this many times the
+# target size, then resample with LANCZOS; at 3 Pillow documents the result
+# as indistinguishable from a plain LANCZOS resize in most cases
+REDUCING_GAP = 3.0
+
+class InvalidImage(ValueError):
+    """The upload is not an image Pillow can read"""
+
+class ConversionError(Exception):
+    """A readable image could not be converted"""
+
+class Rendition(NamedTuple):
+    """One encoded size and format of an upload"""
+    width: int
+    height: int
+    format: str  # "webp" or "avif"
+    size: int  # bytes
+    full_size: bool
+
+    def filename(self, stem: str) -> str:
+        """`<stem>.<format>` at full size, `<stem>-<width>w.<format>` for variants"""
+        if self.full_size:
+            return f"{stem}.{self.format}"
+        return f"{stem}-{self.width}w.{self.format}"
+
+def fitted_size(size: Tuple[int, int], max_dimension: int) -> Tuple[int, int]:
+    """`size` scaled down to fit within max_dimension, keeping the aspect ratio"""
+    if max(size) <= max_dimension:
+        return size
+    ratio = max_dimension / max(size)
+    return tuple(int(dim * ratio) for dim in size)
+
+def decode(
+    source: str,
+    max_dimension: int,
+    original_filename: str,
+    width: Optional[int] = None
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """(Decoded image, size to scale it to) for an image file; InvalidImage if unreadable
+
+    The target size fits within max_dimension and, given `width`, is no wider.
+    Pillow reads the file as it decodes, so the encoded bytes are never held
+    in memory as a whole.
+
+    Large JPEGs are decoded at 1/2, 1/4 or 1/8 scale when that still covers the
+    target size, so most of the downscaling costs nothing. Decoding everything
+    also rejects truncated and corrupt files, which verify() was used for.
+    """
+    try:
+        image = Image.open(source)
+        size = fitted_size(image.size, max_dimension)
+        if width and width < size[0]:
+            size = (width, max(1, round(size[1] * width / size[0])))
+        image.draft("RGB", size)
+        image.load()
+    except Exception:
+        raise InvalidImage(original_filename)
+    return image, size
+
+def flatten(image: Image.Image) -> Image.Image:
+    """`image` as RGB, transparency composited onto white"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        # Create white background for transparent images
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+def prepare(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """A decoded image flattened, stripped of metadata and scaled to `size`"""
+    image = flatten(image)
+    # Encoders that copy metadata from the image (the AVIF plugin does) find none
+    image.info = {}
+    if image.size != size:
+        # reduce() by whole factors first, then LANCZOS over the remainder
+        logger.debug("Resizing image from %s to %s", image.size, size)
+        image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+    return image
+
+def encode_webp(image: Image.Image, quality: int = WEBP_QUALITY) -> bytes:
+    """`image` as WebP; no EXIF, ICC or XMP is written unless passed in"""
+    webp_buffer = io.BytesIO()
+    image.save(webp_buffer, format='WEBP', quality=quality, lossless=WEBP_LOSSLESS, method=WEBP_METHOD)
+    return webp_buffer.getvalue()
+
+def encode_avif(image: Image.Image, quality: int = AVIF_QUALITY) -> bytes:
+    """`image` as AVIF"""
+    avif_buffer = io.BytesIO()
+    image.save(avif_buffer, format='AVIF', quality=quality, speed=AVIF_SPEED)
+    return avif_buffer.getvalue()
+
+ENCODERS = {"webp": encode_webp, "avif": encode_avif}
+
+def variant_sizes(size: Tuple[int, int], widths: Iterable[int]) -> List[Tuple[int, int]]:
+    """Sizes of the `widths` narrower than `size`, widest first"""
+    width, height = size
+    return [
+        (variant, max(1, round(height * variant / width)))
+        for variant in sorted(set(widths), reverse=True) if variant < width
+    ]
+
+def transcode_upload(
+    source: str,
+    original_filename: str,
+    target: str,
+    widths: Iterable[int] = (),
+    avif: bool = False
+) -> List[Rendition]:
+    """Check an uploaded file is an image and write its renditions
+
+    Files are named by Rendition.filename() after `target`, a path without
+    an extension. The full-size WebP comes first, followed by a WebP variant
+    for each of `widths` narrower than it, plus AVIF versions of all of them
+    with `avif`. Nothing is left behind if any of them fails.
+    """
+    image, size = decode(source, MAX_DIMENSION, original_filename)
+    formats = [("webp", encode_webp)] + ([("avif", encode_avif)] if avif else [])
+    directory, stem = os.path.split(target)
+    renditions = []
+
+    def write(rendition_size: Tuple[int, int], image_format: str, content: bytes, full_size: bool) -> None:
+        rendition = Rendition(*rendition_size, image_format, len(content), full_size)
+        with open(os.path.join(directory, rendition.filename(stem)), "wb") as f:
+            f.write(content)
+        renditions.append(rendition)
+
+    try:
+        image = prepare(image, size)
+        for image_format, encode in formats:
+            write(size, image_format, encode(image), True)
+        for variant_size in variant_sizes(size, widths):
+            image = image.resize(variant_size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+            for image_format, encode in formats:
+                write(variant_size, image_format, encode(image), False)
+    except Exception as e:
+        print(f"Error converting image to WebP: {e}")
+        remove_renditions(target, renditions)
+        raise ConversionError(str(e))
+
+    # Log conversion details
+    original_size = os.path.getsize(source)
+    webp_size = renditions[0].size
+    compression_ratio = (1 - webp_size / original_size) * 100
+
+    print(f"Image converted to WebP: {original_filename}")
+    print(f"Original size: {original_size / 1024:.1f}KB")
+    print(f"WebP size: {webp_size / 1024:.1f}KB")
+    print(f"Compression: {compression_ratio:.1f}%")
+
+    return renditions
+
+def remove_renditions(target: str, renditions: Iterable[Rendition]) -> None:
+    """Delete the files transcode_upload() wrote for `target`"""
+    directory, stem = os.path.split(target)
+    for rendition in renditions:
+        try:
+            os.remove(os.path.join(directory, rendition.filename(stem)))
+        except FileNotFoundError:
+            pass
+
+def source_width(source: str) -> Optional[int]:
+    """Width `source` is stored at, fitted within MAX_DIMENSION, from its header alone; None if unreadable"""
+    try:
+        with Image.open(source) as image:
+            return fitted_size(image.size, MAX_DIMENSION)[0]
+    except Exception:
+        return None
+
+def render_derivative(source: str, target: str, width: Optional[int], quality: int, image_format: str) -> int:
+    """Write `source` at most `width` wide as `image_format` to `target`; returns its size
+
+    The file is written under a temporary name and renamed into place, so a
+    reader never sees half of it.
+    """
+    image, size = decode(source, MAX_DIMENSION, os.path.basename(source), width)
+    partial = f"{target}.{os.getpid()}.part"
+    try:
+        derivative = ENCODERS[image_format](prepare(image, size), quality)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(partial, "wb") as f:
+            f.write(derivative)
+        os.replace(partial, target)
+    except Exception as e:
+        logger.warning("Error rendering %s: %s", target, e)
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise ConversionError(str(e))
+    return len(derivative)
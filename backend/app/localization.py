@@ -0,0 +1,153 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, get_args, get_origin
+
+from fastapi import Query, Request
+from pydantic import BaseModel, create_model
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import Select
+
+from app import repository
+
+# Single-language responses (`lang=en|bn`).
+#
+# Every text column has a Bengali `<column>_bn` twin, and by default both are
+# returned so the frontend can switch language without refetching. With
+# `lang`, only one language is selected from Postgres and it is returned under
+# the neutral key: `lang=bn` reads `name_bn AS name` (falling back to `name`
+# where no translation was entered), `lang=en` reads `name`, and the `_bn`
+# keys are left out. Pairs named `x_en` / `x_bn` become `x` the same way.
+# `lang=auto` picks the language from Accept-Language.
+#
+# Browsers always send Accept-Language, so it is only consulted on
+# `lang=auto`; without `lang` responses are unchanged. Cached responses are
+# keyed by the resolved language (see `app.cache`).
+
+LANGUAGES = ("en", "bn")
+DEFAULT_LANGUAGE = "en"
+
+def negotiate(accept_language: Optional[str]) -> str:
+    """Best of LANGUAGES for an Accept-Language header"""
+    ranked = []
+    for position, part in enumerate((accept_language or "").split(",")):
+        tag, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        language = tag.strip().lower().split("-")[0]
+        if language in LANGUAGES and quality > 0:
+            ranked.append((-quality, position, language))
+    return min(ranked)[2] if ranked else DEFAULT_LANGUAGE
+
+def request_language(request: Request) -> Optional[str]:
+    """Language a request asks for; None for both"""
+    lang = request.query_params.get("lang")
+    if lang == "auto":
+        return negotiate(request.headers.get("accept-language"))
+    return lang if lang in LANGUAGES else None
+
+def language(
+    request: Request,
+    lang: Optional[str] = Query(None, pattern="^(en|bn|auto)$")
+) -> Optional[str]:
+    """`lang` parameter of localizable endpoints, resolved"""
+    return request_language(request)
+
+def pairs(names: Iterable[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Neutral name -> (English name, Bengali name) of every field in `names`
+
+    `x_bn` pairs with `x` or `x_en` under the neutral name `x`; fields without
+    a Bengali twin pair with nothing.
+    """
+    names = list(names)
+    bengali = {}
+    for name in names:
+        if name.endswith("_bn"):
+            for english in (name[:-3], f"{name[:-3]}_en"):
+                if english in names:
+                    bengali[english] = name
+    paired = set(bengali.values())
+    neutral = {}
+    for name in names:
+        if name in bengali:
+            neutral[bengali[name][:-3]] = (name, bengali[name])
+        elif name not in paired:
+            neutral[name] = (name, None)
+    return neutral
+
+def localize(english, bengali, lang: str, name: Optional[str] = None):
+    """`english` / `bengali` column pair in `lang`, labelled with `name`
+
+    Bengali falls back to English where no translation was entered.
+    """
+    column = func.coalesce(bengali, english) if lang == "bn" else english
+    return column.label(name or english.name)
+
+def localized_column(model, name: str, lang: Optional[str]) -> Tuple[str, Any]:
+    """(Row key, SQL expression) of column `name` in rows selected for `lang`
+
+    For filtering and sorting on what a localized row actually holds.
+    """
+    if lang is not None:
+        for key, (english, bengali) in pairs(model.__table__.c.keys()).items():
+            if bengali is not None and name in (english, bengali):
+                english, bengali = getattr(model, english), getattr(model, bengali)
+                return key, func.coalesce(bengali, english) if lang == "bn" else english
+    return name, getattr(model, name)
+
+def localized_columns(model, lang: str, names: Optional[Iterable[str]] = None) -> List[Any]:
+    """Columns of `model` to select for `lang` (all of them, or `names`)"""
+    columns = {
+        column.name: column for column in model.__table__.c if not isinstance(column.type, TSVECTOR)
+    }
+    neutral = pairs(columns)
+    if names is not None:
+        # `name`, `name_en` and `name_bn` all ask for `name` in the chosen language
+        aliases = {
+            alias: key for key, pair in neutral.items() for alias in (key, *pair) if alias is not None
+        }
+        neutral = {aliases[name]: neutral[aliases[name]] for name in names}
+    return [
+        columns[english] if bengali is None else localize(columns[english], columns[bengali], lang, key)
+        for key, (english, bengali) in neutral.items()
+    ]
+
+def select_localized(model, lang: Optional[str], names: Optional[Iterable[str]] = None) -> Select:
+    """select_rows() in `lang` (None: both languages)"""
+    if lang is None:
+        if names is None:
+            return repository.select_rows(model)
+        return repository.select_rows(model, *(getattr(model, name) for name in names))
+    return repository.select_rows(model, *localized_columns(model, lang, names))
+
+_MONOLINGUAL: Dict[Any, Any] = {}
+
+def monolingual(annotation: Any) -> Any:
+    """`annotation` with every model in it keyed like localized_columns()
+
+    Serializes the neutral-keyed rows of `lang=` responses; nested models,
+    lists, Optional and generic pages are rebuilt recursively.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if annotation not in _MONOLINGUAL:
+            fields = annotation.model_fields
+            _MONOLINGUAL[annotation] = create_model(
+                f"{annotation.__name__}Monolingual",
+                __config__=annotation.model_config,
+                **{
+                    key: (monolingual(fields[english].annotation), fields[english])
+                    for key, (english, _) in pairs(fields).items()
+                }
+            )
+        return _MONOLINGUAL[annotation]
+    origin = get_origin(annotation)
+    if origin is None:
+        return annotation
+    args = tuple(monolingual(arg) for arg in get_args(annotation))
+    if origin is Union or type(annotation).__name__ == "UnionType":
+        return Union[args]
+    return origin[args]
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 try:
     # Starlette >= 0.13
@@ -7,9 +7,18 @@ except Exception:  # pragma: no cover - fallback for older stacks
     # Uvicorn provides a compatible middleware
     from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware  # type: ignore
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from decouple import config
 from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+from app import cache_sync, recommendation_store
+from app.auth import require_super_admin
 from app.config import database
+from app.image_pool import image_pool
+from app.metrics import render_metrics
+from app.models import Profile
+from app.serialization import FastJSONResponse
+from app.suggest_index import suggest_index
 from app.routes import (
     auth,
     users,
@@ -23,7 +32,10 @@ from app.routes import (
     visa_services,
     recommendations,
     site_management,
-    uploads
+    uploads,
+    images,
+    bootstrap,
+    search
 )
 
 # Create FastAPI app
@@ -32,7 +44,8 @@ app = FastAPI(
     description="A lightweight CMS backend for website control",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS configuration - environment based
@@ -64,17 +77,29 @@ except Exception as e:
     print(f"Warning: Could not set directory permissions: {e}")
 
 # Mount static files - this makes uploads accessible at /static/uploads/{filename}
+# (resized copies are served by the images router at /static/img/{filename})
 app.mount("/static/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
 # Database connection events
 @app.on_event("startup")
 async def startup():
     await database.connect()
+    await cache_sync.start()
+    try:
+        await run_in_threadpool(recommendation_store.rebuild)
+    except Exception as e:
+        print(f"Warning: Could not rebuild materialized recommendations: {e}")
+    try:
+        await suggest_index.load()
+    except Exception as e:
+        print(f"Warning: Could not load search suggestions: {e}")
     print(f"Backend started. Uploads directory: {UPLOAD_DIR}")
 
 @app.on_event("shutdown")
 async def shutdown():
+    await cache_sync.stop()
     await database.disconnect()
+    image_pool.shutdown()
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
@@ -90,6 +115,9 @@ app.include_router(visa_services.router, prefix="/api/v1")
 app.include_router(recommendations.router, prefix="/api/v1")
 app.include_router(site_management.router, prefix="/api/v1/site-management", tags=["Site Management"])
 app.include_router(uploads.router, prefix="/api/v1")
+app.include_router(images.router)
+app.include_router(bootstrap.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
 
 # Root endpoint
 @app.get("/")
@@ -107,6 +135,12 @@ def read_root():
 def health_check():
     return {"status": "healthy", "message": "Aro CMS Backend is running"}
 
+# Prometheus-style metrics for this worker (pool occupancy, wait times);
+# super admins only, since it shows pool sizes and traffic
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(current_user: Profile = Depends(require_super_admin)):
+    return render_metrics()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -0,0 +1,117 @@
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus-style metrics served from /metrics.
+#
+# Values are per process: with several uvicorn workers each scrape reports
+# only the worker that answered it.
+
+_registry: List["Metric"] = []
+_registry_lock = threading.Lock()
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonic counter, optionally split by one label"""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, label: Optional[str] = None):
+        super().__init__(name, description)
+        self.label = label
+        self._values: Dict[str, float] = {} if label else {"": 0}
+
+    def inc(self, label_value: str = "", amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: str = "") -> float:
+        return self._values.get(label_value, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            (self.name, {self.label: key} if self.label else {}, value)
+            for key, value in items
+        ]
+
+class Gauge(Metric):
+    """Gauge whose values are read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, read: Callable[[], Dict[str, float]], label: Optional[str] = None):
+        super().__init__(name, description)
+        self.label = label
+        self.read = read
+
+    def samples(self):
+        try:
+            values = self.read()
+        except Exception:
+            return []
+        return [
+            (self.name, {self.label: key} if self.label else {}, value)
+            for key, value in values.items()
+        ]
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed upper bounds (seconds by convention)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        super().__init__(name, description)
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            samples.append((f"{self.name}_bucket", {"le": repr(bound)}, cumulative))
+        samples.append((f"{self.name}_bucket", {"le": "+Inf"}, count))
+        samples.append((f"{self.name}_sum", {}, total))
+        samples.append((f"{self.name}_count", {}, count))
+        return samples
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
@@ -1,6 +1,8 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, DECIMAL, Date, Text, ARRAY, JSON
-from sqlalchemy.dialects.postgresql import UUID, ENUM
+from typing import Dict
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, DECIMAL, Date, Float, Text, ARRAY, JSON, Index, Computed, DDL, event, text
+from sqlalchemy.dialects.postgresql import UUID, ENUM, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.config import Base
 from datetime import datetime
@@ -15,9 +17,40 @@ class PackageType(PyEnum):
     group = "group"
     solo = "solo"
 
+# Full-text search
+#
+# Searchable tables carry a generated, GIN-indexed `search_vector` column.
+# English fields go through the 'english' configuration (stemming, stop
+# words) and Bengali `*_bn` fields through 'simple' (lowercased tokens only),
+# each weighted A (title) to C (body text). Generation expressions must be
+# immutable and array_to_string() is not, hence the tags_to_text() wrapper.
+event.listen(Base.metadata, "before_create", DDL(
+    "CREATE OR REPLACE FUNCTION tags_to_text(text[]) RETURNS text "
+    "LANGUAGE sql IMMUTABLE AS $$ SELECT array_to_string($1, ' ') $$"
+))
+
+# Trigram (pg_trgm) GIN indexes serve ILIKE '%...%' filters and the fuzzy,
+# typo-tolerant name lookups behind /search/autocomplete.
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+def trigram_index(table: str, column: str) -> Index:
+    return Index(f"ix_{table}_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
+def search_document(weighted_fields: Dict[str, str]) -> Computed:
+    """Generated tsvector over {column: weight}; tags are included with weight B"""
+    parts = []
+    for column, weight in weighted_fields.items():
+        config = "simple" if column.endswith("_bn") else "english"
+        parts.append(f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')")
+    parts.append("setweight(to_tsvector('english', coalesce(tags_to_text(tags), '')), 'B')")
+    return Computed(" || ".join(parts), persisted=True)
+
 # Models
 class Profile(Base):
     __tablename__ = "profiles"
+    __table_args__ = (
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     full_name = Column(Text, nullable=False)
@@ -47,6 +80,10 @@ class WebsiteSettings(Base):
 
 class HomepageBanner(Base):
     __tablename__ = "homepage_banners"
+    __table_args__ = (
+        Index("ix_homepage_banners_order_id", "order", "id"),
+        Index("ix_homepage_banners_active_order_id", "order", "id", postgresql_where=text("is_active")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     image_url = Column(Text)
@@ -55,13 +92,22 @@ class HomepageBanner(Base):
     title_bn = Column(Text)
     subtitle = Column(Text)
     subtitle_bn = Column(Text)
-    order = Column(Integer, default=0)
+    order = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class TourPackage(Base):
     __tablename__ = "tour_packages"
+    __table_args__ = (
+        # Tag overlap (&&) lookups for similar items and recommendations
+        Index("ix_tour_packages_tags", "tags", postgresql_using="gin"),
+        Index("ix_tour_packages_search", "search_vector", postgresql_using="gin"),
+        trigram_index("tour_packages", "name"),
+        Index("ix_tour_packages_created_at_id", "created_at", "id"),
+        Index("ix_tour_packages_available_created_at_id", "created_at", "id", postgresql_where=text("is_available")),
+        Index("ix_tour_packages_available_featured", "is_featured", "created_at", "id", postgresql_where=text("is_available")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
@@ -85,9 +131,22 @@ class TourPackage(Base):
     is_featured = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, search_document({
+        "name": "A", "name_bn": "A",
+        "destinations": "B", "destinations_bn": "B",
+        "package_details": "C", "package_details_bn": "C"
+    })))
 
 class UmrahPackage(Base):
     __tablename__ = "umrah_packages"
+    __table_args__ = (
+        Index("ix_umrah_packages_tags", "tags", postgresql_using="gin"),
+        Index("ix_umrah_packages_search", "search_vector", postgresql_using="gin"),
+        trigram_index("umrah_packages", "name"),
+        Index("ix_umrah_packages_created_at_id", "created_at", "id"),
+        Index("ix_umrah_packages_available_created_at_id", "created_at", "id", postgresql_where=text("is_available")),
+        Index("ix_umrah_packages_available_featured", "is_featured", "created_at", "id", postgresql_where=text("is_available")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
@@ -115,9 +174,20 @@ class UmrahPackage(Base):
     is_featured = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, search_document({
+        "name": "A", "name_bn": "A",
+        "description": "B", "description_bn": "B",
+        "hotel_info": "C", "hotel_info_bn": "C",
+        "package_details": "C", "package_details_bn": "C"
+    })))
 
 class FlightDeal(Base):
     __tablename__ = "flight_deals"
+    __table_args__ = (
+        Index("ix_flight_deals_created_at_id", "created_at", "id"),
+        Index("ix_flight_deals_available_created_at_id", "created_at", "id", postgresql_where=text("is_available")),
+        Index("ix_flight_deals_available_featured", "is_featured", "created_at", "id", postgresql_where=text("is_available")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     airline_name = Column(Text, nullable=False)
@@ -135,6 +205,11 @@ class FlightDeal(Base):
 
 class BlogPost(Base):
     __tablename__ = "blog_posts"
+    __table_args__ = (
+        Index("ix_blog_posts_search", "search_vector", postgresql_using="gin"),
+        Index("ix_blog_posts_created_at_id", "created_at", "id"),
+        Index("ix_blog_posts_published_created_at_id", "created_at", "id", postgresql_where=text("is_published")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(Text, nullable=False)
@@ -149,9 +224,18 @@ class BlogPost(Base):
     is_published = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, search_document({
+        "title": "A", "title_bn": "A",
+        "excerpt": "B", "excerpt_bn": "B",
+        "content": "C", "content_bn": "C"
+    })))
 
 class ContactSubmission(Base):
     __tablename__ = "contact_submissions"
+    __table_args__ = (
+        Index("ix_contact_submissions_created_at_id", "created_at", "id"),
+        Index("ix_contact_submissions_unread_created_at_id", "created_at", "id", postgresql_where=text("NOT is_read")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
@@ -165,6 +249,15 @@ class ContactSubmission(Base):
 
 class VisaService(Base):
     __tablename__ = "visa_services"
+    __table_args__ = (
+        Index("ix_visa_services_tags", "tags", postgresql_using="gin"),
+        Index("ix_visa_services_search", "search_vector", postgresql_using="gin"),
+        trigram_index("visa_services", "country_name"),
+        trigram_index("visa_services", "country_name_bn"),
+        Index("ix_visa_services_created_at_id", "created_at", "id"),
+        Index("ix_visa_services_available_created_at_id", "created_at", "id", postgresql_where=text("is_available")),
+        Index("ix_visa_services_available_featured", "is_featured", "created_at", "id", postgresql_where=text("is_available")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     country_name = Column(Text, nullable=False)
@@ -187,23 +280,34 @@ class VisaService(Base):
     is_featured = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, search_document({
+        "country_name": "A", "country_name_bn": "A",
+        "visa_details": "C", "visa_details_bn": "C"
+    })))
 
 # Site Management Models
 class HeroScene(Base):
     __tablename__ = "hero_scenes"
+    __table_args__ = (
+        Index("ix_hero_scenes_order_id", "order", "id"),
+        Index("ix_hero_scenes_active_order_id", "order", "id", postgresql_where=text("is_active")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
     name_bn = Column(Text)
     image_url = Column(Text, nullable=False)
     gradient_class = Column(Text, nullable=False)  # CSS gradient class like 'from-orange-400 via-pink-500 to-purple-600'
-    order = Column(Integer, default=0)
+    order = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class HeroContent(Base):
     __tablename__ = "hero_content"
+    __table_args__ = (
+        Index("ix_hero_content_active_created_at_id", "created_at", "id", postgresql_where=text("is_active")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     headline_en = Column(Text, nullable=False)
@@ -219,6 +323,9 @@ class HeroContent(Base):
 
 class ContactInfo(Base):
     __tablename__ = "contact_info"
+    __table_args__ = (
+        Index("ix_contact_info_active_created_at_id", "created_at", "id", postgresql_where=text("is_active")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_name = Column(Text, nullable=False, default="ARO Travels")
@@ -252,6 +359,10 @@ class ContactInfo(Base):
 
 class ServiceOption(Base):
     __tablename__ = "service_options"
+    __table_args__ = (
+        Index("ix_service_options_order_id", "order", "id"),
+        Index("ix_service_options_active_order_id", "order", "id", postgresql_where=text("is_active")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name_en = Column(Text, nullable=False)
@@ -260,6 +371,23 @@ class ServiceOption(Base):
     description_bn = Column(Text)
     icon = Column(Text)  # Lucide icon name
     is_active = Column(Boolean, default=True)
-    order = Column(Integer, default=0)
+    order = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# Materialized recommendations: the top-N neighbours of each visa/tour/umrah
+# item in each other category, maintained by app/recommendation_store.py
+class ItemRecommendation(Base):
+    __tablename__ = "item_recommendations"
+    __table_args__ = (
+        # Find the lists an item appears in when it changes
+        Index("ix_item_recommendations_item", "category", "item_id"),
+    )
+    
+    source_type = Column(Text, primary_key=True)  # "visa", "tour" or "umrah"
+    source_id = Column(UUID(as_uuid=True), primary_key=True)
+    scoring = Column(Text, primary_key=True)  # "count" or "jaccard"
+    category = Column(Text, primary_key=True)  # Item type of the neighbour
+    rank = Column(Integer, primary_key=True)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    score = Column(Float, nullable=False)
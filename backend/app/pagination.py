@@ -0,0 +1,97 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import tuple_
+
+from app.config import MAX_PAGE_SIZE
+from app.localization import localized_column
+
+# Keyset (cursor) pagination.
+#
+# OFFSET makes Postgres walk and discard every skipped row, so deep pages get
+# slower, and a row inserted ahead of the reader shifts everything after it.
+# A keyset page instead continues strictly after the last row seen, on a sort
+# key made unique by appending `id`:
+#
+#     WHERE (created_at, id) < (:last_created_at, :last_id)
+#     ORDER BY created_at DESC, id DESC LIMIT :limit + 1
+#
+# which a composite (created_at, id) index answers by seeking straight to the
+# position. The cursor handed to clients is that last (value, id) pair,
+# base64-encoded JSON; it is opaque to them and only valid for the sort that
+# produced it.
+
+DEFAULT_PAGE_SIZE = 20
+
+def page_limit(default: int = DEFAULT_PAGE_SIZE):
+    """`limit` query parameter capped at MAX_PAGE_SIZE"""
+    return Query(min(default, MAX_PAGE_SIZE), ge=1, le=MAX_PAGE_SIZE)
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+def _field(row, name: str):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+class Keyset:
+    """A sort order pages can be walked in: one column, then `id`"""
+
+    def __init__(self, model, column: str, descending: bool = False, lang: Optional[str] = None):
+        # With `lang`, a translated column is sorted and read as localized
+        self.column_name, self.column = localized_column(model, column, lang)
+        self.id = model.id
+        self.descending = descending
+        self.key = f"{column}:{'desc' if descending else 'asc'}"
+        if self.column is not getattr(model, column):
+            self.key += f":{lang}"
+        self.python_type = getattr(model, column).type.python_type
+
+    def encode(self, row) -> str:
+        value = _field(row, self.column_name)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        payload = json.dumps([self.key, value, str(_field(row, "id"))], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str):
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            key, value, item_id = json.loads(payload)
+            if key != self.key or value is None:
+                raise ValueError(key)
+            if issubclass(self.python_type, (date, datetime)):
+                value = self.python_type.fromisoformat(value)
+            elif not isinstance(value, self.python_type):
+                raise ValueError(value)
+            return value, UUID(item_id)
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise _invalid_cursor()
+
+    def paginate(self, query, cursor: Optional[str], limit: int):
+        """Order `query` (Core select or ORM query) and keep the page after `cursor`
+
+        Fetches one extra row so page() can tell whether another page follows.
+        """
+        if self.descending:
+            query = query.order_by(self.column.desc(), self.id.desc())
+        else:
+            query = query.order_by(self.column.asc(), self.id.asc())
+        if cursor:
+            position = tuple_(self.column, self.id)
+            after = tuple_(*self.decode(cursor))
+            query = query.where(position < after if self.descending else position > after)
+        return query.limit(limit + 1)
+
+    def page(self, rows: Sequence[Any], limit: int) -> dict:
+        """Response body for rows fetched through paginate()"""
+        items: List[Any] = list(rows[:limit])
+        next_cursor = self.encode(items[-1]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
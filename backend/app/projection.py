@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+# Sparse fieldsets (`fields=`) for catalogue lists.
+#
+# Listing pages show a name, price, photo and duration, yet a full tour or
+# Umrah row also carries itineraries, inclusion lists and package details in
+# both languages. `fields` names the columns to return, either one by one or
+# through presets such as `card`. Only those columns are selected, and the
+# response is serialized with exclude_unset, so nothing else is read from
+# Postgres, decoded or sent. Select them with `localization.select_localized`.
+
+def parse_fields(
+    fields: Optional[str],
+    schema: Type[BaseModel],
+    presets: Dict[str, Iterable[str]],
+    required: Iterable[str] = ("id",)
+) -> Optional[Tuple[str, ...]]:
+    """Column names a `fields` parameter asks for; None for all of them
+
+    `required` columns (the id, a pagination sort key) are always included.
+    """
+    if not fields:
+        return None
+    names = list(required)
+    for name in (part.strip() for part in fields.split(",")):
+        if not name:
+            continue
+        if name in presets:
+            names.extend(presets[name])
+        elif name in schema.model_fields:
+            names.append(name)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{name}'; use {', '.join(presets)} or any of: {', '.join(schema.model_fields)}"
+            )
+    return tuple(dict.fromkeys(names))
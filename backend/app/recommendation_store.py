@@ -0,0 +1,263 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Text, cast, delete, insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, array
+
+from app import repository
+from app.config import RECOMMENDATION_TOP_N, engine
+from app.localization import select_localized
+from app.models import ItemRecommendation
+from app.tag_index import ITEM_MODELS, TagMatrix
+
+# Materialized recommendations.
+#
+# /recommendations/{item_type}/{item_id}/mixed only changes when an item's
+# tags or availability change, so the top RECOMMENDATION_TOP_N neighbours of
+# every item in every other category are stored in item_recommendations and
+# read back by primary key. Write handlers call refresh_item() after
+# committing, which recomputes only the lists the change can affect:
+#
+#   - the changed item's own lists, and
+#   - in its category, the lists of items that already hold it or share a
+#     tag with its new tags.
+#
+# No other item's score moves, so this is exact for `count` and `jaccard`.
+# Only the rows involved are read: those sources, and as candidates the
+# available items sharing a tag with them (`tags && ...`, GIN-indexed),
+# since nothing else can score. A refresh that fails is retried with the
+# worker's next one; rebuild() on startup recomputes everything anyway.
+# `tfidf-cosine` depends on IDF over the whole catalogue, which every write
+# shifts, so it is still scored per request.
+
+MATERIALIZED_SCORING = ("count", "jaccard")
+
+# pg advisory lock serializing refreshes, so concurrent writes in different
+# workers never interleave their delete + insert of the same lists
+REFRESH_LOCK_KEY = 0x7265636F
+
+ItemTags = Dict[str, Dict[UUID, Tuple[str, ...]]]
+ListKey = Tuple[str, UUID, str]  # (source_type, source_id, category)
+
+# Items whose refresh failed, so their lists may be stale
+_pending: Set[Tuple[str, UUID]] = set()
+_pending_lock = threading.Lock()
+
+def _load_catalogue(connection) -> Tuple[ItemTags, Dict[str, TagMatrix]]:
+    """Tags of every tagged item, and a matrix of the available ones, per type"""
+    item_tags: ItemTags = {}
+    matrices: Dict[str, TagMatrix] = {}
+    for item_type, model in ITEM_MODELS.items():
+        rows = connection.execute(
+            select(model.id, model.tags, model.is_available).where(model.tags.isnot(None)).order_by(model.id)
+        ).fetchall()
+        tagged = {row.id: tuple(dict.fromkeys(row.tags)) for row in rows if row.tags}
+        item_tags[item_type] = tagged
+        matrices[item_type] = TagMatrix({
+            row.id: tagged[row.id] for row in rows if row.is_available and row.id in tagged
+        })
+    return item_tags, matrices
+
+def _score_lists(keys: Iterable[ListKey], item_tags: ItemTags, matrices: Dict[str, TagMatrix]) -> List[dict]:
+    """Rows of the freshly scored lists for `keys`"""
+    rows = []
+    for source_type, source_id, category in keys:
+        tags = item_tags[source_type].get(source_id)
+        if not tags:
+            continue
+        for scoring in MATERIALIZED_SCORING:
+            ranked = matrices[category].top_k(tags, RECOMMENDATION_TOP_N, scoring)
+            rows.extend(
+                {
+                    "source_type": source_type,
+                    "source_id": source_id,
+                    "scoring": scoring,
+                    "category": category,
+                    "rank": rank,
+                    "item_id": item_id,
+                    "score": score
+                }
+                for rank, (item_id, score) in enumerate(ranked)
+            )
+    return rows
+
+def _load_tags(connection, item_type: str, *criteria, available_only: bool = False) -> Dict[UUID, Tuple[str, ...]]:
+    """Tags of the tagged items of a type matching `criteria`, in id order"""
+    model = ITEM_MODELS[item_type]
+    query = select(model.id, model.tags).where(model.tags.isnot(None), *criteria)
+    if available_only:
+        query = query.where(model.is_available == True)
+    rows = connection.execute(query.order_by(model.id)).fetchall()
+    return {row.id: tuple(dict.fromkeys(row.tags)) for row in rows if row.tags}
+
+def _sharing_tags(model, tags: Iterable[str]):
+    """`model.tags && tags`, served by the GIN index on tags"""
+    return model.tags.op("&&")(cast(array(sorted(tags)), ARRAY(Text)))
+
+def _refresh(connection, item_type: str, item_id: UUID) -> None:
+    model = ITEM_MODELS[item_type]
+    item = connection.execute(select(model.tags, model.is_available).where(model.id == item_id)).first()
+    tags = tuple(dict.fromkeys(item.tags)) if item is not None and item.tags else ()
+
+    # Lists currently holding the item
+    holders = connection.execute(
+        select(ItemRecommendation.source_type, ItemRecommendation.source_id)
+        .where(ItemRecommendation.category == item_type, ItemRecommendation.item_id == item_id)
+        .distinct()
+    ).fetchall()
+    held_by: Dict[str, List[UUID]] = {}
+    for source_type, source_id in holders:
+        held_by.setdefault(source_type, []).append(source_id)
+
+    # Tags of the sources of every affected list: the holders, the items of
+    # other types it may now enter (sharing one of its new tags; one it lost
+    # only matters to lists that held it) and the item itself
+    item_tags: ItemTags = {source_type: {} for source_type in ITEM_MODELS}
+    for source_type, source_model in ITEM_MODELS.items():
+        if source_type == item_type:
+            continue
+        if source_type in held_by:
+            item_tags[source_type].update(
+                _load_tags(connection, source_type, source_model.id.in_(held_by[source_type]))
+            )
+        if tags and item.is_available:
+            item_tags[source_type].update(_load_tags(connection, source_type, _sharing_tags(source_model, tags)))
+    if tags:
+        item_tags[item_type][item_id] = tags
+
+    keys = {(source_type, source_id, item_type) for source_type, source_id in holders}
+    keys.update(
+        (source_type, source_id, item_type)
+        for source_type, sources in item_tags.items() if source_type != item_type
+        for source_id in sources
+    )
+    keys.update((item_type, item_id, category) for category in ITEM_MODELS if category != item_type)
+
+    # Only candidates sharing a tag with some source can rank, so each
+    # category's matrix holds just those
+    wanted: Dict[str, set] = {}
+    for source_type, source_id, category in keys:
+        wanted.setdefault(category, set()).update(item_tags[source_type].get(source_id, ()))
+    matrices = {
+        category: TagMatrix(_load_tags(
+            connection, category, _sharing_tags(ITEM_MODELS[category], category_tags), available_only=True
+        ))
+        for category, category_tags in wanted.items() if category_tags
+    }
+
+    connection.execute(
+        delete(ItemRecommendation).where(
+            tuple_(
+                ItemRecommendation.source_type,
+                ItemRecommendation.source_id,
+                ItemRecommendation.category
+            ).in_(list(keys))
+        )
+    )
+    rows = _score_lists(keys, item_tags, matrices)
+    if rows:
+        connection.execute(insert(ItemRecommendation), rows)
+
+def refresh_item(item_type: str, item_id: UUID) -> None:
+    """Recompute the lists a created, updated or deleted item affects; call after committing
+
+    Uses the sync engine, so call it from sync write handlers. Items whose
+    refresh failed earlier in this worker are retried along with it.
+    """
+    with _pending_lock:
+        items = {(item_type, item_id), *_pending}
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY})
+            for pending_type, pending_id in sorted(items, key=str):
+                _refresh(connection, pending_type, pending_id)
+    except Exception as e:
+        # Retried with the next refresh in this worker, or by the next rebuild
+        with _pending_lock:
+            _pending.update(items)
+        print(f"Warning: Could not refresh recommendations for {item_type} {item_id}: {e}")
+        return
+    with _pending_lock:
+        _pending.difference_update(items)
+
+def rebuild() -> bool:
+    """Recompute every stored list; False if another worker is already at it
+
+    Run on startup, so rows written outside the API (seed scripts, manual
+    SQL) are picked up.
+    """
+    with engine.begin() as connection:
+        locked = connection.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        ).scalar()
+        if not locked:
+            return False
+        item_tags, matrices = _load_catalogue(connection)
+        connection.execute(delete(ItemRecommendation))
+        keys = [
+            (source_type, source_id, category)
+            for source_type, sources in item_tags.items()
+            for source_id in sources
+            for category in ITEM_MODELS
+            if category != source_type
+        ]
+        rows = _score_lists(keys, item_tags, matrices)
+        if rows:
+            connection.execute(insert(ItemRecommendation), rows)
+    with _pending_lock:
+        _pending.clear()
+    return True
+
+async def fetch_recommendations(
+    source_type: str,
+    source_id: UUID,
+    category: str,
+    scoring: str,
+    limit: int,
+    lang: Optional[str] = None
+) -> List[dict]:
+    """Stored top `limit` available items of `category` for an item, best first, in `lang`"""
+    model = ITEM_MODELS[category]
+    query = (
+        select_localized(model, lang)
+        .select_from(
+            ItemRecommendation.__table__.join(model.__table__, model.id == ItemRecommendation.item_id)
+        )
+        .where(
+            ItemRecommendation.source_type == source_type,
+            ItemRecommendation.source_id == source_id,
+            ItemRecommendation.scoring == scoring,
+            ItemRecommendation.category == category,
+            ItemRecommendation.rank < limit,
+            model.is_available == True
+        )
+        .order_by(ItemRecommendation.rank)
+    )
+    return await repository.fetch_all(query)
+
+async def fetch_ranked_ids(
+    sources: Iterable[Tuple[str, UUID]],
+    scoring: str,
+    limit: int
+) -> Dict[Tuple[UUID, str], List[UUID]]:
+    """Stored neighbour ids of many items at once, keyed by (source_id, category)"""
+    sources = list(sources)
+    if not sources:
+        return {}
+    rows = await repository.fetch_all(
+        select(ItemRecommendation.source_id, ItemRecommendation.category, ItemRecommendation.item_id)
+        .where(
+            # Ids are unique across types, so matching the columns separately
+            # is exact and still uses the primary key
+            ItemRecommendation.source_type.in_(sorted({source_type for source_type, _ in sources})),
+            ItemRecommendation.source_id.in_([source_id for _, source_id in sources]),
+            ItemRecommendation.scoring == scoring,
+            ItemRecommendation.rank < limit
+        )
+        .order_by(ItemRecommendation.source_id, ItemRecommendation.category, ItemRecommendation.rank)
+    )
+    ranked: Dict[Tuple[UUID, str], List[UUID]] = {}
+    for row in rows:
+        ranked.setdefault((row["source_id"], row["category"]), []).append(row["item_id"])
+    return ranked
@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import Text, cast, literal, select, func
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, array
+from sqlalchemy.sql import Select
+from app.config import database
+
+# Async read-side data access.
+#
+# Public read endpoints run on the event loop and query Postgres through the
+# asyncpg pool behind `app.config.database` instead of the blocking
+# SessionLocal/psycopg2 path. Queries are plain SQLAlchemy Core selects built
+# from the ORM models, and rows come back as dicts so FastAPI can validate
+# them against the same response models the sync path uses.
+
+def _record_to_dict(record) -> Dict[str, Any]:
+    """Convert a `databases` record into a plain dict"""
+    # asyncpg already decodes UUID, NUMERIC, timestamps and arrays, and the
+    # pool's init hook decodes JSON, so the raw row is used as-is. ENUM
+    # columns stay as strings, which the Pydantic schemas accept.
+    return dict(record._mapping.items())
+
+def select_rows(model, *columns) -> Select:
+    """Build a SELECT over a model's table, optionally limited to some columns"""
+    if columns:
+        return select(*columns)
+    # Search vectors are only matched against, never returned
+    return select(*[column for column in model.__table__.c if not isinstance(column.type, TSVECTOR)])
+
+async def fetch_all(query) -> List[Dict[str, Any]]:
+    """Run a query and return every row as a dict"""
+    records = await database.fetch_all(query)
+    return [_record_to_dict(record) for record in records]
+
+async def fetch_one(query) -> Optional[Dict[str, Any]]:
+    """Run a query and return the first row as a dict, or None"""
+    record = await database.fetch_one(query)
+    if record is None:
+        return None
+    return _record_to_dict(record)
+
+async def fetch_val(query) -> Any:
+    """Run a query and return the first column of the first row"""
+    return await database.fetch_val(query)
+
+async def get_by_id(model, item_id: UUID) -> Optional[Dict[str, Any]]:
+    """Fetch a single row by primary key"""
+    return await fetch_one(select_rows(model).where(model.id == item_id))
+
+async def count(model, *criteria) -> int:
+    """Count rows in a model's table matching the given criteria"""
+    query = select(func.count()).select_from(model.__table__)
+    if criteria:
+        query = query.where(*criteria)
+    return await fetch_val(query)
+
+def shared_tag_count(model, tags: List[str]):
+    """SQL expression counting the distinct tags a row shares with `tags`"""
+    wanted = cast(array(tags), ARRAY(Text))
+    shared = select(func.unnest(model.tags)).correlate(model.__table__).intersect(
+        select(func.unnest(wanted))
+    )
+    return func.cardinality(func.array(shared.scalar_subquery()))
+
+async def fetch_top_by_shared_tags(
+    model,
+    tags: List[str],
+    limit: int,
+    *criteria,
+    query: Optional[Select] = None
+) -> List[Dict[str, Any]]:
+    """Rows sharing the most tags with `tags`, best first, scored in Postgres
+
+    `&&` prefilters candidates through the GIN index on `tags`, so only rows
+    sharing at least one tag are scored and only the top `limit` are returned.
+    Ties are broken by id. `query` selects the returned columns (default:
+    select_rows(model)).
+    """
+    tags = list(dict.fromkeys(tags))
+    if not tags:
+        return []
+    score = shared_tag_count(model, tags).label("tag_score")
+    query = (
+        (select_rows(model) if query is None else query)
+        .add_columns(score)
+        .where(model.tags.op("&&")(cast(array(tags), ARRAY(Text))), *criteria)
+        .order_by(score.desc(), model.id)
+        .limit(limit)
+    )
+    return await fetch_all(query)
+
+# Word similarity (0..1) a fuzzy match needs; low enough for a typo or two
+FUZZY_MATCH_THRESHOLD = 0.3
+
+def fuzzy_match(column, text_value: str):
+    """`column` contains something close to `text_value` (pg_trgm `<%`)
+
+    Served by the column's GIN trigram index. The cut-off is
+    pg_trgm.word_similarity_threshold; run through fetch_all_fuzzy().
+    """
+    return literal(text_value).op("<%")(column)
+
+def fuzzy_score(column, text_value: str):
+    """How well `text_value` matches the best part of `column`, 0 to 1"""
+    return func.word_similarity(text_value, column)
+
+async def fetch_all_fuzzy(query, threshold: float = FUZZY_MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+    """fetch_all with the fuzzy_match() cut-off set for this query only"""
+    async with database.transaction():
+        await database.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+        )
+        return await fetch_all(query)
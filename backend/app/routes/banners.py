@@ -1,30 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
+from app import repository
+from app.cache import cached, invalidate
+from app.localization import language, select_localized
+from app.pagination import Keyset, page_limit
 from app.models import HomepageBanner, Profile
-from app.schemas import HomepageBanner as HomepageBannerSchema, HomepageBannerCreate, HomepageBannerUpdate
+from app.schemas import HomepageBanner as HomepageBannerSchema, HomepageBannerCreate, HomepageBannerUpdate, Page
 from app.auth import require_admin_or_moderator
 
 router = APIRouter(prefix="/banners", tags=["Homepage Banners"])
 
-@router.get("/", response_model=List[HomepageBannerSchema])
-def get_banners(
-    skip: int = 0,
-    limit: int = 100,
-    active_only: bool = False,
-    db: Session = Depends(get_db)
-):
-    """Get homepage banners - Public endpoint"""
-    query = db.query(HomepageBanner)
+DISPLAY_ORDER = Keyset(HomepageBanner, "order")
+
+def _list_query(active_only: bool, lang: Optional[str] = None):
+    query = select_localized(HomepageBanner, lang)
     
     if active_only:
-        query = query.filter(HomepageBanner.is_active == True)
+        query = query.where(HomepageBanner.is_active == True)
     
-    banners = query.order_by(HomepageBanner.order).offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[HomepageBannerSchema])
+@cached("homepage_banners", response_model=List[HomepageBannerSchema])
+async def get_banners(
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
+    active_only: bool = False,
+    lang: Optional[str] = Depends(language)
+):
+    """Get homepage banners - Public endpoint
+
+    `lang=en|bn|auto` returns one language under neutral keys.
+    """
+    banners = await repository.fetch_all(
+        _list_query(active_only, lang).order_by(HomepageBanner.order).offset(skip).limit(limit)
+    )
     return banners
 
+@router.get("/page", response_model=Page[HomepageBannerSchema])
+@cached("homepage_banners", response_model=Page[HomepageBannerSchema])
+async def get_banners_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    active_only: bool = False,
+    lang: Optional[str] = Depends(language)
+):
+    """Get homepage banners in display order, a page at a time - Public endpoint
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    rows = await repository.fetch_all(DISPLAY_ORDER.paginate(_list_query(active_only, lang), cursor, limit))
+    return DISPLAY_ORDER.page(rows, limit)
+
 @router.post("/", response_model=HomepageBannerSchema)
 def create_banner(
     banner: HomepageBannerCreate,
@@ -35,13 +65,15 @@ def create_banner(
     db_banner = HomepageBanner(**banner.dict())
     db.add(db_banner)
     db.commit()
+    invalidate("homepage_banners")
     db.refresh(db_banner)
     return db_banner
 
 @router.get("/{banner_id}", response_model=HomepageBannerSchema)
-def get_banner(banner_id: UUID, db: Session = Depends(get_db)):
+@cached("homepage_banners", response_model=HomepageBannerSchema)
+async def get_banner(banner_id: UUID, lang: Optional[str] = Depends(language)):
     """Get single homepage banner - Public endpoint"""
-    banner = db.query(HomepageBanner).filter(HomepageBanner.id == banner_id).first()
+    banner = await repository.fetch_one(select_localized(HomepageBanner, lang).where(HomepageBanner.id == banner_id))
     if not banner:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,6 +101,7 @@ def update_banner(
         setattr(banner, field, value)
     
     db.commit()
+    invalidate("homepage_banners")
     db.refresh(banner)
     return banner
 
@@ -88,4 +121,5 @@ def delete_banner(
     
     db.delete(banner)
     db.commit()
+    invalidate("homepage_banners")
     return {"message": "Banner deleted successfully"} 
\ No newline at end of file
@@ -1,30 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
+from app import repository
+from app.cache import cached, invalidate
+from app.localization import language, select_localized
+from app.pagination import Keyset, page_limit
 from app.models import BlogPost, Profile
-from app.schemas import BlogPost as BlogPostSchema, BlogPostCreate, BlogPostUpdate
+from app.schemas import BlogPost as BlogPostSchema, BlogPostCreate, BlogPostUpdate, Page
 from app.auth import require_admin_or_moderator
 
 router = APIRouter(prefix="/blog-posts", tags=["Blog Posts"])
 
-@router.get("/", response_model=List[BlogPostSchema])
-def get_blog_posts(
-    skip: int = 0,
-    limit: int = 100,
-    published_only: bool = False,
-    db: Session = Depends(get_db)
-):
-    """Get blog posts - Public endpoint"""
-    query = db.query(BlogPost)
+NEWEST_FIRST = Keyset(BlogPost, "created_at", descending=True)
+
+def _list_query(published_only: bool, lang: Optional[str] = None):
+    query = select_localized(BlogPost, lang)
     
     if published_only:
-        query = query.filter(BlogPost.is_published == True)
+        query = query.where(BlogPost.is_published == True)
     
-    posts = query.order_by(BlogPost.created_at.desc()).offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[BlogPostSchema])
+@cached("blog_posts", response_model=List[BlogPostSchema])
+async def get_blog_posts(
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
+    published_only: bool = False,
+    lang: Optional[str] = Depends(language)
+):
+    """Get blog posts - Public endpoint
+
+    `lang=en|bn|auto` returns one language under neutral keys.
+    """
+    posts = await repository.fetch_all(
+        _list_query(published_only, lang).order_by(BlogPost.created_at.desc()).offset(skip).limit(limit)
+    )
     return posts
 
+@router.get("/page", response_model=Page[BlogPostSchema])
+@cached("blog_posts", response_model=Page[BlogPostSchema])
+async def get_blog_posts_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    published_only: bool = False,
+    lang: Optional[str] = Depends(language)
+):
+    """Get blog posts newest first, a page at a time - Public endpoint
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    rows = await repository.fetch_all(NEWEST_FIRST.paginate(_list_query(published_only, lang), cursor, limit))
+    return NEWEST_FIRST.page(rows, limit)
+
 @router.post("/", response_model=BlogPostSchema)
 def create_blog_post(
     post: BlogPostCreate,
@@ -43,13 +73,15 @@ def create_blog_post(
     db_post = BlogPost(**post.dict())
     db.add(db_post)
     db.commit()
+    invalidate("blog_posts")
     db.refresh(db_post)
     return db_post
 
 @router.get("/{post_id}", response_model=BlogPostSchema)
-def get_blog_post(post_id: UUID, db: Session = Depends(get_db)):
+@cached("blog_posts", response_model=BlogPostSchema)
+async def get_blog_post(post_id: UUID, lang: Optional[str] = Depends(language)):
     """Get single blog post - Public endpoint"""
-    post = db.query(BlogPost).filter(BlogPost.id == post_id).first()
+    post = await repository.fetch_one(select_localized(BlogPost, lang).where(BlogPost.id == post_id))
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -58,9 +90,12 @@ def get_blog_post(post_id: UUID, db: Session = Depends(get_db)):
     return post
 
 @router.get("/slug/{slug}", response_model=BlogPostSchema)
-def get_blog_post_by_slug(slug: str, db: Session = Depends(get_db)):
+@cached("blog_posts", response_model=BlogPostSchema)
+async def get_blog_post_by_slug(slug: str, lang: Optional[str] = Depends(language)):
     """Get blog post by slug - Public endpoint"""
-    post = db.query(BlogPost).filter(BlogPost.slug == slug).first()
+    post = await repository.fetch_one(
+        select_localized(BlogPost, lang).where(BlogPost.slug == slug)
+    )
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -98,6 +133,7 @@ def update_blog_post(
         setattr(post, field, value)
     
     db.commit()
+    invalidate("blog_posts")
     db.refresh(post)
     return post
 
@@ -117,4 +153,5 @@ def delete_blog_post(
     
     db.delete(post)
     db.commit()
+    invalidate("blog_posts")
     return {"message": "Blog post deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,72 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from typing import Optional
+from app import repository
+from app.cache import cached
+from app.localization import language, select_localized
+from app.pagination import page_limit
+from app.models import WebsiteSettings, HomepageBanner, HeroScene, HeroContent, ContactInfo, ServiceOption
+from app.schemas import BootstrapPayload
+from app.routes.recommendations import fetch_popular_items
+
+router = APIRouter(tags=["Bootstrap"])
+
+# Every table the homepage payload is built from; a write to any of them
+# invalidates the cached payload.
+BOOTSTRAP_TABLES = (
+    "website_settings",
+    "homepage_banners",
+    "hero_scenes",
+    "hero_content",
+    "contact_info",
+    "service_options",
+    "visa_services",
+    "tour_packages",
+    "umrah_packages"
+)
+
+@router.get("/bootstrap", response_model=BootstrapPayload)
+@cached(*BOOTSTRAP_TABLES, response_model=BootstrapPayload)
+async def get_bootstrap(popular_per_type: int = page_limit(4), lang: Optional[str] = Depends(language)):
+    """Get everything the homepage needs in one request - Public endpoint
+
+    Same data as /settings/, /banners/?active_only=true, the active
+    /site-management/ hero scenes, hero content, contact info and service
+    options, and /recommendations/popular, queried concurrently. With
+    `lang=en|bn|auto` all of it comes in one language under neutral keys.
+    """
+    settings, banners, hero_scenes, hero_content, contact_info, service_options, popular = await asyncio.gather(
+        repository.fetch_one(select_localized(WebsiteSettings, lang).limit(1)),
+        repository.fetch_all(
+            select_localized(HomepageBanner, lang)
+            .where(HomepageBanner.is_active == True)
+            .order_by(HomepageBanner.order)
+        ),
+        repository.fetch_all(
+            select_localized(HeroScene, lang)
+            .where(HeroScene.is_active == True)
+            .order_by(HeroScene.order)
+        ),
+        repository.fetch_one(
+            select_localized(HeroContent, lang).where(HeroContent.is_active == True).limit(1)
+        ),
+        repository.fetch_one(
+            select_localized(ContactInfo, lang).where(ContactInfo.is_active == True).limit(1)
+        ),
+        repository.fetch_all(
+            select_localized(ServiceOption, lang)
+            .where(ServiceOption.is_active == True)
+            .order_by(ServiceOption.order)
+        ),
+        fetch_popular_items(popular_per_type, lang)
+    )
+
+    return {
+        "settings": settings,
+        "banners": banners,
+        "hero_scenes": hero_scenes,
+        "hero_content": hero_content,
+        "contact_info": contact_info,
+        "service_options": service_options,
+        "popular": popular
+    }
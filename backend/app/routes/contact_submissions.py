@@ -1,16 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
 from app.models import ContactSubmission, Profile
-from app.schemas import ContactSubmission as ContactSubmissionSchema, ContactSubmissionCreate, ContactSubmissionUpdate
+from app.pagination import Keyset, page_limit
+from app.schemas import ContactSubmission as ContactSubmissionSchema, ContactSubmissionCreate, ContactSubmissionUpdate, Page
 from app.auth import require_admin_or_moderator
 from app.email_service import send_quick_booking_email
 from app.config import conf
 
 router = APIRouter(prefix="/contact-submissions", tags=["Contact Submissions"])
 
+NEWEST_FIRST = Keyset(ContactSubmission, "created_at", descending=True)
+
+def save_contact_submission(db: Session, submission: ContactSubmissionCreate) -> ContactSubmission:
+    """Persist a contact submission - called through the threadpool"""
+    db_submission = ContactSubmission(**submission.dict())
+    db.add(db_submission)
+    db.commit()
+    db.refresh(db_submission)
+    return db_submission
 
 
 @router.post("/", response_model=ContactSubmissionSchema)
@@ -19,10 +30,9 @@ async def create_contact_submission(
     db: Session = Depends(get_db)
 ):
     """Create contact submission - Public endpoint"""
-    db_submission = ContactSubmission(**submission.dict())
-    db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    # The handler stays async for the email notification, so the sync
+    # session work runs in the threadpool instead of on the event loop
+    db_submission = await run_in_threadpool(save_contact_submission, db, submission)
     
     # Send email notification for quick bookings
     # TEMPORARILY DISABLED - Email service causing slow submissions
@@ -38,8 +48,8 @@ async def create_contact_submission(
 
 @router.get("/", response_model=List[ContactSubmissionSchema])
 def get_contact_submissions(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
     unread_only: bool = False,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -53,6 +63,25 @@ def get_contact_submissions(
     submissions = query.order_by(ContactSubmission.created_at.desc()).offset(skip).limit(limit).all()
     return submissions
 
+@router.get("/page", response_model=Page[ContactSubmissionSchema])
+def get_contact_submissions_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Profile = Depends(require_admin_or_moderator)
+):
+    """Get contact submissions newest first, a page at a time - Requires admin/moderator access
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    query = db.query(ContactSubmission)
+    
+    if unread_only:
+        query = query.filter(ContactSubmission.is_read == False)
+    
+    return NEWEST_FIRST.page(NEWEST_FIRST.paginate(query, cursor, limit).all(), limit)
+
 @router.get("/{submission_id}", response_model=ContactSubmissionSchema)
 def get_contact_submission(
     submission_id: UUID,
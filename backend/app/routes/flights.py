@@ -1,34 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
+from app import repository
+from app.cache import cached, invalidate
+from app.pagination import Keyset, page_limit
 from app.models import FlightDeal, Profile
-from app.schemas import FlightDeal as FlightDealSchema, FlightDealCreate, FlightDealUpdate
+from app.schemas import FlightDeal as FlightDealSchema, FlightDealCreate, FlightDealUpdate, Page
 from app.auth import require_admin_or_moderator
 
 router = APIRouter(prefix="/flights", tags=["Flight Deals"])
 
-@router.get("/", response_model=List[FlightDealSchema])
-def get_flight_deals(
-    skip: int = 0,
-    limit: int = 100,
-    available_only: bool = False,
-    featured_only: bool = False,
-    db: Session = Depends(get_db)
-):
-    """Get flight deals - Public endpoint"""
-    query = db.query(FlightDeal)
+NEWEST_FIRST = Keyset(FlightDeal, "created_at", descending=True)
+
+def _list_query(available_only: bool, featured_only: bool):
+    query = repository.select_rows(FlightDeal)
     
     if available_only:
-        query = query.filter(FlightDeal.is_available == True)
+        query = query.where(FlightDeal.is_available == True)
     
     if featured_only:
-        query = query.filter(FlightDeal.is_featured == True)
+        query = query.where(FlightDeal.is_featured == True)
     
-    deals = query.offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[FlightDealSchema])
+@cached("flight_deals", response_model=List[FlightDealSchema])
+async def get_flight_deals(
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
+    available_only: bool = False,
+    featured_only: bool = False
+):
+    """Get flight deals - Public endpoint"""
+    deals = await repository.fetch_all(
+        _list_query(available_only, featured_only).offset(skip).limit(limit)
+    )
     return deals
 
+@router.get("/page", response_model=Page[FlightDealSchema])
+@cached("flight_deals", response_model=Page[FlightDealSchema])
+async def get_flight_deals_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    available_only: bool = False,
+    featured_only: bool = False
+):
+    """Get flight deals newest first, a page at a time - Public endpoint
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    rows = await repository.fetch_all(
+        NEWEST_FIRST.paginate(_list_query(available_only, featured_only), cursor, limit)
+    )
+    return NEWEST_FIRST.page(rows, limit)
+
 @router.post("/", response_model=FlightDealSchema)
 def create_flight_deal(
     deal: FlightDealCreate,
@@ -39,13 +66,15 @@ def create_flight_deal(
     db_deal = FlightDeal(**deal.dict())
     db.add(db_deal)
     db.commit()
+    invalidate("flight_deals")
     db.refresh(db_deal)
     return db_deal
 
 @router.get("/{deal_id}", response_model=FlightDealSchema)
-def get_flight_deal(deal_id: UUID, db: Session = Depends(get_db)):
+@cached("flight_deals", response_model=FlightDealSchema)
+async def get_flight_deal(deal_id: UUID):
     """Get single flight deal - Public endpoint"""
-    deal = db.query(FlightDeal).filter(FlightDeal.id == deal_id).first()
+    deal = await repository.get_by_id(FlightDeal, deal_id)
     if not deal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -73,6 +102,7 @@ def update_flight_deal(
         setattr(deal, field, value)
     
     db.commit()
+    invalidate("flight_deals")
     db.refresh(deal)
     return deal
 
@@ -92,4 +122,5 @@ def delete_flight_deal(
     
     db.delete(deal)
     db.commit()
+    invalidate("flight_deals")
     return {"message": "Flight deal deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,91 @@
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+
+from app.conditional import is_not_modified
+from app.config import IMAGE_CACHE_ACCEL_PREFIX, IMAGE_VARIANT_WIDTHS
+from app.derivatives import derivative_cache
+from app.imaging import AVIF_QUALITY, AVIF_SUPPORTED, MAX_DIMENSION, WEBP_QUALITY, ConversionError, InvalidImage
+from app.routes.uploads import UPLOAD_DIR
+
+router = APIRouter(prefix="/static/img", tags=["Images"])
+
+DEFAULT_QUALITY = {"webp": WEBP_QUALITY, "avif": AVIF_QUALITY}
+# Every `w` and `q` combination is a separate render and cache file, so they
+# are rounded to these: `w` up to the next srcset width (full size past the
+# widest), `q` to the nearest level
+QUALITY_LEVELS = sorted({40, 60, 75, WEBP_QUALITY, AVIF_QUALITY})
+
+def derivative_width(w: Optional[int]) -> Optional[int]:
+    if w is None:
+        return None
+    return next((width for width in sorted(IMAGE_VARIANT_WIDTHS) if width >= w), None)
+
+def derivative_quality(q: Optional[int], image_format: str) -> int:
+    if q is None:
+        return DEFAULT_QUALITY[image_format]
+    return min(QUALITY_LEVELS, key=lambda level: (abs(level - q), level))
+
+# A derivative URL names the source and every parameter, and uploads are never
+# rewritten, so browsers and CDNs may keep responses for good
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/{filename}")
+async def get_image(
+    request: Request,
+    filename: str,
+    w: Optional[int] = Query(None, ge=16, le=MAX_DIMENSION),
+    q: Optional[int] = Query(None, ge=30, le=95),
+    fmt: str = Query("webp", pattern="^(webp|avif)$")
+):
+    """Uploaded image resized and re-encoded on first request, then served from disk - Public endpoint
+
+    Works for every upload, including those stored before srcset variants
+    existed. `w` is a maximum width (images are never enlarged), rounded up
+    to the next IMAGE_VARIANT_WIDTHS entry; `q` is rounded to the nearest of
+    QUALITY_LEVELS.
+    """
+    source = UPLOAD_DIR / filename
+    if fmt == "avif" and not AVIF_SUPPORTED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="AVIF is not available on this server"
+        )
+
+    width, quality = derivative_width(w), derivative_quality(q, fmt)
+    try:
+        if Path(filename).name != filename:
+            raise FileNotFoundError(filename)
+        # The ETag is the cache key, so revalidations never need the derivative
+        key = await run_in_threadpool(derivative_cache.key, source, width, quality, fmt)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    etag = f'"{key[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        path = await derivative_cache.get(source, key, width, quality, fmt)
+    except InvalidImage:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image file"
+        )
+    except ConversionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to convert image: {str(e)}"
+        )
+
+    if IMAGE_CACHE_ACCEL_PREFIX:
+        # nginx sends the file itself (sendfile) from its internal location
+        location = f"{IMAGE_CACHE_ACCEL_PREFIX.rstrip('/')}/{path.relative_to(derivative_cache.directory).as_posix()}"
+        return Response(media_type=f"image/{fmt}", headers={**headers, "X-Accel-Redirect": location})
+    return FileResponse(path, media_type=f"image/{fmt}", headers=headers)
@@ -1,25 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List, Dict, Any, Optional
 from uuid import UUID
-from app.config import get_db
+from app import recommendation_store, repository
+from app.cache import cached
+from app.config import RECOMMENDATION_ENGINE, RECOMMENDATION_TOP_N
+from app.localization import language, select_localized
+from app.pagination import page_limit
+from app.tag_index import ITEM_MODELS, SCORING_MODES, tag_index, top_items as top_indexed_items
 from app.models import VisaService, TourPackage, UmrahPackage
 from app.schemas import (
-    VisaService as VisaServiceSchema, 
-    TourPackage as TourPackageSchema, 
-    UmrahPackage as UmrahPackageSchema
+    MixedRecommendations,
+    PopularRecommendations,
+    RecommendationBatch,
+    RecommendationBatchRequest,
+    TagRecommendations
 )
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
-@router.get("/{item_type}/{item_id}/mixed")
-def get_mixed_recommendations(
+SCORING_PATTERN = "^(" + "|".join(SCORING_MODES) + ")$"
+
+# Payload key of each item type's recommendations
+RESULT_KEYS = {"visa": "visas", "tour": "tours", "umrah": "umrah"}
+
+async def top_items(
+    item_type: str,
+    tags: List[str],
+    limit: int,
+    exclude_id: Optional[UUID] = None,
+    scoring: str = "count",
+    lang: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Best available items of a type for `tags` in `lang`, via RECOMMENDATION_ENGINE
+
+    The SQL engine only implements `count`; other modes always use the index.
+    """
+    if RECOMMENDATION_ENGINE == "sql" and scoring == "count":
+        model = ITEM_MODELS[item_type]
+        criteria = [model.is_available == True]
+        if exclude_id:
+            criteria.append(model.id != exclude_id)
+        return await repository.fetch_top_by_shared_tags(
+            model, tags, limit, *criteria, query=select_localized(model, lang)
+        )
+    return await top_indexed_items(item_type, tags, limit, exclude_id, scoring, lang)
+
+@router.get("/{item_type}/{item_id}/mixed", response_model=MixedRecommendations)
+@cached("visa_services", "tour_packages", "umrah_packages", response_model=MixedRecommendations)
+async def get_mixed_recommendations(
     item_type: str,  # "visa", "tour", or "umrah"
     item_id: UUID,
-    limit_per_type: int = 2,
-    db: Session = Depends(get_db)
+    limit_per_type: int = page_limit(2),
+    scoring: str = Query("count", regex=SCORING_PATTERN),
+    lang: Optional[str] = Depends(language)
 ):
-    """Get mixed recommendations across all categories based on tags - Public endpoint"""
+    """Get mixed recommendations across all categories based on tags - Public endpoint
+
+    `lang=en|bn|auto` returns the recommended items in one language under
+    neutral keys.
+    """
     
     # Validate item_type
     if item_type not in ["visa", "tour", "umrah"]:
@@ -33,20 +73,20 @@ def get_mixed_recommendations(
     current_tags = []
     
     if item_type == "visa":
-        current_item = db.query(VisaService).filter(VisaService.id == item_id).first()
+        current_item = await repository.get_by_id(VisaService, item_id)
         if not current_item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Visa service not found")
-        current_tags = current_item.tags or []
+        current_tags = current_item["tags"] or []
     elif item_type == "tour":
-        current_item = db.query(TourPackage).filter(TourPackage.id == item_id).first()
+        current_item = await repository.get_by_id(TourPackage, item_id)
         if not current_item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tour package not found")
-        current_tags = current_item.tags or []
+        current_tags = current_item["tags"] or []
     elif item_type == "umrah":
-        current_item = db.query(UmrahPackage).filter(UmrahPackage.id == item_id).first()
+        current_item = await repository.get_by_id(UmrahPackage, item_id)
         if not current_item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Umrah package not found")
-        current_tags = current_item.tags or []
+        current_tags = current_item["tags"] or []
     
     recommendations = {
         "current_item": {
@@ -65,136 +105,100 @@ def get_mixed_recommendations(
     if not current_tags:
         # Get random visas
         if item_type != "visa":
-            random_visas = db.query(VisaService).filter(
-                VisaService.is_available == True
-            ).limit(limit_per_type).all()
-            recommendations["recommendations"]["visas"] = [
-                VisaServiceSchema.from_orm(v) for v in random_visas
-            ]
+            recommendations["recommendations"]["visas"] = await repository.fetch_all(
+                select_localized(VisaService, lang).where(
+                    VisaService.is_available == True
+                ).limit(limit_per_type)
+            )
         
         # Get random tours
         if item_type != "tour":
-            random_tours = db.query(TourPackage).filter(
-                TourPackage.is_available == True
-            ).limit(limit_per_type).all()
-            recommendations["recommendations"]["tours"] = [
-                TourPackageSchema.from_orm(t) for t in random_tours
-            ]
+            recommendations["recommendations"]["tours"] = await repository.fetch_all(
+                select_localized(TourPackage, lang).where(
+                    TourPackage.is_available == True
+                ).limit(limit_per_type)
+            )
         
         # Get random umrah
         if item_type != "umrah":
-            random_umrah = db.query(UmrahPackage).filter(
-                UmrahPackage.is_available == True
-            ).limit(limit_per_type).all()
-            recommendations["recommendations"]["umrah"] = [
-                UmrahPackageSchema.from_orm(u) for u in random_umrah
-            ]
+            recommendations["recommendations"]["umrah"] = await repository.fetch_all(
+                select_localized(UmrahPackage, lang).where(
+                    UmrahPackage.is_available == True
+                ).limit(limit_per_type)
+            )
         
         return recommendations
     
-    # Get recommendations based on tag similarity
+    # Get recommendations based on tag similarity: stored lists when they
+    # cover the request, scored on the fly otherwise
+    async def neighbours(category: str) -> List[Dict[str, Any]]:
+        if scoring in recommendation_store.MATERIALIZED_SCORING and limit_per_type <= RECOMMENDATION_TOP_N:
+            return await recommendation_store.fetch_recommendations(
+                item_type, item_id, category, scoring, limit_per_type, lang
+            )
+        return await top_items(category, current_tags, limit_per_type, scoring=scoring, lang=lang)
     
-    # Visa recommendations
     if item_type != "visa":
-        visa_services = db.query(VisaService).filter(
-            VisaService.is_available == True
-        ).all()
-        
-        scored_visas = []
-        for visa in visa_services:
-            if visa.tags:
-                matching_tags = set(current_tags) & set(visa.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_visas.append((visa, score))
-        
-        scored_visas.sort(key=lambda x: x[1], reverse=True)
-        top_visas = [visa for visa, score in scored_visas[:limit_per_type]]
-        recommendations["recommendations"]["visas"] = [
-            VisaServiceSchema.from_orm(v) for v in top_visas
-        ]
+        recommendations["recommendations"]["visas"] = await neighbours("visa")
     
-    # Tour recommendations
     if item_type != "tour":
-        tour_packages = db.query(TourPackage).filter(
-            TourPackage.is_available == True
-        ).all()
-        
-        scored_tours = []
-        for tour in tour_packages:
-            if tour.tags:
-                matching_tags = set(current_tags) & set(tour.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_tours.append((tour, score))
-        
-        scored_tours.sort(key=lambda x: x[1], reverse=True)
-        top_tours = [tour for tour, score in scored_tours[:limit_per_type]]
-        recommendations["recommendations"]["tours"] = [
-            TourPackageSchema.from_orm(t) for t in top_tours
-        ]
+        recommendations["recommendations"]["tours"] = await neighbours("tour")
     
-    # Umrah recommendations
     if item_type != "umrah":
-        umrah_packages = db.query(UmrahPackage).filter(
-            UmrahPackage.is_available == True
-        ).all()
-        
-        scored_umrah = []
-        for umrah in umrah_packages:
-            if umrah.tags:
-                matching_tags = set(current_tags) & set(umrah.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_umrah.append((umrah, score))
-        
-        scored_umrah.sort(key=lambda x: x[1], reverse=True)
-        top_umrah = [umrah for umrah, score in scored_umrah[:limit_per_type]]
-        recommendations["recommendations"]["umrah"] = [
-            UmrahPackageSchema.from_orm(u) for u in top_umrah
-        ]
+        recommendations["recommendations"]["umrah"] = await neighbours("umrah")
     
     return recommendations
 
-@router.get("/popular")
-def get_popular_items(
-    limit_per_type: int = 4,
-    db: Session = Depends(get_db)
+async def fetch_popular_items(limit_per_type: int, lang: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Featured, available items of every type in `lang`, fetched concurrently"""
+    popular_visas, popular_tours, popular_umrah = await asyncio.gather(
+        repository.fetch_all(
+            select_localized(VisaService, lang).where(
+                VisaService.is_available == True,
+                VisaService.is_featured == True
+            ).limit(limit_per_type)
+        ),
+        repository.fetch_all(
+            select_localized(TourPackage, lang).where(
+                TourPackage.is_available == True,
+                TourPackage.is_featured == True
+            ).limit(limit_per_type)
+        ),
+        repository.fetch_all(
+            select_localized(UmrahPackage, lang).where(
+                UmrahPackage.is_available == True,
+                UmrahPackage.is_featured == True
+            ).limit(limit_per_type)
+        )
+    )
+    return {"visas": popular_visas, "tours": popular_tours, "umrah": popular_umrah}
+
+@router.get("/popular", response_model=PopularRecommendations)
+@cached("visa_services", "tour_packages", "umrah_packages", response_model=PopularRecommendations)
+async def get_popular_items(
+    limit_per_type: int = page_limit(4),
+    lang: Optional[str] = Depends(language)
 ):
-    """Get popular/featured items from all categories - Public endpoint"""
-    
-    popular_visas = db.query(VisaService).filter(
-        VisaService.is_available == True,
-        VisaService.is_featured == True
-    ).limit(limit_per_type).all()
-    
-    popular_tours = db.query(TourPackage).filter(
-        TourPackage.is_available == True,
-        TourPackage.is_featured == True
-    ).limit(limit_per_type).all()
-    
-    popular_umrah = db.query(UmrahPackage).filter(
-        UmrahPackage.is_available == True,
-        UmrahPackage.is_featured == True
-    ).limit(limit_per_type).all()
-    
-    return {
-        "popular": {
-            "visas": [VisaServiceSchema.from_orm(v) for v in popular_visas],
-            "tours": [TourPackageSchema.from_orm(t) for t in popular_tours],
-            "umrah": [UmrahPackageSchema.from_orm(u) for u in popular_umrah]
-        }
-    }
+    """Get popular/featured items from all categories - Public endpoint
 
-@router.get("/by-tags")
-def get_recommendations_by_tags(
-    tags: List[str],
+    `lang=en|bn|auto` returns them in one language under neutral keys.
+    """
+    return {"popular": await fetch_popular_items(limit_per_type, lang)}
+
+@router.get("/by-tags", response_model=TagRecommendations)
+@cached("visa_services", "tour_packages", "umrah_packages", response_model=TagRecommendations)
+async def get_recommendations_by_tags(
+    tags: List[str] = Query(...),
     exclude_type: Optional[str] = None,
     exclude_id: Optional[UUID] = None,
-    limit_per_type: int = 3,
-    db: Session = Depends(get_db)
+    limit_per_type: int = page_limit(3),
+    scoring: str = Query("count", regex=SCORING_PATTERN),
+    lang: Optional[str] = Depends(language)
 ):
-    """Get recommendations by specific tags - Public endpoint"""
+    """Get recommendations by specific tags - Public endpoint
+
+    `lang=en|bn|auto` returns the items in one language under neutral keys.
+    """
     
     recommendations = {
         "tags": tags,
@@ -205,70 +209,137 @@ def get_recommendations_by_tags(
         }
     }
     
-    # Visa recommendations
+    # Excluding an item only applies within its own type
+    def excluded(item_type: str) -> Optional[UUID]:
+        return exclude_id if exclude_type == item_type else None
+    
     if exclude_type != "visa":
-        visa_query = db.query(VisaService).filter(VisaService.is_available == True)
-        if exclude_id and exclude_type == "visa":
-            visa_query = visa_query.filter(VisaService.id != exclude_id)
-        
-        visa_services = visa_query.all()
-        scored_visas = []
-        
-        for visa in visa_services:
-            if visa.tags:
-                matching_tags = set(tags) & set(visa.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_visas.append((visa, score))
-        
-        scored_visas.sort(key=lambda x: x[1], reverse=True)
-        top_visas = [visa for visa, score in scored_visas[:limit_per_type]]
-        recommendations["results"]["visas"] = [
-            VisaServiceSchema.from_orm(v) for v in top_visas
-        ]
+        recommendations["results"]["visas"] = await top_items(
+            "visa", tags, limit_per_type, excluded("visa"), scoring, lang
+        )
     
-    # Tour recommendations
     if exclude_type != "tour":
-        tour_query = db.query(TourPackage).filter(TourPackage.is_available == True)
-        if exclude_id and exclude_type == "tour":
-            tour_query = tour_query.filter(TourPackage.id != exclude_id)
-        
-        tour_packages = tour_query.all()
-        scored_tours = []
-        
-        for tour in tour_packages:
-            if tour.tags:
-                matching_tags = set(tags) & set(tour.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_tours.append((tour, score))
-        
-        scored_tours.sort(key=lambda x: x[1], reverse=True)
-        top_tours = [tour for tour, score in scored_tours[:limit_per_type]]
-        recommendations["results"]["tours"] = [
-            TourPackageSchema.from_orm(t) for t in top_tours
-        ]
+        recommendations["results"]["tours"] = await top_items(
+            "tour", tags, limit_per_type, excluded("tour"), scoring, lang
+        )
     
-    # Umrah recommendations
     if exclude_type != "umrah":
-        umrah_query = db.query(UmrahPackage).filter(UmrahPackage.is_available == True)
-        if exclude_id and exclude_type == "umrah":
-            umrah_query = umrah_query.filter(UmrahPackage.id != exclude_id)
-        
-        umrah_packages = umrah_query.all()
-        scored_umrah = []
-        
-        for umrah in umrah_packages:
-            if umrah.tags:
-                matching_tags = set(tags) & set(umrah.tags)
-                score = len(matching_tags)
-                if score > 0:
-                    scored_umrah.append((umrah, score))
-        
-        scored_umrah.sort(key=lambda x: x[1], reverse=True)
-        top_umrah = [umrah for umrah, score in scored_umrah[:limit_per_type]]
-        recommendations["results"]["umrah"] = [
-            UmrahPackageSchema.from_orm(u) for u in top_umrah
-        ]
+        recommendations["results"]["umrah"] = await top_items(
+            "umrah", tags, limit_per_type, excluded("umrah"), scoring, lang
+        )
     
     return recommendations
+
+@router.post("/batch", response_model=RecommendationBatch)
+async def get_batch_recommendations(batch: RecommendationBatchRequest):
+    """Get recommendations for many items at once - Public endpoint
+
+    For listing pages: one call instead of a /mixed (or, with
+    include_same_type, /similar) call per card. The requested items are
+    fetched with one query per type, every list is ranked against the same
+    per-type candidate set, and each recommended item is loaded and returned
+    once under `items`.
+    """
+    requested: Dict[str, List[UUID]] = {}
+    for item in batch.items:
+        requested.setdefault(item.item_type, []).append(item.item_id)
+    
+    # Tags of the requested items, one query per type
+    item_types = list(requested)
+    found = await asyncio.gather(*(
+        repository.fetch_all(
+            repository.select_rows(ITEM_MODELS[t], ITEM_MODELS[t].id, ITEM_MODELS[t].tags)
+            .where(ITEM_MODELS[t].id.in_(requested[t]))
+        )
+        for t in item_types
+    ))
+    sources = {
+        row["id"]: (item_type, row["tags"] or [])
+        for item_type, rows in zip(item_types, found)
+        for row in rows
+    }
+    
+    limit = batch.limit_per_type
+    
+    def categories(item_type: str) -> List[str]:
+        return [c for c in ITEM_MODELS if c != item_type or batch.include_same_type]
+    
+    # Other-category lists come from the stored lists where /mixed uses them
+    use_store = batch.scoring in recommendation_store.MATERIALIZED_SCORING and limit <= RECOMMENDATION_TOP_N
+    stored = {}
+    if use_store:
+        stored = await recommendation_store.fetch_ranked_ids(
+            ((item_type, source_id) for source_id, (item_type, tags) in sources.items() if tags),
+            batch.scoring,
+            limit
+        )
+    
+    # The rest are ranked in memory against one matrix per category
+    scored = {
+        category
+        for item_type, tags in sources.values() if tags
+        for category in categories(item_type)
+        if category == item_type or not use_store
+    }
+    matrices = {category: await tag_index.matrix(category) for category in scored}
+    idf = await tag_index.idf() if scored and batch.scoring == "tfidf-cosine" else None
+    
+    # Items without tags get the /mixed and /similar fallback: the first
+    # available items of each category
+    untagged = {
+        category
+        for item_type, tags in sources.values() if not tags
+        for category in categories(item_type)
+    }
+    fallback_rows = await asyncio.gather(*(
+        repository.fetch_all(
+            repository.select_rows(ITEM_MODELS[c], ITEM_MODELS[c].id)
+            .where(ITEM_MODELS[c].is_available == True)
+            .limit(limit + 1)
+        )
+        for c in untagged
+    ))
+    fallback = {c: [row["id"] for row in rows] for c, rows in zip(untagged, fallback_rows)}
+    
+    ranked: Dict[UUID, Dict[str, List[UUID]]] = {}
+    for source_id, (item_type, tags) in sources.items():
+        lists = {}
+        for category in categories(item_type):
+            if not tags:
+                ids = [i for i in fallback[category] if i != source_id][:limit]
+            elif category == item_type or not use_store:
+                exclude = source_id if category == item_type else None
+                ids = [i for i, _ in matrices[category].top_k(tags, limit, batch.scoring, idf, exclude=exclude)]
+            else:
+                ids = stored.get((source_id, category), [])
+            lists[category] = ids
+        ranked[source_id] = lists
+    
+    # Load every recommended item once
+    wanted: Dict[str, set] = {category: set() for category in ITEM_MODELS}
+    for lists in ranked.values():
+        for category, ids in lists.items():
+            wanted[category].update(ids)
+    loaded = await asyncio.gather(*(
+        repository.fetch_all(
+            repository.select_rows(ITEM_MODELS[c]).where(
+                ITEM_MODELS[c].id.in_(list(ids)),
+                ITEM_MODELS[c].is_available == True
+            )
+        )
+        for c, ids in wanted.items() if ids
+    ))
+    items = {RESULT_KEYS[c]: {} for c in ITEM_MODELS}
+    for c, rows in zip([c for c, ids in wanted.items() if ids], loaded):
+        items[RESULT_KEYS[c]] = {row["id"]: row for row in rows}
+    
+    results = {
+        source_id: {
+            RESULT_KEYS[category]: [i for i in ids if i in items[RESULT_KEYS[category]]]
+            for category, ids in lists.items()
+        }
+        for source_id, lists in ranked.items()
+    }
+    not_found = [item.item_id for item in batch.items if item.item_id not in sources]
+    
+    return {"results": results, "items": items, "not_found": not_found}
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from sqlalchemy import func, literal, literal_column, or_, select, union_all
+from app import repository
+from app.cache import cached
+from app.localization import language, localize
+from app.models import TourPackage, UmrahPackage, VisaService, BlogPost
+from app.schemas import AutocompleteHit, SearchResults, Suggestion
+from app.suggest_index import suggest_index
+
+router = APIRouter(tags=["Search"])
+
+# type -> (model, title, title_bn, image, slug, visibility)
+SEARCH_SOURCES = {
+    "tour": (TourPackage, TourPackage.name, TourPackage.name_bn, TourPackage.cover_photo, None,
+             TourPackage.is_available == True),
+    "umrah": (UmrahPackage, UmrahPackage.name, UmrahPackage.name_bn, UmrahPackage.cover_photo, None,
+              UmrahPackage.is_available == True),
+    "visa": (VisaService, VisaService.country_name, VisaService.country_name_bn, VisaService.cover_photo, None,
+             VisaService.is_available == True),
+    "blog": (BlogPost, BlogPost.title, BlogPost.title_bn, BlogPost.cover_image, BlogPost.slug,
+             BlogPost.is_published == True)
+}
+
+# type -> (model, trigram-indexed label columns, label, label_bn)
+AUTOCOMPLETE_SOURCES = {
+    "visa": (VisaService, (VisaService.country_name, VisaService.country_name_bn),
+             VisaService.country_name, VisaService.country_name_bn),
+    "tour": (TourPackage, (TourPackage.name,), TourPackage.name, TourPackage.name_bn),
+    "umrah": (UmrahPackage, (UmrahPackage.name,), UmrahPackage.name, UmrahPackage.name_bn)
+}
+
+def text_query(q: str):
+    """tsquery matching `q` as English (stemmed) or as-is (Bengali)"""
+    english = func.websearch_to_tsquery(literal_column("'english'"), q)
+    simple = func.websearch_to_tsquery(literal_column("'simple'"), q)
+    return english.op("||")(simple)
+
+@router.get("/search", response_model=SearchResults)
+@cached("tour_packages", "umrah_packages", "visa_services", "blog_posts", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: List[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    lang: Optional[str] = Depends(language)
+):
+    """Search tours, umrah packages, visas and blog posts - Public endpoint
+
+    Supports web-search syntax ("quoted phrases", -excluded, or). Matches
+    each table's GIN-indexed `search_vector` and returns one ranked,
+    paginated list across all of them. Both languages are searched either
+    way; `lang` picks the language titles are returned in.
+    """
+    types = types or list(SEARCH_SOURCES)
+    unknown = [t for t in types if t not in SEARCH_SOURCES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"types must be among: {', '.join(SEARCH_SOURCES)}"
+        )
+    
+    query = text_query(q)
+    matches = []
+    for item_type in dict.fromkeys(types):
+        model, title, title_bn, image, slug, visible = SEARCH_SOURCES[item_type]
+        titles = [title.label("title"), title_bn.label("title_bn")] if lang is None else [
+            localize(title, title_bn, lang, "title")
+        ]
+        matches.append(
+            select(
+                literal(item_type).label("type"),
+                model.id.label("id"),
+                *titles,
+                (slug if slug is not None else literal(None)).label("slug"),
+                image.label("image"),
+                func.ts_rank(model.search_vector, query).label("rank")
+            ).where(model.search_vector.op("@@")(query), visible)
+        )
+    hits = union_all(*matches).subquery() if len(matches) > 1 else matches[0].subquery()
+    
+    # count(*) OVER () is evaluated before LIMIT, so it is the total match count
+    rows = await repository.fetch_all(
+        select(hits, func.count().over().label("total"))
+        .order_by(hits.c.rank.desc(), hits.c.type, hits.c.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    if rows:
+        total = rows[0]["total"]
+    else:
+        total = await repository.fetch_val(select(func.count()).select_from(hits)) if skip else 0
+    
+    return {"query": q, "total": total, "skip": skip, "limit": limit, "hits": rows}
+
+@router.get("/search/autocomplete", response_model=List[AutocompleteHit])
+@cached("visa_services", "tour_packages", "umrah_packages", response_model=List[AutocompleteHit])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Typo-tolerant visa country and package name suggestions - Public endpoint
+
+    "thialand" still finds Thailand: names are matched by trigram word
+    similarity (pg_trgm) through GIN trigram indexes, best match first.
+    """
+    matches = []
+    for item_type, (model, columns, label, label_bn) in AUTOCOMPLETE_SOURCES.items():
+        scores = [repository.fuzzy_score(column, q) for column in columns]
+        matches.append(
+            select(
+                literal(item_type).label("type"),
+                model.id.label("id"),
+                label.label("label"),
+                label_bn.label("label_bn"),
+                (func.greatest(*scores) if len(scores) > 1 else scores[0]).label("score")
+            ).where(
+                or_(*[repository.fuzzy_match(column, q) for column in columns]),
+                model.is_available == True
+            )
+        )
+    hits = union_all(*matches).subquery()
+    return await repository.fetch_all_fuzzy(
+        select(hits).order_by(hits.c.score.desc(), hits.c.label).limit(limit)
+    )
+
+@router.get("/suggest", response_model=List[Suggestion])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Search-as-you-type suggestions - Public endpoint
+
+    Package names, visa countries, tour destinations and tags in English and
+    Bengali with a word starting with `q`, served from process memory
+    without touching the database.
+    """
+    return suggest_index.suggest(q, limit)
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
+from app import repository
+from app.cache import cached, invalidate
+from app.localization import language, select_localized
 from app.models import WebsiteSettings, Profile
 from app.schemas import WebsiteSettings as WebsiteSettingsSchema, WebsiteSettingsCreate, WebsiteSettingsUpdate
 from app.auth import require_admin_or_moderator
@@ -10,9 +13,13 @@ from app.auth import require_admin_or_moderator
 router = APIRouter(prefix="/settings", tags=["Website Settings"])
 
 @router.get("/", response_model=WebsiteSettingsSchema)
-def get_settings(db: Session = Depends(get_db)):
-    """Get website settings - Public endpoint"""
-    settings = db.query(WebsiteSettings).first()
+@cached("website_settings", response_model=WebsiteSettingsSchema)
+async def get_settings(lang: Optional[str] = Depends(language)):
+    """Get website settings - Public endpoint
+
+    `lang=en|bn|auto` returns one language under neutral keys.
+    """
+    settings = await repository.fetch_one(select_localized(WebsiteSettings, lang).limit(1))
     if not settings:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,6 +48,7 @@ def update_settings(
             setattr(settings, field, value)
     
     db.commit()
+    invalidate("website_settings")
     db.refresh(settings)
     
     return settings 
\ No newline at end of file
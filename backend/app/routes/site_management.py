@@ -5,6 +5,10 @@ from typing import List, Optional
 from uuid import UUID
 
 from app.config import get_db
+from app import repository
+from app.cache import cached, invalidate
+from app.localization import language, localized_column, select_localized
+from app.pagination import Keyset, page_limit
 from app.auth import require_admin_or_moderator
 from app.models import HeroScene, HeroContent, ContactInfo, ServiceOption, Profile
 from app.schemas import (
@@ -20,7 +24,8 @@ from app.schemas import (
     ServiceOption as ServiceOptionSchema,
     ServiceOptionCreate,
     ServiceOptionUpdate,
-    SiteManagementOverview
+    SiteManagementOverview,
+    Page
 )
 
 router = APIRouter()
@@ -30,24 +35,27 @@ router = APIRouter()
 # ================================
 
 @router.get("/overview", response_model=SiteManagementOverview)
-async def get_site_management_overview(
-    db: Session = Depends(get_db)
-):
+@cached("hero_scenes", "hero_content", "contact_info", "service_options", response_model=SiteManagementOverview)
+async def get_site_management_overview():
     """Get overview statistics for site management dashboard."""
     
     # Hero scenes stats
-    total_hero_scenes = db.query(HeroScene).count()
-    active_hero_scenes = db.query(HeroScene).filter(HeroScene.is_active == True).count()
+    total_hero_scenes = await repository.count(HeroScene)
+    active_hero_scenes = await repository.count(HeroScene, HeroScene.is_active == True)
     
     # Current active hero content
-    current_hero_content = db.query(HeroContent).filter(HeroContent.is_active == True).first()
+    current_hero_content = await repository.fetch_one(
+        repository.select_rows(HeroContent).where(HeroContent.is_active == True).limit(1)
+    )
     
     # Current active contact info
-    current_contact_info = db.query(ContactInfo).filter(ContactInfo.is_active == True).first()
+    current_contact_info = await repository.fetch_one(
+        repository.select_rows(ContactInfo).where(ContactInfo.is_active == True).limit(1)
+    )
     
     # Service options stats
-    total_service_options = db.query(ServiceOption).count()
-    active_service_options = db.query(ServiceOption).filter(ServiceOption.is_active == True).count()
+    total_service_options = await repository.count(ServiceOption)
+    active_service_options = await repository.count(ServiceOption, ServiceOption.is_active == True)
     
     return SiteManagementOverview(
         total_hero_scenes=total_hero_scenes,
@@ -63,45 +71,72 @@ async def get_site_management_overview(
 # ================================
 
 @router.get("/hero-scenes", response_model=List[HeroSceneSchema])
+@cached("hero_scenes", response_model=List[HeroSceneSchema])
 async def get_hero_scenes(
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=500),
+    limit: int = page_limit(100),
     active_only: bool = Query(False),
     order_by: str = Query("order", regex="^(order|name|created_at)$"),
     order_direction: str = Query("asc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get all hero scenes with filtering and sorting options."""
     
-    query = db.query(HeroScene)
+    query = select_localized(HeroScene, lang)
     
     if active_only:
-        query = query.filter(HeroScene.is_active == True)
+        query = query.where(HeroScene.is_active == True)
     
     # Apply ordering
-    order_column = getattr(HeroScene, order_by)
+    _, order_column = localized_column(HeroScene, order_by, lang)
     if order_direction == "desc":
         query = query.order_by(desc(order_column))
     else:
         query = query.order_by(asc(order_column))
     
-    return query.offset(skip).limit(limit).all()
+    return await repository.fetch_all(query.offset(skip).limit(limit))
+
+@router.get("/hero-scenes/page", response_model=Page[HeroSceneSchema])
+@cached("hero_scenes", response_model=Page[HeroSceneSchema])
+async def get_hero_scenes_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    active_only: bool = Query(False),
+    order_by: str = Query("order", regex="^(order|name|created_at)$"),
+    order_direction: str = Query("asc", regex="^(asc|desc)$"),
+    lang: Optional[str] = Depends(language)
+):
+    """Get hero scenes a page at a time, with the same sorting options.
+
+    Pass the returned `next_cursor` as `cursor` to get the next page; it only
+    works with the `order_by` and `order_direction` that produced it.
+    """
+    
+    query = select_localized(HeroScene, lang)
+    
+    if active_only:
+        query = query.where(HeroScene.is_active == True)
+    
+    keyset = Keyset(HeroScene, order_by, descending=order_direction == "desc", lang=lang)
+    rows = await repository.fetch_all(keyset.paginate(query, cursor, limit))
+    return keyset.page(rows, limit)
 
 @router.get("/hero-scenes/{scene_id}", response_model=HeroSceneSchema)
+@cached("hero_scenes", response_model=HeroSceneSchema)
 async def get_hero_scene(
     scene_id: UUID,
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get a specific hero scene by ID."""
     
-    scene = db.query(HeroScene).filter(HeroScene.id == scene_id).first()
+    scene = await repository.fetch_one(select_localized(HeroScene, lang).where(HeroScene.id == scene_id))
     if not scene:
         raise HTTPException(status_code=404, detail="Hero scene not found")
     
     return scene
 
 @router.post("/hero-scenes", response_model=HeroSceneSchema)
-async def create_hero_scene(
+def create_hero_scene(
     scene_data: HeroSceneCreate,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -111,12 +146,13 @@ async def create_hero_scene(
     new_scene = HeroScene(**scene_data.dict())
     db.add(new_scene)
     db.commit()
+    invalidate("hero_scenes")
     db.refresh(new_scene)
     
     return new_scene
 
 @router.put("/hero-scenes/{scene_id}", response_model=HeroSceneSchema)
-async def update_hero_scene(
+def update_hero_scene(
     scene_id: UUID,
     scene_data: HeroSceneUpdate,
     db: Session = Depends(get_db),
@@ -133,12 +169,13 @@ async def update_hero_scene(
         setattr(scene, field, value)
     
     db.commit()
+    invalidate("hero_scenes")
     db.refresh(scene)
     
     return scene
 
 @router.delete("/hero-scenes/{scene_id}")
-async def delete_hero_scene(
+def delete_hero_scene(
     scene_id: UUID,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -151,11 +188,12 @@ async def delete_hero_scene(
     
     db.delete(scene)
     db.commit()
+    invalidate("hero_scenes")
     
     return {"message": "Hero scene deleted successfully"}
 
 @router.post("/hero-scenes/{scene_id}/reorder")
-async def reorder_hero_scene(
+def reorder_hero_scene(
     scene_id: UUID,
     new_order: int,
     db: Session = Depends(get_db),
@@ -183,6 +221,7 @@ async def reorder_hero_scene(
         ).update({HeroScene.order: HeroScene.order + 1})
     
     db.commit()
+    invalidate("hero_scenes")
     db.refresh(scene)
     
     return {"message": "Hero scene reordered successfully", "scene": scene}
@@ -192,46 +231,53 @@ async def reorder_hero_scene(
 # ================================
 
 @router.get("/hero-content", response_model=List[HeroContentSchema])
+@cached("hero_content", response_model=List[HeroContentSchema])
 async def get_hero_content_list(
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
+    limit: int = page_limit(10),
     active_only: bool = Query(False),
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get all hero content entries."""
     
-    query = db.query(HeroContent)
+    query = select_localized(HeroContent, lang)
     
     if active_only:
-        query = query.filter(HeroContent.is_active == True)
+        query = query.where(HeroContent.is_active == True)
     
-    return query.order_by(desc(HeroContent.created_at)).offset(skip).limit(limit).all()
+    return await repository.fetch_all(
+        query.order_by(desc(HeroContent.created_at)).offset(skip).limit(limit)
+    )
 
 @router.get("/hero-content/active", response_model=HeroContentSchema)
-async def get_active_hero_content(db: Session = Depends(get_db)):
+@cached("hero_content", response_model=HeroContentSchema)
+async def get_active_hero_content(lang: Optional[str] = Depends(language)):
     """Get the currently active hero content."""
     
-    content = db.query(HeroContent).filter(HeroContent.is_active == True).first()
+    content = await repository.fetch_one(
+        select_localized(HeroContent, lang).where(HeroContent.is_active == True).limit(1)
+    )
     if not content:
         raise HTTPException(status_code=404, detail="No active hero content found")
     
     return content
 
 @router.get("/hero-content/{content_id}", response_model=HeroContentSchema)
+@cached("hero_content", response_model=HeroContentSchema)
 async def get_hero_content(
     content_id: UUID,
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get specific hero content by ID."""
     
-    content = db.query(HeroContent).filter(HeroContent.id == content_id).first()
+    content = await repository.fetch_one(select_localized(HeroContent, lang).where(HeroContent.id == content_id))
     if not content:
         raise HTTPException(status_code=404, detail="Hero content not found")
     
     return content
 
 @router.post("/hero-content", response_model=HeroContentSchema)
-async def create_hero_content(
+def create_hero_content(
     content_data: HeroContentCreate,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -245,12 +291,13 @@ async def create_hero_content(
     new_content = HeroContent(**content_data.dict())
     db.add(new_content)
     db.commit()
+    invalidate("hero_content")
     db.refresh(new_content)
     
     return new_content
 
 @router.put("/hero-content/{content_id}", response_model=HeroContentSchema)
-async def update_hero_content(
+def update_hero_content(
     content_id: UUID,
     content_data: HeroContentUpdate,
     db: Session = Depends(get_db),
@@ -272,12 +319,13 @@ async def update_hero_content(
         setattr(content, field, value)
     
     db.commit()
+    invalidate("hero_content")
     db.refresh(content)
     
     return content
 
 @router.delete("/hero-content/{content_id}")
-async def delete_hero_content(
+def delete_hero_content(
     content_id: UUID,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -290,6 +338,7 @@ async def delete_hero_content(
     
     db.delete(content)
     db.commit()
+    invalidate("hero_content")
     
     return {"message": "Hero content deleted successfully"}
 
@@ -298,46 +347,53 @@ async def delete_hero_content(
 # ================================
 
 @router.get("/contact-info", response_model=List[ContactInfoSchema])
+@cached("contact_info", response_model=List[ContactInfoSchema])
 async def get_contact_info_list(
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
+    limit: int = page_limit(10),
     active_only: bool = Query(False),
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get all contact info entries."""
     
-    query = db.query(ContactInfo)
+    query = select_localized(ContactInfo, lang)
     
     if active_only:
-        query = query.filter(ContactInfo.is_active == True)
+        query = query.where(ContactInfo.is_active == True)
     
-    return query.order_by(desc(ContactInfo.created_at)).offset(skip).limit(limit).all()
+    return await repository.fetch_all(
+        query.order_by(desc(ContactInfo.created_at)).offset(skip).limit(limit)
+    )
 
 @router.get("/contact-info/active", response_model=ContactInfoSchema)
-async def get_active_contact_info(db: Session = Depends(get_db)):
+@cached("contact_info", response_model=ContactInfoSchema)
+async def get_active_contact_info(lang: Optional[str] = Depends(language)):
     """Get the currently active contact information."""
     
-    contact_info = db.query(ContactInfo).filter(ContactInfo.is_active == True).first()
+    contact_info = await repository.fetch_one(
+        select_localized(ContactInfo, lang).where(ContactInfo.is_active == True).limit(1)
+    )
     if not contact_info:
         raise HTTPException(status_code=404, detail="No active contact info found")
     
     return contact_info
 
 @router.get("/contact-info/{info_id}", response_model=ContactInfoSchema)
+@cached("contact_info", response_model=ContactInfoSchema)
 async def get_contact_info(
     info_id: UUID,
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get specific contact info by ID."""
     
-    contact_info = db.query(ContactInfo).filter(ContactInfo.id == info_id).first()
+    contact_info = await repository.fetch_one(select_localized(ContactInfo, lang).where(ContactInfo.id == info_id))
     if not contact_info:
         raise HTTPException(status_code=404, detail="Contact info not found")
     
     return contact_info
 
 @router.post("/contact-info", response_model=ContactInfoSchema)
-async def create_contact_info(
+def create_contact_info(
     info_data: ContactInfoCreate,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -351,12 +407,13 @@ async def create_contact_info(
     new_info = ContactInfo(**info_data.dict())
     db.add(new_info)
     db.commit()
+    invalidate("contact_info")
     db.refresh(new_info)
     
     return new_info
 
 @router.put("/contact-info/{info_id}", response_model=ContactInfoSchema)
-async def update_contact_info(
+def update_contact_info(
     info_id: UUID,
     info_data: ContactInfoUpdate,
     db: Session = Depends(get_db),
@@ -378,12 +435,13 @@ async def update_contact_info(
         setattr(contact_info, field, value)
     
     db.commit()
+    invalidate("contact_info")
     db.refresh(contact_info)
     
     return contact_info
 
 @router.delete("/contact-info/{info_id}")
-async def delete_contact_info(
+def delete_contact_info(
     info_id: UUID,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -396,6 +454,7 @@ async def delete_contact_info(
     
     db.delete(contact_info)
     db.commit()
+    invalidate("contact_info")
     
     return {"message": "Contact info deleted successfully"}
 
@@ -404,45 +463,72 @@ async def delete_contact_info(
 # ================================
 
 @router.get("/service-options", response_model=List[ServiceOptionSchema])
+@cached("service_options", response_model=List[ServiceOptionSchema])
 async def get_service_options(
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=500),
+    limit: int = page_limit(100),
     active_only: bool = Query(False),
     order_by: str = Query("order", regex="^(order|name_en|created_at)$"),
     order_direction: str = Query("asc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get all service options with filtering and sorting."""
     
-    query = db.query(ServiceOption)
+    query = select_localized(ServiceOption, lang)
     
     if active_only:
-        query = query.filter(ServiceOption.is_active == True)
+        query = query.where(ServiceOption.is_active == True)
     
     # Apply ordering
-    order_column = getattr(ServiceOption, order_by)
+    _, order_column = localized_column(ServiceOption, order_by, lang)
     if order_direction == "desc":
         query = query.order_by(desc(order_column))
     else:
         query = query.order_by(asc(order_column))
     
-    return query.offset(skip).limit(limit).all()
+    return await repository.fetch_all(query.offset(skip).limit(limit))
+
+@router.get("/service-options/page", response_model=Page[ServiceOptionSchema])
+@cached("service_options", response_model=Page[ServiceOptionSchema])
+async def get_service_options_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    active_only: bool = Query(False),
+    order_by: str = Query("order", regex="^(order|name_en|created_at)$"),
+    order_direction: str = Query("asc", regex="^(asc|desc)$"),
+    lang: Optional[str] = Depends(language)
+):
+    """Get service options a page at a time, with the same sorting options.
+
+    Pass the returned `next_cursor` as `cursor` to get the next page; it only
+    works with the `order_by` and `order_direction` that produced it.
+    """
+    
+    query = select_localized(ServiceOption, lang)
+    
+    if active_only:
+        query = query.where(ServiceOption.is_active == True)
+    
+    keyset = Keyset(ServiceOption, order_by, descending=order_direction == "desc", lang=lang)
+    rows = await repository.fetch_all(keyset.paginate(query, cursor, limit))
+    return keyset.page(rows, limit)
 
 @router.get("/service-options/{option_id}", response_model=ServiceOptionSchema)
+@cached("service_options", response_model=ServiceOptionSchema)
 async def get_service_option(
     option_id: UUID,
-    db: Session = Depends(get_db)
+    lang: Optional[str] = Depends(language)
 ):
     """Get specific service option by ID."""
     
-    option = db.query(ServiceOption).filter(ServiceOption.id == option_id).first()
+    option = await repository.fetch_one(select_localized(ServiceOption, lang).where(ServiceOption.id == option_id))
     if not option:
         raise HTTPException(status_code=404, detail="Service option not found")
     
     return option
 
 @router.post("/service-options", response_model=ServiceOptionSchema)
-async def create_service_option(
+def create_service_option(
     option_data: ServiceOptionCreate,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -452,12 +538,13 @@ async def create_service_option(
     new_option = ServiceOption(**option_data.dict())
     db.add(new_option)
     db.commit()
+    invalidate("service_options")
     db.refresh(new_option)
     
     return new_option
 
 @router.put("/service-options/{option_id}", response_model=ServiceOptionSchema)
-async def update_service_option(
+def update_service_option(
     option_id: UUID,
     option_data: ServiceOptionUpdate,
     db: Session = Depends(get_db),
@@ -474,12 +561,13 @@ async def update_service_option(
         setattr(option, field, value)
     
     db.commit()
+    invalidate("service_options")
     db.refresh(option)
     
     return option
 
 @router.delete("/service-options/{option_id}")
-async def delete_service_option(
+def delete_service_option(
     option_id: UUID,
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_admin_or_moderator)
@@ -492,11 +580,12 @@ async def delete_service_option(
     
     db.delete(option)
     db.commit()
+    invalidate("service_options")
     
     return {"message": "Service option deleted successfully"}
 
 @router.post("/service-options/{option_id}/reorder")
-async def reorder_service_option(
+def reorder_service_option(
     option_id: UUID,
     new_order: int,
     db: Session = Depends(get_db),
@@ -524,6 +613,7 @@ async def reorder_service_option(
         ).update({ServiceOption.order: ServiceOption.order + 1})
     
     db.commit()
+    invalidate("service_options")
     db.refresh(option)
     
     return {"message": "Service option reordered successfully", "option": option} 
\ No newline at end of file
@@ -1,34 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from app.config import get_db
+from app import recommendation_store, repository
+from app.cache import cached, invalidate
+from app.pagination import Keyset, page_limit
+from app.localization import language, select_localized
+from app.projection import parse_fields
+from app.suggest_index import suggest_index
+from app.tag_index import tag_index
 from app.models import TourPackage, Profile
-from app.schemas import TourPackage as TourPackageSchema, TourPackageCreate, TourPackageUpdate
+from app.schemas import TourPackage as TourPackageSchema, TourPackageCreate, TourPackageUpdate, TourPackageCard, TourPackageFields, Page
 from app.auth import require_admin_or_moderator
 
 router = APIRouter(prefix="/tour-packages", tags=["Tour Packages"])
 
-@router.get("/", response_model=List[TourPackageSchema])
-def get_tour_packages(
-    skip: int = 0,
-    limit: int = 100,
-    available_only: bool = False,
-    featured_only: bool = False,
-    db: Session = Depends(get_db)
+NEWEST_FIRST = Keyset(TourPackage, "created_at", descending=True)
+
+# `fields` presets
+FIELD_PRESETS = {"card": tuple(TourPackageCard.model_fields)}
+
+def _list_query(
+    available_only: bool,
+    featured_only: bool,
+    columns: Optional[Tuple[str, ...]] = None,
+    lang: Optional[str] = None
 ):
-    """Get tour packages - Public endpoint"""
-    query = db.query(TourPackage)
+    query = select_localized(TourPackage, lang, columns)
     
     if available_only:
-        query = query.filter(TourPackage.is_available == True)
+        query = query.where(TourPackage.is_available == True)
     
     if featured_only:
-        query = query.filter(TourPackage.is_featured == True)
+        query = query.where(TourPackage.is_featured == True)
     
-    packages = query.offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[TourPackageSchema], response_model_exclude_unset=True)
+@cached("tour_packages", response_model=List[TourPackageFields], exclude_unset=True)
+async def get_tour_packages(
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
+    available_only: bool = False,
+    featured_only: bool = False,
+    fields: Optional[str] = None,
+    lang: Optional[str] = Depends(language)
+):
+    """Get tour packages - Public endpoint
+
+    `fields=card` returns only what a listing card shows; `fields` also
+    takes a comma-separated list of columns. `id` is always included.
+    `lang=en|bn|auto` returns one language under neutral keys.
+    """
+    columns = parse_fields(fields, TourPackageSchema, FIELD_PRESETS)
+    packages = await repository.fetch_all(
+        _list_query(available_only, featured_only, columns, lang).offset(skip).limit(limit)
+    )
     return packages
 
+@router.get("/page", response_model=Page[TourPackageSchema], response_model_exclude_unset=True)
+@cached("tour_packages", response_model=Page[TourPackageFields], exclude_unset=True)
+async def get_tour_packages_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    available_only: bool = False,
+    featured_only: bool = False,
+    fields: Optional[str] = None,
+    lang: Optional[str] = Depends(language)
+):
+    """Get tour packages newest first, a page at a time - Public endpoint
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    `fields` and `lang` work as on the list endpoint; `created_at` is
+    always included.
+    """
+    columns = parse_fields(fields, TourPackageSchema, FIELD_PRESETS, required=("id", "created_at"))
+    rows = await repository.fetch_all(
+        NEWEST_FIRST.paginate(_list_query(available_only, featured_only, columns, lang), cursor, limit)
+    )
+    return NEWEST_FIRST.page(rows, limit)
+
 @router.post("/", response_model=TourPackageSchema)
 def create_tour_package(
     package: TourPackageCreate,
@@ -40,12 +92,17 @@ def create_tour_package(
     db.add(db_package)
     db.commit()
     db.refresh(db_package)
+    tag_index.index_item("tour", db_package)
+    suggest_index.index_item("tour", db_package)
+    recommendation_store.refresh_item("tour", db_package.id)
+    invalidate("tour_packages")
     return db_package
 
 @router.get("/{package_id}", response_model=TourPackageSchema)
-def get_tour_package(package_id: UUID, db: Session = Depends(get_db)):
+@cached("tour_packages", response_model=TourPackageSchema)
+async def get_tour_package(package_id: UUID, lang: Optional[str] = Depends(language)):
     """Get single tour package - Public endpoint"""
-    package = db.query(TourPackage).filter(TourPackage.id == package_id).first()
+    package = await repository.fetch_one(select_localized(TourPackage, lang).where(TourPackage.id == package_id))
     if not package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,6 +131,10 @@ def update_tour_package(
     
     db.commit()
     db.refresh(package)
+    tag_index.index_item("tour", package)
+    suggest_index.index_item("tour", package)
+    recommendation_store.refresh_item("tour", package.id)
+    invalidate("tour_packages")
     return package
 
 @router.delete("/{package_id}")
@@ -92,57 +153,57 @@ def delete_tour_package(
     
     db.delete(package)
     db.commit()
+    tag_index.remove_item("tour", package_id)
+    suggest_index.remove_item("tour", package_id)
+    recommendation_store.refresh_item("tour", package_id)
+    invalidate("tour_packages")
     return {"message": "Tour package deleted successfully"}
 
 @router.get("/{package_id}/similar", response_model=List[TourPackageSchema])
-def get_similar_tour_packages(
+@cached("tour_packages", response_model=List[TourPackageSchema])
+async def get_similar_tour_packages(
     package_id: UUID, 
-    limit: int = 4,
-    db: Session = Depends(get_db)
+    limit: int = page_limit(4),
+    lang: Optional[str] = Depends(language)
 ):
     """Get similar tour packages based on tags - Public endpoint"""
     # Get the current package
-    current_package = db.query(TourPackage).filter(TourPackage.id == package_id).first()
+    current_package = await repository.get_by_id(TourPackage, package_id)
     if not current_package:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tour package not found"
         )
     
-    if not current_package.tags:
+    if not current_package["tags"]:
         # If no tags, return random available packages
-        similar_packages = db.query(TourPackage).filter(
-            TourPackage.id != package_id,
-            TourPackage.is_available == True
-        ).limit(limit).all()
+        similar_packages = await repository.fetch_all(
+            select_localized(TourPackage, lang).where(
+                TourPackage.id != package_id,
+                TourPackage.is_available == True
+            ).limit(limit)
+        )
         return similar_packages
     
-    # Find packages with matching tags
-    similar_packages = db.query(TourPackage).filter(
+    # Score by shared tags in Postgres; only the top `limit` rows come back
+    return await repository.fetch_top_by_shared_tags(
+        TourPackage,
+        current_package["tags"],
+        limit,
         TourPackage.id != package_id,
-        TourPackage.is_available == True
-    ).all()
-    
-    # Calculate similarity score based on matching tags
-    scored_packages = []
-    for package in similar_packages:
-        if package.tags:
-            # Count matching tags
-            matching_tags = set(current_package.tags) & set(package.tags)
-            score = len(matching_tags)
-            if score > 0:
-                scored_packages.append((package, score))
-    
-    # Sort by score (descending) and return top results
-    scored_packages.sort(key=lambda x: x[1], reverse=True)
-    return [package for package, score in scored_packages[:limit]]
+        TourPackage.is_available == True,
+        query=select_localized(TourPackage, lang)
+    )
 
 @router.get("/tags/all")
-def get_all_tour_tags(db: Session = Depends(get_db)):
+@cached("tour_packages")
+async def get_all_tour_tags():
     """Get all unique tour package tags - Public endpoint"""
-    packages = db.query(TourPackage).filter(TourPackage.tags.isnot(None)).all()
+    packages = await repository.fetch_all(
+        repository.select_rows(TourPackage, TourPackage.tags).where(TourPackage.tags.isnot(None))
+    )
     all_tags = set()
     for package in packages:
-        if package.tags:
-            all_tags.update(package.tags)
+        if package["tags"]:
+            all_tags.update(package["tags"])
     return {"tags": list(all_tags)} 
\ No newline at end of file
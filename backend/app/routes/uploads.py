@@ -1,17 +1,20 @@
+import asyncio
 import os
+import re
+import tempfile
 import uuid
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Tuple
 from pathlib import Path
 import aiofiles
-from PIL import Image
-import io
 from decouple import config
 
-from app.config import get_db
+from app.config import IMAGE_AVIF, IMAGE_VARIANT_WIDTHS, get_db
 from app.auth import require_admin_or_moderator
+from app.image_pool import image_pool
+from app.imaging import AVIF_SUPPORTED, ConversionError, InvalidImage, Rendition, remove_renditions, transcode_upload
 from app.models import Profile
 
 router = APIRouter(prefix="/uploads", tags=["File Uploads"])
@@ -29,12 +32,13 @@ except Exception as e:
 # Allowed image types
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tiff"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB (increased for high-res images)
-MAX_DIMENSION = 4096  # Maximum width/height for images
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes copied at a time when staging an upload
 
-# WebP conversion settings
-WEBP_QUALITY = 85  # Quality for WebP conversion (0-100)
-WEBP_LOSSLESS = False  # Use lossless compression for better quality
-WEBP_METHOD = 6  # Compression method (0-6, higher = better compression but slower)
+# Every upload is stored as `<stem>.webp` plus `<stem>-<width>w.webp` variants
+# for srcset, and `.avif` twins of all of them when enabled
+if IMAGE_AVIF and not AVIF_SUPPORTED:
+    print("Warning: IMAGE_AVIF is set but Pillow has no AVIF encoder (pip install pillow-avif-plugin); storing WebP only")
+AVIF_RENDITIONS = IMAGE_AVIF and AVIF_SUPPORTED
 
 # Get base URL from environment or detect automatically
 def get_base_url():
@@ -62,89 +66,91 @@ def validate_image_file(file: UploadFile) -> None:
             detail=f"File type {file_ext} not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Check file size
+    # Check file size (when the client declared it; enforced while staging)
     if file.size and file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File size too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-        )
+        raise file_too_large()
 
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate unique filename with .webp extension"""
-    unique_id = str(uuid.uuid4())
-    return f"{unique_id}.webp"
+def file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File size too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
+    )
 
-def convert_to_webp(image_content: bytes, original_filename: str) -> bytes:
-    """Convert image to WebP format with optimization"""
-    try:
-        # Open image with Pillow
-        image = Image.open(io.BytesIO(image_content))
-        
-        # Convert RGBA to RGB if necessary (WebP doesn't support RGBA well)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Create white background for transparent images
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Resize if image is too large
-        if max(image.size) > MAX_DIMENSION:
-            # Calculate new dimensions maintaining aspect ratio
-            ratio = MAX_DIMENSION / max(image.size)
-            new_size = tuple(int(dim * ratio) for dim in image.size)
-            image = image.resize(new_size, Image.Resampling.LANCZOS)
-            print(f"Resized image from {image.size} to {new_size}")
-        
-        # Convert to WebP
-        webp_buffer = io.BytesIO()
-        
-        # Use optimized WebP settings
-        webp_options = {
-            'quality': WEBP_QUALITY,
-            'lossless': WEBP_LOSSLESS,
-            'method': WEBP_METHOD,
-            'optimize': True
-        }
-        
-        image.save(webp_buffer, format='WEBP', **webp_options)
-        webp_content = webp_buffer.getvalue()
-        
-        # Log conversion details
-        original_size = len(image_content)
-        webp_size = len(webp_content)
-        compression_ratio = (1 - webp_size / original_size) * 100
-        
-        print(f"Image converted to WebP: {original_filename}")
-        print(f"Original size: {original_size / 1024:.1f}KB")
-        print(f"WebP size: {webp_size / 1024:.1f}KB")
-        print(f"Compression: {compression_ratio:.1f}%")
-        
-        return webp_content
-        
-    except Exception as e:
-        print(f"Error converting image to WebP: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to convert image to WebP: {str(e)}"
-        )
+async def stage_upload(file: UploadFile) -> Tuple[Path, int]:
+    """Copy an upload to a temporary file in chunks; returns (path, size)
 
-def optimize_image_metadata(image_content: bytes) -> bytes:
-    """Optimize image metadata and strip unnecessary information"""
+    The image pool's processes decode from this path, so the upload is never
+    held in memory as a whole. Raises 400 as soon as it passes MAX_FILE_SIZE,
+    whatever size the client declared.
+    """
+    descriptor, name = tempfile.mkstemp(prefix="upload-", suffix=Path(file.filename).suffix.lower())
+    os.close(descriptor)
+    path = Path(name)
+    size = 0
     try:
-        image = Image.open(io.BytesIO(image_content))
-        
-        # Create a new image with minimal metadata
-        optimized_buffer = io.BytesIO()
-        image.save(optimized_buffer, format='WEBP', optimize=True)
-        
-        return optimized_buffer.getvalue()
-    except Exception as e:
-        print(f"Warning: Could not optimize image metadata: {e}")
-        return image_content
+        async with aiofiles.open(path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise file_too_large()
+                await f.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path, size
+
+def generate_unique_stem() -> str:
+    """Generate the unique base name shared by an upload's files"""
+    return str(uuid.uuid4())
+
+def transcode(source: Path, original_filename: str, stem: str) -> List[Rendition]:
+    """Convert a staged upload in the image process pool, writing its renditions as `stem`"""
+    return image_pool.run(
+        transcode_upload, str(source), original_filename, str(UPLOAD_DIR / stem), IMAGE_VARIANT_WIDTHS, AVIF_RENDITIONS
+    )
+
+def rendition_paths(filename: str) -> List[Path]:
+    """`filename` and, for a full-size upload, all of its other renditions"""
+    stem = Path(filename).stem
+    names = re.compile(rf"{re.escape(stem)}(-\d+w)?\.(webp|avif)")
+    return [UPLOAD_DIR / filename] + sorted(
+        path for path in UPLOAD_DIR.glob(f"{stem}*")
+        if path.name != filename and names.fullmatch(path.name)
+    )
+
+def upload_details(base_url: str, stem: str, original_filename: str, original_size: int, renditions: List[Rendition]) -> dict:
+    """Response entry for one stored upload
+
+    `srcset` holds a ready-made srcset attribute per format, narrowest first.
+    """
+    full_size = renditions[0]
+    filename = full_size.filename(stem)
+    variants = [
+        {
+            "url": f"{base_url}/static/uploads/{rendition.filename(stem)}",
+            "width": rendition.width,
+            "height": rendition.height,
+            "format": rendition.format,
+            "size": rendition.size
+        }
+        for rendition in sorted(renditions, key=lambda rendition: (rendition.format != "webp", rendition.width))
+    ]
+    srcset = {}
+    for variant in variants:
+        srcset.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+    return {
+        "filename": filename,
+        "original_filename": original_filename,
+        "url": f"{base_url}/static/uploads/{filename}",
+        "size": full_size.size,
+        "format": "webp",
+        "width": full_size.width,
+        "height": full_size.height,
+        "original_size": original_size,
+        "compression_ratio": round((1 - full_size.size / original_size) * 100, 1),
+        "variants": variants,
+        "srcset": {image_format: ", ".join(candidates) for image_format, candidates in srcset.items()}
+    }
 
 @router.post("/image")
 async def upload_image(
@@ -152,60 +158,51 @@ async def upload_image(
     file: UploadFile = File(...),
     current_user: Profile = Depends(require_admin_or_moderator)
 ):
-    """Upload a single image file and convert to WebP - Requires admin/moderator access"""
+    """Upload a single image file and convert to WebP - Requires admin/moderator access
+
+    Transcoding runs in the image process pool; answers 503 with Retry-After
+    while its queue is full.
+    """
     
     # Validate the uploaded file
     validate_image_file(file)
     
-    # Generate unique filename (always .webp extension)
-    filename = generate_unique_filename(file.filename)
-    file_path = UPLOAD_DIR / filename
+    # Generate unique base name for the upload's files
+    stem = generate_unique_stem()
+    staged = None
     
     try:
-        # Read the uploaded file
-        content = await file.read()
-        
-        # Validate it's a real image file
-        try:
-            test_image = Image.open(io.BytesIO(content))
-            test_image.verify()
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid image file"
-            )
-        
-        # Convert to WebP
-        webp_content = convert_to_webp(content, file.filename)
+        # Stream the uploaded file to disk
+        staged, size = await stage_upload(file)
         
-        # Optimize metadata
-        optimized_content = optimize_image_metadata(webp_content)
-        
-        # Save the WebP file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(optimized_content)
+        # Validate, convert to WebP (plus variants) and save, off the event loop
+        with image_pool.reserve():
+            renditions = await transcode(staged, file.filename, stem)
         
         # Return the URL to access the file - derive from incoming request to respect proxy domain
         base_url = str(request.base_url).rstrip('/')
-        file_url = f"{base_url}/static/uploads/{filename}"
-        
-        return {
-            "filename": filename,
-            "original_filename": file.filename,
-            "url": file_url,
-            "size": len(optimized_content),
-            "format": "webp",
-            "original_size": len(content),
-            "compression_ratio": round((1 - len(optimized_content) / len(content)) * 100, 1)
-        }
+        return upload_details(base_url, stem, file.filename, size, renditions)
         
     except HTTPException:
         raise
+    except InvalidImage:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image file"
+        )
+    except ConversionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to convert image to WebP: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
+    finally:
+        if staged is not None:
+            staged.unlink(missing_ok=True)
 
 @router.post("/images")
 async def upload_multiple_images(
@@ -213,7 +210,11 @@ async def upload_multiple_images(
     files: List[UploadFile] = File(...),
     current_user: Profile = Depends(require_admin_or_moderator)
 ):
-    """Upload multiple image files and convert to WebP - Requires admin/moderator access"""
+    """Upload multiple image files and convert to WebP - Requires admin/moderator access
+
+    The files are transcoded in parallel in the image process pool, and
+    kept only if every one of them converts.
+    """
     
     if len(files) > 10:  # Limit to 10 files at once
         raise HTTPException(
@@ -221,60 +222,53 @@ async def upload_multiple_images(
             detail="Too many files. Maximum 10 files allowed"
         )
     
-    uploaded_files = []
+    for file in files:
+        validate_image_file(file)
+    
     base_url = str(request.base_url).rstrip('/')
+    staged = []
     
-    for file in files:
-        try:
-            # Validate the uploaded file
-            validate_image_file(file)
-            
-            # Generate unique filename (always .webp extension)
-            filename = generate_unique_filename(file.filename)
-            file_path = UPLOAD_DIR / filename
-            
-            # Read the uploaded file
-            content = await file.read()
-            
-            # Validate it's a real image file
-            try:
-                test_image = Image.open(io.BytesIO(content))
-                test_image.verify()
-            except Exception:
+    try:
+        # Stream the uploaded files to disk
+        for file in files:
+            staged.append(await stage_upload(file))
+        stems = [generate_unique_stem() for _ in files]
+        
+        # One queue slot per file, claimed together
+        with image_pool.reserve(len(files)):
+            results = await asyncio.gather(
+                *(transcode(path, file.filename, stem) for file, (path, _), stem in zip(files, staged, stems)),
+                return_exceptions=True
+            )
+        
+        for file, result in zip(files, results):
+            if isinstance(result, BaseException):
+                # Take back the files already stored for the others
+                for stem, renditions in zip(stems, results):
+                    if not isinstance(renditions, BaseException):
+                        remove_renditions(str(UPLOAD_DIR / stem), renditions)
+                if isinstance(result, InvalidImage):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Invalid image file: {file.filename}"
+                    )
+                if isinstance(result, ConversionError):
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Failed to convert image to WebP: {str(result)}"
+                    )
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid image file: {file.filename}"
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to upload file {file.filename}: {str(result)}"
                 )
-            
-            # Convert to WebP
-            webp_content = convert_to_webp(content, file.filename)
-            
-            # Optimize metadata
-            optimized_content = optimize_image_metadata(webp_content)
-            
-            # Save the WebP file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(optimized_content)
-            
-            # Add to results - use consistent URL format
-            file_url = f"{base_url}/static/uploads/{filename}"
-            uploaded_files.append({
-                "filename": filename,
-                "original_filename": file.filename,
-                "url": file_url,
-                "size": len(optimized_content),
-                "format": "webp",
-                "original_size": len(content),
-                "compression_ratio": round((1 - len(optimized_content) / len(content)) * 100, 1)
-            })
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload file {file.filename}: {str(e)}"
-            )
+    finally:
+        for path, _ in staged:
+            path.unlink(missing_ok=True)
+    
+    uploaded_files = [
+        upload_details(base_url, stem, file.filename, size, renditions)
+        for file, (_, size), stem, renditions in zip(files, staged, stems, results)
+    ]
     
     return {
         "uploaded_files": uploaded_files,
@@ -300,7 +294,7 @@ async def delete_file(
     filename: str,
     current_user: Profile = Depends(require_admin_or_moderator)
 ):
-    """Delete uploaded file - Requires admin/moderator access"""
+    """Delete uploaded file and its variants - Requires admin/moderator access"""
     file_path = UPLOAD_DIR / filename
     
     if not file_path.exists():
@@ -310,7 +304,8 @@ async def delete_file(
         )
     
     try:
-        file_path.unlink()
+        for path in rendition_paths(filename):
+            path.unlink(missing_ok=True)
         return {"message": f"File {filename} deleted successfully"}
     except Exception as e:
         raise HTTPException(
@@ -326,12 +321,12 @@ async def get_upload_stats(current_user: Profile = Depends(require_admin_or_mode
         total_size = 0
         file_types = {}
         
-        for file_path in UPLOAD_DIR.glob("*.webp"):
+        for file_path in [*UPLOAD_DIR.glob("*.webp"), *UPLOAD_DIR.glob("*.avif")]:
             if file_path.is_file():
                 total_files += 1
                 total_size += file_path.stat().st_size
                 
-                # Count file types (though all should be .webp now)
+                # Count file types (.webp, and .avif when enabled)
                 ext = file_path.suffix.lower()
                 file_types[ext] = file_types.get(ext, 0) + 1
         
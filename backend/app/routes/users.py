@@ -1,24 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
 from app.models import Profile
-from app.schemas import Profile as ProfileSchema, ProfileCreate, ProfileUpdate, PasswordChange
+from app.pagination import Keyset, page_limit
+from app.schemas import Profile as ProfileSchema, ProfileCreate, ProfileUpdate, PasswordChange, Page
 from app.auth import get_password_hash, require_super_admin, get_current_active_user
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+OLDEST_FIRST = Keyset(Profile, "created_at")
+
 @router.get("/", response_model=List[ProfileSchema])
 def get_users(
-    skip: int = 0, 
-    limit: int = 100, 
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
     db: Session = Depends(get_db),
     current_user: Profile = Depends(require_super_admin)
 ):
     users = db.query(Profile).offset(skip).limit(limit).all()
     return users
 
+@router.get("/page", response_model=Page[ProfileSchema])
+def get_users_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    db: Session = Depends(get_db),
+    current_user: Profile = Depends(require_super_admin)
+):
+    """Get users oldest first, a page at a time
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    return OLDEST_FIRST.page(OLDEST_FIRST.paginate(db.query(Profile), cursor, limit).all(), limit)
+
 @router.get("/me", response_model=ProfileSchema)
 def get_current_user_profile(current_user: Profile = Depends(get_current_active_user)):
     return current_user
@@ -1,46 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from app.config import get_db
+from app import recommendation_store, repository
+from app.cache import cached, invalidate
+from app.localization import language, select_localized
+from app.pagination import Keyset, page_limit
+from app.suggest_index import suggest_index
+from app.tag_index import tag_index
 from app.models import VisaService, Profile
-from app.schemas import VisaService as VisaServiceSchema, VisaServiceCreate, VisaServiceUpdate
+from app.schemas import VisaService as VisaServiceSchema, VisaServiceCreate, VisaServiceUpdate, Page
 from app.auth import require_admin_or_moderator
 
 router = APIRouter(prefix="/visa-services", tags=["Visa Services"])
 
-@router.get("/", response_model=List[VisaServiceSchema])
-def get_visa_services(
-    skip: int = 0,
-    limit: int = 100,
-    available_only: bool = False,
-    featured_only: bool = False,
-    country: str = None,
-    tags: List[str] = None,
-    db: Session = Depends(get_db)
+NEWEST_FIRST = Keyset(VisaService, "created_at", descending=True)
+
+def _list_query(
+    available_only: bool,
+    featured_only: bool,
+    country: Optional[str],
+    tags: Optional[List[str]],
+    lang: Optional[str] = None
 ):
-    """Get visa services - Public endpoint"""
-    query = db.query(VisaService)
+    query = select_localized(VisaService, lang)
     
     if available_only:
-        query = query.filter(VisaService.is_available == True)
+        query = query.where(VisaService.is_available == True)
     
     if featured_only:
-        query = query.filter(VisaService.is_featured == True)
+        query = query.where(VisaService.is_featured == True)
     
     if country:
-        query = query.filter(
+        query = query.where(
             VisaService.country_name.ilike(f"%{country}%") |
             VisaService.country_name_bn.ilike(f"%{country}%")
         )
     
     if tags:
         for tag in tags:
-            query = query.filter(VisaService.tags.any(tag))
+            query = query.where(VisaService.tags.any(tag))
     
-    services = query.offset(skip).limit(limit).all()
+    return query
+
+@router.get("/", response_model=List[VisaServiceSchema])
+@cached("visa_services", response_model=List[VisaServiceSchema])
+async def get_visa_services(
+    skip: int = Query(0, ge=0),
+    limit: int = page_limit(100),
+    available_only: bool = False,
+    featured_only: bool = False,
+    country: str = None,
+    tags: List[str] = Query(None),
+    lang: Optional[str] = Depends(language)
+):
+    """Get visa services - Public endpoint
+
+    `lang=en|bn|auto` returns one language under neutral keys.
+    """
+    services = await repository.fetch_all(
+        _list_query(available_only, featured_only, country, tags, lang).offset(skip).limit(limit)
+    )
     return services
 
+@router.get("/page", response_model=Page[VisaServiceSchema])
+@cached("visa_services", response_model=Page[VisaServiceSchema])
+async def get_visa_services_page(
+    cursor: Optional[str] = None,
+    limit: int = page_limit(),
+    available_only: bool = False,
+    featured_only: bool = False,
+    country: str = None,
+    tags: List[str] = Query(None),
+    lang: Optional[str] = Depends(language)
+):
+    """Get visa services newest first, a page at a time - Public endpoint
+
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    rows = await repository.fetch_all(
+        NEWEST_FIRST.paginate(_list_query(available_only, featured_only, country, tags, lang), cursor, limit)
+    )
+    return NEWEST_FIRST.page(rows, limit)
+
 @router.post("/", response_model=VisaServiceSchema)
 def create_visa_service(
     service: VisaServiceCreate,
@@ -52,12 +95,17 @@ def create_visa_service(
     db.add(db_service)
     db.commit()
     db.refresh(db_service)
+    tag_index.index_item("visa", db_service)
+    suggest_index.index_item("visa", db_service)
+    recommendation_store.refresh_item("visa", db_service.id)
+    invalidate("visa_services")
     return db_service
 
 @router.get("/{service_id}", response_model=VisaServiceSchema)
-def get_visa_service(service_id: UUID, db: Session = Depends(get_db)):
+@cached("visa_services", response_model=VisaServiceSchema)
+async def get_visa_service(service_id: UUID, lang: Optional[str] = Depends(language)):
     """Get single visa service - Public endpoint"""
-    service = db.query(VisaService).filter(VisaService.id == service_id).first()
+    service = await repository.fetch_one(select_localized(VisaService, lang).where(VisaService.id == service_id))
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,11 +114,24 @@ def get_visa_service(service_id: UUID, db: Session = Depends(get_db)):
     return service
 
 @router.get("/country/{country_name}", response_model=VisaServiceSchema)
-def get_visa_service_by_country(country_name: str, db: Session = Depends(get_db)):
+@cached("visa_services", response_model=VisaServiceSchema)
+async def get_visa_service_by_country(country_name: str, lang: Optional[str] = Depends(language)):
     """Get visa service by country name - Public endpoint"""
-    service = db.query(VisaService).filter(
-        VisaService.country_name.ilike(f"%{country_name}%")
-    ).first()
+    service = await repository.fetch_one(
+        select_localized(VisaService, lang).where(
+            VisaService.country_name.ilike(f"%{country_name}%")
+        ).limit(1)
+    )
+    if not service:
+        # Probably misspelled: take the closest country name, if any is close
+        closest = await repository.fetch_all_fuzzy(
+            select_localized(VisaService, lang).where(
+                repository.fuzzy_match(VisaService.country_name, country_name)
+            ).order_by(
+                repository.fuzzy_score(VisaService.country_name, country_name).desc()
+            ).limit(1)
+        )
+        service = closest[0] if closest else None
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,6 +160,10 @@ def update_visa_service(
     
     db.commit()
     db.refresh(service)
+    tag_index.index_item("visa", service)
+    suggest_index.index_item("visa", service)
+    recommendation_store.refresh_item("visa", service.id)
+    invalidate("visa_services")
     return service
 
 @router.delete("/{service_id}")
@@ -117,65 +182,75 @@ def delete_visa_service(
     
     db.delete(service)
     db.commit()
+    tag_index.remove_item("visa", service_id)
+    suggest_index.remove_item("visa", service_id)
+    recommendation_store.refresh_item("visa", service_id)
+    invalidate("visa_services")
     return {"message": "Visa service deleted successfully"}
 
 @router.get("/tags/all")
-def get_all_visa_tags(db: Session = Depends(get_db)):
+@cached("visa_services")
+async def get_all_visa_tags():
     """Get all unique visa tags - Public endpoint"""
-    services = db.query(VisaService).filter(VisaService.tags.isnot(None)).all()
+    services = await repository.fetch_all(
+        repository.select_rows(VisaService, VisaService.tags).where(VisaService.tags.isnot(None))
+    )
     all_tags = set()
     for service in services:
-        if service.tags:
-            all_tags.update(service.tags)
+        if service["tags"]:
+            all_tags.update(service["tags"])
     return {"tags": list(all_tags)}
 
 @router.get("/countries/all")
-def get_all_countries(db: Session = Depends(get_db)):
+@cached("visa_services")
+async def get_all_countries(lang: Optional[str] = Depends(language)):
     """Get all countries with visa services - Public endpoint"""
-    services = db.query(VisaService).filter(VisaService.is_available == True).all()
-    countries = [{"name": service.country_name, "name_bn": service.country_name_bn, "flag": service.country_flag} 
-                for service in services]
+    services = await repository.fetch_all(
+        select_localized(
+            VisaService,
+            lang,
+            ("country_name", "country_name_bn", "country_flag")
+        ).where(VisaService.is_available == True)
+    )
+    if lang:
+        countries = [{"name": service["country_name"], "flag": service["country_flag"]} for service in services]
+    else:
+        countries = [{"name": service["country_name"], "name_bn": service["country_name_bn"], "flag": service["country_flag"]} 
+                    for service in services]
     return {"countries": countries}
 
 @router.get("/{service_id}/similar", response_model=List[VisaServiceSchema])
-def get_similar_visa_services(
+@cached("visa_services", response_model=List[VisaServiceSchema])
+async def get_similar_visa_services(
     service_id: UUID, 
-    limit: int = 4,
-    db: Session = Depends(get_db)
+    limit: int = page_limit(4),
+    lang: Optional[str] = Depends(language)
 ):
     """Get similar visa services based on tags - Public endpoint"""
     # Get the current service
-    current_service = db.query(VisaService).filter(VisaService.id == service_id).first()
+    current_service = await repository.get_by_id(VisaService, service_id)
     if not current_service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visa service not found"
         )
     
-    if not current_service.tags:
+    if not current_service["tags"]:
         # If no tags, return random available services
-        similar_services = db.query(VisaService).filter(
-            VisaService.id != service_id,
-            VisaService.is_available == True
-        ).limit(limit).all()
+        similar_services = await repository.fetch_all(
+            select_localized(VisaService, lang).where(
+                VisaService.id != service_id,
+                VisaService.is_available == True
+            ).limit(limit)
+        )
         return similar_services
     
-    # Find services with matching tags
-    similar_services = db.query(VisaService).filter(
+    # Score by shared tags in Postgres; only the top `limit` rows come back
+    return await repository.fetch_top_by_shared_tags(
+        VisaService,
+        current_service["tags"],
+        limit,
         VisaService.id != service_id,
-        VisaService.is_available == True
-    ).all()
-    
-    # Calculate similarity score based on matching tags
-    scored_services = []
-    for service in similar_services:
-        if service.tags:
-            # Count matching tags
-            matching_tags = set(current_service.tags) & set(service.tags)
-            score = len(matching_tags)
-            if score > 0:
-                scored_services.append((service, score))
-    
-    # Sort by score (descending) and return top results
-    scored_services.sort(key=lambda x: x[1], reverse=True)
-    return [service for service, score in scored_services[:limit]]
+        VisaService.is_available == True,
+        query=select_localized(VisaService, lang)
+    )
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, create_model, validator
+from typing import Optional, List, Dict, Any, Generic, Literal, Type, TypeVar
 from datetime import datetime, date
 from uuid import UUID
+from app.config import RECOMMENDATION_TOP_N
 from app.models import UserRole, PackageType
 from decimal import Decimal
 
@@ -98,7 +99,7 @@ class HomepageBannerUpdate(BaseModel):
     title_bn: Optional[str] = None
     subtitle: Optional[str] = None
     subtitle_bn: Optional[str] = None
-    order: Optional[int] = None
+    order: int = None  # May be left out, but not null: the column is NOT NULL
     is_active: Optional[bool] = None
 
 class HomepageBanner(HomepageBannerBase):
@@ -225,6 +226,46 @@ class UmrahPackage(UmrahPackageBase):
     class Config:
         from_attributes = True
 
+# Listing-card views of the catalogue (`fields=card`): what a card shows,
+# without itineraries, inclusions or package details
+class TourPackageCard(BaseModel):
+    id: UUID
+    name: str
+    name_bn: Optional[str] = None
+    destinations: Optional[str] = None
+    destinations_bn: Optional[str] = None
+    price: Optional[Decimal] = None
+    duration: Optional[str] = None
+    cover_photo: Optional[str] = None
+    is_available: bool = True
+    is_featured: bool = False
+
+class UmrahPackageCard(BaseModel):
+    id: UUID
+    name: str
+    name_bn: Optional[str] = None
+    duration: Optional[str] = None
+    travel_dates: Optional[str] = None
+    price: Optional[Decimal] = None
+    package_type: PackageType = PackageType.group
+    cover_photo: Optional[str] = None
+    is_available: bool = True
+    is_featured: bool = False
+
+def sparse_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Twin of `model` with every field optional, for `fields=` projections
+
+    Serialize it with exclude_unset so only the selected columns are emitted;
+    a full row still serializes exactly like `model`.
+    """
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (Optional[field.annotation], None) for name, field in model.model_fields.items()}
+    )
+
+TourPackageFields = sparse_model(TourPackage)
+UmrahPackageFields = sparse_model(UmrahPackage)
+
 # Flight Deal schemas
 class FlightDealBase(BaseModel):
     airline_name: str
@@ -391,7 +432,7 @@ class HeroSceneUpdate(BaseModel):
     name_bn: Optional[str] = None
     image_url: Optional[str] = None
     gradient_class: Optional[str] = None
-    order: Optional[int] = None
+    order: int = None  # May be left out, but not null: the column is NOT NULL
     is_active: Optional[bool] = None
 
 class HeroScene(HeroSceneBase):
@@ -500,7 +541,7 @@ class ServiceOptionUpdate(BaseModel):
     description_bn: Optional[str] = None
     icon: Optional[str] = None
     is_active: Optional[bool] = None
-    order: Optional[int] = None
+    order: int = None  # May be left out, but not null: the column is NOT NULL
 
 class ServiceOption(ServiceOptionBase):
     id: UUID
@@ -520,4 +561,100 @@ class SiteManagementOverview(BaseModel):
     active_service_options: int
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class PopularItems(BaseModel):
+    visas: List[VisaService]
+    tours: List[TourPackage]
+    umrah: List[UmrahPackage]
+
+class PopularRecommendations(BaseModel):
+    popular: PopularItems
+
+class RecommendationSource(BaseModel):
+    type: str
+    id: str
+    tags: List[str]
+
+class MixedRecommendations(BaseModel):
+    current_item: RecommendationSource
+    recommendations: PopularItems
+
+class TagRecommendations(BaseModel):
+    tags: List[str]
+    results: PopularItems
+
+class BootstrapPayload(BaseModel):
+    settings: Optional[WebsiteSettings]
+    banners: List[HomepageBanner]
+    hero_scenes: List[HeroScene]
+    hero_content: Optional[HeroContent]
+    contact_info: Optional[ContactInfo]
+    service_options: List[ServiceOption]
+    popular: PopularItems
+
+# Batch recommendations
+MAX_BATCH_ITEMS = 100
+
+class RecommendationBatchItem(BaseModel):
+    item_type: Literal["visa", "tour", "umrah"]
+    item_id: UUID
+
+class RecommendationBatchRequest(BaseModel):
+    items: List[RecommendationBatchItem] = Field(..., max_length=MAX_BATCH_ITEMS)
+    limit_per_type: int = Field(2, ge=1, le=RECOMMENDATION_TOP_N)
+    scoring: Literal["count", "jaccard", "tfidf-cosine"] = "count"
+    include_same_type: bool = False  # Also list similar items of the item's own type
+
+class RecommendedIds(BaseModel):
+    visas: List[UUID] = []
+    tours: List[UUID] = []
+    umrah: List[UUID] = []
+
+class RecommendedItems(BaseModel):
+    visas: Dict[UUID, VisaService] = {}
+    tours: Dict[UUID, TourPackage] = {}
+    umrah: Dict[UUID, UmrahPackage] = {}
+
+class RecommendationBatch(BaseModel):
+    results: Dict[UUID, RecommendedIds]  # Keyed by requested item id
+    items: RecommendedItems  # Every recommended item once, keyed by id
+    not_found: List[UUID] = []
+
+# Search schemas
+class SearchHit(BaseModel):
+    type: str  # "tour", "umrah", "visa" or "blog"
+    id: UUID
+    title: str
+    title_bn: Optional[str] = None
+    slug: Optional[str] = None  # Blog posts only
+    image: Optional[str] = None
+    rank: float
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    skip: int
+    limit: int
+    hits: List[SearchHit]
+
+class AutocompleteHit(BaseModel):
+    type: str  # "visa", "tour" or "umrah"
+    id: UUID
+    label: str
+    label_bn: Optional[str] = None
+    score: float
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # "visa", "tour", "umrah" (item names), "destination" or "tag"
+    item_type: Optional[str] = None  # Item names only
+    item_id: Optional[UUID] = None
+    count: int  # Items using the term
+
+# Keyset-paginated list (the /page endpoints)
+PageItem = TypeVar("PageItem")
+
+class Page(BaseModel, Generic[PageItem]):
+    items: List[PageItem]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page; null on the last one
@@ -0,0 +1,60 @@
+from typing import Any, Callable
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from app.localization import monolingual
+
+# JSON encoding.
+#
+# Stock FastAPI validates a route's result against its response_model, dumps
+# it to JSON-compatible Python and encodes that with the stdlib `json`
+# module; results without a response_model first go through
+# jsonable_encoder, a pure-Python walk of the whole payload. Here:
+#
+#   - responses are encoded with orjson (FastJSONResponse is the app's
+#     default response class), and
+#   - cached endpoints serialize through a TypeAdapter built once per route,
+#     which validates the rows and writes the JSON bytes in pydantic-core
+#     without the intermediate Python structures.
+#
+# Output is byte-identical to the stdlib encoder for everything the API
+# returns. benchmarks/bench_serialization.py compares both paths.
+
+def _default(value: Any) -> Any:
+    # Pydantic models, Decimal and anything else orjson has no native
+    # encoding for, the way pydantic serializes them
+    return to_jsonable_python(value)
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON for `content`"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+Serializer = Callable[..., bytes]
+
+def compile_serializer(response_model: Any = None, exclude_unset: bool = False) -> Serializer:
+    """serialize(result, single_language=False) -> JSON bytes for a response model
+
+    Without a response model, `result` is encoded as-is. With
+    `single_language`, the `_bn` twins are left out (see `app.localization`);
+    that adapter is built on first use.
+    """
+    if response_model is None:
+        return lambda result, single_language=False: dumps(result)
+    adapters = {False: TypeAdapter(response_model)}
+
+    def serialize(result: Any, single_language: bool = False) -> bytes:
+        if single_language not in adapters:
+            adapters[single_language] = TypeAdapter(monolingual(response_model))
+        adapter = adapters[single_language]
+        return adapter.dump_json(adapter.validate_python(result), exclude_unset=exclude_unset)
+
+    return serialize
@@ -0,0 +1,229 @@
+import asyncio
+import bisect
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app import cache_sync, repository
+from app.metrics import Gauge
+from app.tag_index import ITEM_MODELS, TABLE_ITEM_TYPES
+
+# In-memory search-as-you-type suggestions.
+#
+# Every available package name, visa country, tour destination and tag, in
+# English and Bengali, is a term. Terms live in one sorted array of
+# (key, kind, term) entries with a key for each word a term starts at, so
+# "arab" finds "Saudi Arabia". A prefix query is a bisect plus a scan of the
+# matching slice; /suggest never touches the database.
+#
+# The index is loaded at startup. Write handlers in this worker update it in
+# place; writes in other workers (seen through `cache_sync`) reload the
+# affected types in the background, so requests never wait on a query.
+#
+# Term kinds: "tour", "umrah" and "visa" are item names (tied to one item),
+# "destination" and "tag" are shared by any number of items.
+
+# item type -> columns its terms come from
+SUGGEST_COLUMNS = {
+    "visa": ("country_name", "country_name_bn", "tags"),
+    "tour": ("name", "name_bn", "destinations", "destinations_bn", "tags"),
+    "umrah": ("name", "name_bn", "tags")
+}
+
+# Matching entries considered per query before ranking
+MAX_SCAN = 200
+
+Term = Tuple[str, str]  # (kind, normalized text)
+ItemRef = Tuple[str, UUID]  # (item type, id)
+
+def normalize(text: str) -> str:
+    """Case- and width-folded text with single spaces"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+def _field(item, name: str):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+def item_terms(item_type: str, item) -> List[Tuple[str, str]]:
+    """(kind, display text) of every term an item contributes"""
+    terms = []
+    if item_type == "visa":
+        names = (_field(item, "country_name"), _field(item, "country_name_bn"))
+    else:
+        names = (_field(item, "name"), _field(item, "name_bn"))
+    terms.extend((item_type, name) for name in names if name)
+    if item_type == "tour":
+        for column in ("destinations", "destinations_bn"):
+            terms.extend(("destination", place) for place in (_field(item, column) or "").split(","))
+    terms.extend(("tag", tag) for tag in _field(item, "tags") or ())
+    return terms
+
+def _keys(text: str) -> List[str]:
+    """Suffixes of `text` starting at each word"""
+    words = text.split(" ")
+    return list(dict.fromkeys(" ".join(words[start:]) for start in range(len(words))))
+
+class SuggestIndex:
+    def __init__(self):
+        self._entries: List[Tuple[str, str, str]] = []  # sorted (key, kind, text)
+        self._refs: Dict[Term, Dict[ItemRef, None]] = {}
+        self._labels: Dict[Term, str] = {}
+        self._item_terms: Dict[ItemRef, List[Term]] = {}
+        # Bumped on every change so a load racing a write can tell
+        self._versions: Dict[str, int] = {item_type: 0 for item_type in ITEM_MODELS}
+        self._lock = threading.Lock()
+        self._load_lock = asyncio.Lock()
+        self._reloads: Set[asyncio.Task] = set()
+
+    def sizes(self) -> Dict[str, int]:
+        with self._lock:
+            kinds = [kind for kind, _ in self._labels]
+        return {kind: kinds.count(kind) for kind in set(kinds)}
+
+    def _add_term(self, term: Term, label: str, ref: ItemRef) -> None:
+        refs = self._refs.get(term)
+        if refs is None:
+            refs = self._refs[term] = {}
+            self._labels[term] = label
+            kind, text = term
+            for key in _keys(text):
+                bisect.insort(self._entries, (key, kind, text))
+        refs[ref] = None
+
+    def _remove_term(self, term: Term, ref: ItemRef) -> None:
+        refs = self._refs.get(term)
+        if refs is None:
+            return
+        refs.pop(ref, None)
+        if refs:
+            return
+        del self._refs[term]
+        del self._labels[term]
+        kind, text = term
+        for key in _keys(text):
+            entry = (key, kind, text)
+            position = bisect.bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+
+    def _remove(self, ref: ItemRef) -> None:
+        for term in self._item_terms.pop(ref, ()):
+            self._remove_term(term, ref)
+
+    def _add(self, item_type: str, item) -> None:
+        ref = (item_type, _field(item, "id"))
+        self._remove(ref)
+        terms = []
+        for kind, label in item_terms(item_type, item):
+            label = " ".join(label.split())
+            term = (kind, normalize(label))
+            if term[1] and term not in terms:
+                self._add_term(term, label, ref)
+                terms.append(term)
+        if terms:
+            self._item_terms[ref] = terms
+
+    async def load(self, item_types: Optional[Iterable[str]] = None) -> None:
+        """(Re)load the terms of `item_types` (None: all) from the database"""
+        item_types = list(ITEM_MODELS if item_types is None else item_types)
+        async with self._load_lock:
+            for item_type in item_types:
+                model = ITEM_MODELS[item_type]
+                # Retry if a write lands while the rows are in flight
+                while True:
+                    with self._lock:
+                        version = self._versions[item_type]
+                    rows = await repository.fetch_all(
+                        repository.select_rows(
+                            model, model.id, *(getattr(model, column) for column in SUGGEST_COLUMNS[item_type])
+                        ).where(model.is_available == True)
+                    )
+                    with self._lock:
+                        if self._versions[item_type] != version:
+                            continue
+                        for ref in [ref for ref in self._item_terms if ref[0] == item_type]:
+                            self._remove(ref)
+                        for row in rows:
+                            self._add(item_type, row)
+                        break
+
+    def suggest(self, q: str, limit: int) -> List[dict]:
+        """Up to `limit` terms with a word starting with `q`
+
+        Terms that start with `q` come first, then those used by more items.
+        """
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        with self._lock:
+            matches: Dict[Term, None] = {}
+            position = bisect.bisect_left(self._entries, (prefix,))
+            end = min(len(self._entries), position + MAX_SCAN)
+            while position < end:
+                key, kind, text = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                matches[(kind, text)] = None
+                position += 1
+            ranked = sorted(
+                matches,
+                key=lambda term: (not term[1].startswith(prefix), -len(self._refs[term]), term[1])
+            )[:limit]
+            suggestions = []
+            for term in ranked:
+                kind, _ = term
+                refs = self._refs[term]
+                item_type, item_id = next(iter(refs)) if kind in ITEM_MODELS else (None, None)
+                suggestions.append({
+                    "text": self._labels[term],
+                    "kind": kind,
+                    "item_type": item_type,
+                    "item_id": item_id,
+                    "count": len(refs)
+                })
+            return suggestions
+
+    def index_item(self, item_type: str, item) -> None:
+        """Reflect a created or updated item; call after committing"""
+        with self._lock:
+            self._versions[item_type] += 1
+            if item.is_available:
+                self._add(item_type, item)
+            else:
+                self._remove((item_type, item.id))
+
+    def remove_item(self, item_type: str, item_id: UUID) -> None:
+        """Reflect a deleted item; call after committing"""
+        with self._lock:
+            self._versions[item_type] += 1
+            self._remove((item_type, item_id))
+
+    def mark_stale(self, tables: Optional[Tuple[str, ...]]) -> None:
+        """Reload the types stored in `tables` (None: all) in the background"""
+        item_types = list(ITEM_MODELS) if tables is None else sorted({
+            TABLE_ITEM_TYPES[table] for table in tables if table in TABLE_ITEM_TYPES
+        })
+        if not item_types:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._reload(item_types))
+        except RuntimeError:
+            return
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    async def _reload(self, item_types: List[str]) -> None:
+        try:
+            await self.load(item_types)
+        except Exception as e:
+            print(f"Warning: Could not reload suggestions for {', '.join(item_types)}: {e}")
+
+suggest_index = SuggestIndex()
+cache_sync.on_remote_invalidation(suggest_index.mark_stale)
+
+Gauge(
+    "suggest_index_terms",
+    "Distinct terms held in the /suggest index",
+    suggest_index.sizes,
+    label="kind"
+)
@@ -0,0 +1,366 @@
+import asyncio
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app import cache_sync, repository
+from app.localization import select_localized
+from app.metrics import Gauge
+from app.models import VisaService, TourPackage, UmrahPackage
+
+# In-memory inverted tag index for recommendations.
+#
+# For each item type the index maps tag -> ids of the available items
+# carrying it (the posting list), plus id -> tags for the reverse lookup.
+# Scoring a query only touches the posting lists of its tags, and no rows are
+# loaded until the winners are known.
+#
+# Each type is loaded lazily from (id, tags, is_available) only. Write
+# handlers in this worker update it in place; writes in other workers (seen
+# through `cache_sync`) mark the type stale so it is reloaded on next use.
+#
+# Scoring modes:
+#   count         number of shared tags
+#   jaccard       shared / union, so items with many tags do not win by volume
+#   tfidf-cosine  cosine of binary tag vectors weighted by IDF, so rare tags
+#                 count for more than ubiquitous ones like "family"
+
+ITEM_MODELS = {
+    "visa": VisaService,
+    "tour": TourPackage,
+    "umrah": UmrahPackage
+}
+TABLE_ITEM_TYPES = {model.__tablename__: item_type for item_type, model in ITEM_MODELS.items()}
+
+SCORING_MODES = ("count", "jaccard", "tfidf-cosine")
+
+def smooth_idf(document_count: int, total: int) -> float:
+    return math.log((1 + total) / (1 + document_count)) + 1.0
+
+class IdfTable:
+    """Inverse document frequency of every tag across all item types"""
+
+    def __init__(self, document_counts: Dict[str, int], total: int):
+        self.weights = {tag: smooth_idf(count, total) for tag, count in document_counts.items()}
+        self.unseen = smooth_idf(0, total)
+
+    def weight(self, tag: str) -> float:
+        return self.weights.get(tag, self.unseen)
+
+class TagMatrix:
+    """Read-only NumPy view of one type's postings, rebuilt after changes
+
+    Items are rows 0..n-1 of a sparse binary item x tag matrix kept in both
+    CSR form (`indptr`, `columns`) and per-tag row arrays. Counting shared
+    tags is one `bincount` over the concatenated row arrays of the query's
+    tags: the matrix-vector product restricted to its non-zero columns.
+    Weighted scores are then computed for the surviving candidates only.
+    """
+
+    def __init__(self, item_tags: Dict[UUID, Tuple[str, ...]]):
+        self.ids = list(item_tags)
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        # Position of each row in id order: ties are broken by id, so the
+        # order rows were added in (or loaded from Postgres) never matters
+        self.id_ranks = np.empty(len(self.ids), dtype=np.int64)
+        # (UUID bytes sort like the UUIDs themselves, and like Postgres's uuid)
+        by_id = np.argsort(np.array([item_id.bytes for item_id in self.ids], dtype="S16"), kind="stable")
+        self.id_ranks[by_id] = np.arange(len(self.ids))
+
+        vocabulary: Dict[str, int] = {}
+        columns = [vocabulary.setdefault(tag, len(vocabulary)) for tags in item_tags.values() for tag in tags]
+        counts = np.fromiter((len(tags) for tags in item_tags.values()), dtype=np.int64, count=len(self.ids))
+
+        self.vocabulary = vocabulary
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        self.lengths = counts
+        self.tag_counts = counts.astype(np.float64)
+
+        item_rows = np.repeat(np.arange(len(self.ids)), counts)
+        order = np.argsort(self.columns, kind="stable")
+        bounds = np.searchsorted(self.columns[order], np.arange(len(vocabulary) + 1))
+        sorted_rows = item_rows[order]
+        self.postings = {
+            tag: sorted_rows[bounds[column]:bounds[column + 1]]
+            for tag, column in vocabulary.items()
+        }
+
+        self._norms: Optional[np.ndarray] = None
+        self._norms_idf: Optional[IdfTable] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def norms(self, idf: IdfTable) -> np.ndarray:
+        """L2 norm of every item's IDF-weighted tag vector (cached per IDF table)"""
+        if self._norms_idf is not idf:
+            column_weights = np.array([idf.weight(tag) for tag in self.vocabulary]) ** 2
+            if len(self.ids):
+                self._norms = np.sqrt(np.add.reduceat(column_weights[self.columns], self.indptr[:-1]))
+            else:
+                self._norms = np.zeros(0)
+            self._norms_idf = idf
+        return self._norms
+
+    def _dot(self, rows: np.ndarray, column_weights: np.ndarray) -> np.ndarray:
+        """Row-wise dot products with a dense tag-weight vector, for some rows"""
+        if not len(rows):
+            return np.zeros(0)
+        lengths = self.lengths[rows]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(self.indptr[rows] - offsets, lengths) + np.arange(lengths.sum())
+        return np.add.reduceat(column_weights[self.columns[positions]], offsets)
+
+    def top_k(
+        self,
+        tags: Iterable[str],
+        k: int,
+        mode: str = "count",
+        idf: Optional[IdfTable] = None,
+        exclude: Optional[UUID] = None
+    ) -> List[Tuple[UUID, float]]:
+        """Ids of the `k` best items sharing at least one tag, best first (ties by id)"""
+        query = list(dict.fromkeys(tags))
+        known = [tag for tag in query if tag in self.postings]
+        if not known or k <= 0:
+            return []
+
+        rows_all = np.concatenate([self.postings[tag] for tag in known])
+        shared = np.bincount(rows_all, minlength=len(self.ids))
+        excluded = self.rows.get(exclude)
+        if excluded is not None:
+            shared[excluded] = 0
+
+        # Only items at the highest shared-tag levels holding at least k items
+        # are scored first, so the work follows the answer rather than the
+        # number of items carrying a ubiquitous tag.
+        level_sizes = np.bincount(shared)
+        if len(level_sizes) < 2:
+            return []
+        at_or_above = np.cumsum(level_sizes[::-1])[::-1]
+        level = int(np.flatnonzero(at_or_above >= k)[-1]) if at_or_above[1] >= k else 1
+        level = max(level, 1)
+        candidates = np.flatnonzero(shared >= level)
+
+        if mode == "count":
+            score = lambda rows: shared[rows].astype(np.float64)
+            best_at_level = None
+        elif mode == "jaccard":
+            score = lambda rows: shared[rows] / (len(query) + self.tag_counts[rows] - shared[rows])
+            # |union| >= |query|
+            best_at_level = lambda level: level / len(query)
+        elif mode == "tfidf-cosine":
+            query_weights = np.zeros(len(self.vocabulary))
+            for tag in known:
+                query_weights[self.vocabulary[tag]] = idf.weight(tag) ** 2
+            query_norm = math.sqrt(sum(idf.weight(tag) ** 2 for tag in query))
+            norms = self.norms(idf)
+            dense_dot = []
+
+            def dot(rows: np.ndarray) -> np.ndarray:
+                # Past a fraction of the matrix one weighted pass over the
+                # query's postings is cheaper than gathering the rows.
+                if len(rows) * 8 < len(self.ids):
+                    return self._dot(rows, query_weights)
+                if not dense_dot:
+                    weights = np.repeat([query_weights[self.vocabulary[tag]] for tag in known],
+                                        [len(self.postings[tag]) for tag in known])
+                    dense_dot.append(np.bincount(rows_all, weights=weights, minlength=len(self.ids)))
+                return dense_dot[0][rows]
+
+            score = lambda rows: dot(rows) / (query_norm * norms[rows])
+            # At most the `level` heaviest query tags contribute to dot
+            heaviest = np.concatenate(([0.0], np.cumsum(np.sort(query_weights[query_weights > 0])[::-1])))
+            max_dot = heaviest[np.minimum(np.arange(len(level_sizes)), len(heaviest) - 1)]
+            # |item| >= sqrt(dot)
+            best_at_level = lambda level: math.sqrt(max_dot[level]) / query_norm
+        else:
+            raise ValueError(f"Unknown scoring mode: {mode}")
+
+        scores = score(candidates)
+        if best_at_level is not None and level > 1 and len(scores) >= k:
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            lowest = level
+            while lowest > 1 and best_at_level(lowest - 1) >= kth:
+                lowest -= 1
+            if lowest < level:
+                if mode == "tfidf-cosine":
+                    # Per item: cosine <= max_dot / (|query| * |item|)
+                    norm_limit = max_dot / (query_norm * kth)
+                    norm_limit[:lowest] = -1
+                    norm_limit[level:] = -1
+                    extra = np.flatnonzero(norms <= norm_limit[shared])
+                else:
+                    extra = np.flatnonzero((shared >= lowest) & (shared < level))
+                candidates = np.concatenate((candidates, extra))
+                scores = np.concatenate((scores, score(extra)))
+
+        if len(candidates) > k:
+            # Everything tied with the k-th best stays in, for the id tiebreak
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            tied_or_better = scores >= kth
+            candidates, scores = candidates[tied_or_better], scores[tied_or_better]
+        order = np.lexsort((self.id_ranks[candidates], -scores))[:k]
+        return [(self.ids[row], float(score)) for row, score in zip(candidates[order], scores[order])]
+
+class TagPostings:
+    """Posting lists for the available items of one type"""
+
+    def __init__(self):
+        self.postings: Dict[str, Set[UUID]] = {}
+        self.item_tags: Dict[UUID, Tuple[str, ...]] = {}
+        self._matrix: Optional[TagMatrix] = None
+
+    def add(self, item_id: UUID, tags: Iterable[str]) -> None:
+        self.remove(item_id)
+        tags = tuple(dict.fromkeys(tags or ()))
+        if not tags:
+            return
+        self.item_tags[item_id] = tags
+        for tag in tags:
+            self.postings.setdefault(tag, set()).add(item_id)
+        self._matrix = None
+
+    def remove(self, item_id: UUID) -> None:
+        for tag in self.item_tags.pop(item_id, ()):
+            posting = self.postings.get(tag)
+            if posting is not None:
+                posting.discard(item_id)
+                if not posting:
+                    del self.postings[tag]
+            self._matrix = None
+
+    def matrix(self) -> TagMatrix:
+        if self._matrix is None:
+            self._matrix = TagMatrix(self.item_tags)
+        return self._matrix
+
+class TagIndex:
+    def __init__(self):
+        self._types: Dict[str, TagPostings] = {}
+        self._stale: Set[str] = set(ITEM_MODELS)
+        # Bumped on every change so a load racing a write can tell
+        self._versions: Dict[str, int] = {item_type: 0 for item_type in ITEM_MODELS}
+        self._lock = threading.Lock()
+        self._load_locks = {item_type: asyncio.Lock() for item_type in ITEM_MODELS}
+        self._idf: Optional[IdfTable] = None
+
+    def sizes(self) -> Dict[str, int]:
+        return {item_type: len(postings.item_tags) for item_type, postings in self._types.items()}
+
+    async def _load(self, item_type: str) -> None:
+        model = ITEM_MODELS[item_type]
+        with self._lock:
+            version = self._versions[item_type]
+        rows = await repository.fetch_all(
+            repository.select_rows(model, model.id, model.tags).where(
+                model.is_available == True,
+                model.tags.isnot(None)
+            ).order_by(model.id)
+        )
+        postings = TagPostings()
+        for row in rows:
+            postings.add(row["id"], row["tags"])
+        with self._lock:
+            self._types[item_type] = postings
+            self._idf = None
+            # A write landed while loading; the next request reloads
+            if self._versions[item_type] == version:
+                self._stale.discard(item_type)
+
+    async def postings(self, item_type: str) -> TagPostings:
+        """Posting lists for a type, loading them first if needed"""
+        if item_type in self._stale or item_type not in self._types:
+            async with self._load_locks[item_type]:
+                if item_type in self._stale or item_type not in self._types:
+                    await self._load(item_type)
+        return self._types[item_type]
+
+    async def matrix(self, item_type: str) -> TagMatrix:
+        postings = await self.postings(item_type)
+        with self._lock:
+            return postings.matrix()
+
+    async def idf(self) -> IdfTable:
+        """IDF over the tags of every available item of every type"""
+        for item_type in ITEM_MODELS:
+            await self.postings(item_type)
+        with self._lock:
+            if self._idf is None:
+                document_counts: Dict[str, int] = {}
+                for postings in self._types.values():
+                    for tag, posting in postings.postings.items():
+                        document_counts[tag] = document_counts.get(tag, 0) + len(posting)
+                total = sum(len(postings.item_tags) for postings in self._types.values())
+                self._idf = IdfTable(document_counts, total)
+            return self._idf
+
+    def index_item(self, item_type: str, item) -> None:
+        """Reflect a created or updated item; call after committing"""
+        with self._lock:
+            self._versions[item_type] += 1
+            self._idf = None
+            postings = self._types.get(item_type)
+            if postings is None:
+                return
+            if item.is_available:
+                postings.add(item.id, item.tags)
+            else:
+                postings.remove(item.id)
+
+    def remove_item(self, item_type: str, item_id: UUID) -> None:
+        """Reflect a deleted item; call after committing"""
+        with self._lock:
+            self._versions[item_type] += 1
+            self._idf = None
+            postings = self._types.get(item_type)
+            if postings is not None:
+                postings.remove(item_id)
+
+    def mark_stale(self, tables: Optional[Tuple[str, ...]]) -> None:
+        """Schedule a reload for the types stored in `tables` (None: all)"""
+        item_types = set(ITEM_MODELS) if tables is None else {
+            TABLE_ITEM_TYPES[table] for table in tables if table in TABLE_ITEM_TYPES
+        }
+        with self._lock:
+            for item_type in item_types:
+                self._versions[item_type] += 1
+                self._stale.add(item_type)
+
+tag_index = TagIndex()
+cache_sync.on_remote_invalidation(tag_index.mark_stale)
+
+Gauge(
+    "tag_index_items",
+    "Available items held in the recommendation tag index",
+    tag_index.sizes,
+    label="item_type"
+)
+
+async def top_items(
+    item_type: str,
+    tags: Iterable[str],
+    limit: int,
+    exclude_id: Optional[UUID] = None,
+    scoring: str = "count",
+    lang: Optional[str] = None
+) -> List[dict]:
+    """Load the `limit` best available items of a type for `tags`, best first, in `lang`"""
+    matrix = await tag_index.matrix(item_type)
+    idf = await tag_index.idf() if scoring == "tfidf-cosine" else None
+    ranked = matrix.top_k(tags, limit, scoring, idf, exclude=exclude_id)
+    if not ranked:
+        return []
+    model = ITEM_MODELS[item_type]
+    rows = await repository.fetch_all(
+        select_localized(model, lang).where(
+            model.id.in_([item_id for item_id, _ in ranked]),
+            model.is_available == True
+        )
+    )
+    rows_by_id = {row["id"]: row for row in rows}
+    return [rows_by_id[item_id] for item_id, _ in ranked if item_id in rows_by_id]
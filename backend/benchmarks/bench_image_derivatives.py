@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Image Derivative Benchmark
+Requests /static/img/{filename}?w= for a full-size upload and reports, per
+width, the bytes sent against the original, the first (rendering) request's
+latency, and the latency and throughput of cache hits. Requests go through
+the app in-process; the derivative cache is a temporary directory.
+
+Usage (from the backend directory; no database needed):
+    python -m benchmarks.bench_image_derivatives --widths 320 640 1280 --requests 500
+"""
+
+import argparse
+import asyncio
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from app.derivatives import derivative_cache
+from app.image_pool import image_pool
+from app.main import app
+from app.routes.uploads import UPLOAD_DIR
+from benchmarks.bench_image_pipeline import synthetic_photo
+
+async def timed_get(client: httpx.AsyncClient, url: str):
+    started = time.perf_counter()
+    response = await client.get(url)
+    response.raise_for_status()
+    return response, time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--widths", type=int, nargs="+", default=[320, 640, 1280])
+    parser.add_argument("--requests", type=int, default=500, help="cache hits per width")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    source = UPLOAD_DIR / "bench-derivative.webp"
+    Image.open(io.BytesIO(synthetic_photo(4096, 2731))).save(source, "WEBP", quality=85)
+    original = source.stat().st_size
+    with tempfile.TemporaryDirectory() as directory:
+        derivative_cache.directory = Path(directory)
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Start the image pool outside the timings
+                await client.get(f"/static/img/{source.name}?w=16&q=40")
+
+                print(f"\nSource: 4096x2731 WebP, {original} bytes; {args.requests} hits per width, "
+                      f"{args.concurrency} concurrent\n")
+                print(f"{'width':>6} {'bytes':>8} {'of original':>12} {'first request':>14} {'hit p50':>9} {'hits/s':>8}")
+                for width in args.widths:
+                    url = f"/static/img/{source.name}?w={width}"
+                    response, first = await timed_get(client, url)
+                    semaphore = asyncio.Semaphore(args.concurrency)
+                    latencies = []
+
+                    async def hit():
+                        async with semaphore:
+                            latencies.append((await timed_get(client, url))[1])
+
+                    started = time.perf_counter()
+                    await asyncio.gather(*(hit() for _ in range(args.requests)))
+                    elapsed = time.perf_counter() - started
+                    latencies.sort()
+                    print(
+                        f"{width:>6} {len(response.content):>8} {len(response.content) / original * 100:>11.1f}% "
+                        f"{first * 1000:>12.0f}ms {latencies[len(latencies) // 2] * 1000:>7.1f}ms "
+                        f"{args.requests / elapsed:>8.0f}"
+                    )
+        finally:
+            source.unlink()
+            image_pool.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Image Pipeline Benchmark
+Times transcoding one upload to WebP the way the app used to (verify(),
+decode and convert at WEBP_QUALITY, then decode that WebP and encode it again
+at Pillow's default quality to drop metadata) against the single-pass
+transcode_upload() (one draft-scaled decode, one resize, one encode), in CPU
+seconds per image. Also reports the output size and its PSNR against a plain
+LANCZOS downscale of the source, to show the quality lost to re-encoding.
+Then times the app's full upload pipeline with srcset variants (--widths,
+and AVIF with --avif) and lists each rendition's bytes.
+
+Uploads are synthetic photos (smooth gradients with mild noise), saved as
+JPEG at each --sizes entry.
+
+Usage (from the backend directory; no database needed):
+    python -m benchmarks.bench_image_pipeline
+    python -m benchmarks.bench_image_pipeline --sizes 3000x2000 8192x5464 --rounds 3
+    python -m benchmarks.bench_image_pipeline --widths 320 640 1280 2560 --avif
+"""
+
+import argparse
+import io
+import math
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+from app.imaging import AVIF_SUPPORTED, MAX_DIMENSION, WEBP_LOSSLESS, WEBP_METHOD, WEBP_QUALITY, fitted_size, flatten, transcode_upload
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    horizontal = Image.linear_gradient("L").resize((width, height))
+    vertical = Image.linear_gradient("L").rotate(90).resize((width, height))
+    noise = Image.effect_noise((width, height), 24).filter(ImageFilter.GaussianBlur(2))
+    image = Image.merge("RGB", (horizontal, vertical, ImageChops.add(noise, horizontal, scale=2)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+def before(content: bytes) -> bytes:
+    """The three-decode, two-encode path this replaced"""
+    Image.open(io.BytesIO(content)).verify()
+    image = flatten(Image.open(io.BytesIO(content)))
+    size = fitted_size(image.size, MAX_DIMENSION)
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=WEBP_QUALITY, lossless=WEBP_LOSSLESS, method=WEBP_METHOD, optimize=True)
+    image = Image.open(io.BytesIO(buffer.getvalue()))
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", optimize=True)
+    return buffer.getvalue()
+
+def staged_transcode(content: bytes, widths=(), avif: bool = False):
+    """transcode_upload() of `content` staged to disk, as the routes do; (renditions, full-size WebP)"""
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "bench.jpg")
+        with open(source, "wb") as f:
+            f.write(content)
+        renditions = transcode_upload(source, "bench.jpg", os.path.join(directory, "bench"), widths, avif)
+        with open(os.path.join(directory, renditions[0].filename("bench")), "rb") as f:
+            return renditions, f.read()
+
+def after(content: bytes) -> bytes:
+    return staged_transcode(content)[1]
+
+def psnr(content: bytes, reference: Image.Image) -> float:
+    decoded = Image.open(io.BytesIO(content)).convert("RGB")
+    if decoded.size != reference.size:
+        decoded = decoded.resize(reference.size, Image.Resampling.LANCZOS)
+    mse = statistics.mean(value ** 2 for value in ImageStat.Stat(ImageChops.difference(decoded, reference)).rms)
+    return 10 * math.log10(255 ** 2 / mse) if mse else float("inf")
+
+def timed(transcode, content: bytes, rounds: int):
+    """(output, median CPU seconds)"""
+    timings = []
+    for _ in range(rounds):
+        started = time.process_time()
+        output = transcode(content)
+        timings.append(time.process_time() - started)
+    return output, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["3000x2000", "8192x5464"], help="WIDTHxHEIGHT")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--widths", type=int, nargs="*", default=[320, 640, 1280, 2560])
+    parser.add_argument("--avif", action="store_true", help="also time AVIF renditions")
+    args = parser.parse_args()
+    if args.avif and not AVIF_SUPPORTED:
+        raise SystemExit("Pillow has no AVIF encoder; pip install pillow-avif-plugin")
+
+    print(f"\nMedian CPU time of {args.rounds} rounds per image\n")
+    print(f"{'upload':<22} {'before':>8} {'after':>8} {'saved':>6} {'bytes before':>13} {'bytes after':>12} "
+          f"{'PSNR before':>12} {'PSNR after':>11}")
+    uploads = {}
+    for dimensions in args.sizes:
+        width, height = (int(part) for part in dimensions.split("x"))
+        content = uploads[dimensions] = synthetic_photo(width, height)
+        source = Image.open(io.BytesIO(content)).convert("RGB")
+        reference = source.resize(fitted_size(source.size, MAX_DIMENSION), Image.Resampling.LANCZOS)
+
+        old, old_seconds = timed(before, content, args.rounds)
+        new, new_seconds = timed(after, content, args.rounds)
+        print(
+            f"{dimensions + f' ({len(content) / 1024 / 1024:.1f}MB)':<22} {old_seconds:>7.2f}s {new_seconds:>7.2f}s "
+            f"{(1 - new_seconds / old_seconds) * 100:>5.0f}% {len(old):>13} {len(new):>12} "
+            f"{psnr(old, reference):>10.1f}dB {psnr(new, reference):>9.1f}dB"
+        )
+
+    if not args.widths and not args.avif:
+        return
+    print(f"\nWith renditions ({', '.join(map(str, args.widths)) or 'no'} variants{', AVIF' if args.avif else ''})\n")
+    for dimensions, content in uploads.items():
+        renditions, seconds = timed(
+            lambda content: staged_transcode(content, args.widths, args.avif)[0], content, args.rounds
+        )
+        sizes = ", ".join(
+            f"{rendition.width}w {rendition.format} {rendition.size}" for rendition in renditions
+        )
+        print(f"{dimensions:<12} {seconds:>6.2f}s CPU  {sizes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Image Upload Benchmark
+Transcodes batches of concurrent uploads the way the upload routes used to
+(convert_to_webp on the event loop) and the way they do now (the image
+process pool), and reports wall time per batch together with the worst
+stall of the event loop while the batch ran: how long any other request in
+the same worker would have waited.
+
+Uploads are synthetic photos (noise over a gradient, which compresses
+like a photo) saved as JPEG at --size pixels.
+
+Usage (from the backend directory; no database needed):
+    python -m benchmarks.bench_image_uploads --concurrency 1 4 10
+    python -m benchmarks.bench_image_uploads --size 4000x3000 --workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from app.image_pool import ImagePool
+from app.imaging import transcode_upload
+
+def synthetic_photo(width: int, height: int, seed: int) -> bytes:
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 64 + seed)
+    image = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+async def inline(uploads):
+    # The old routes: each upload transcoded on the event loop in turn
+    async def one(source, target):
+        return transcode_upload(source, os.path.basename(source), target)
+    return await asyncio.gather(*(one(source, target) for source, target in uploads))
+
+def pooled(pool: ImagePool):
+    async def run(uploads):
+        with pool.reserve(len(uploads)):
+            return await asyncio.gather(
+                *(pool.run(transcode_upload, source, os.path.basename(source), target) for source, target in uploads)
+            )
+    return run
+
+async def timed(transcode, uploads):
+    """(wall seconds, worst event loop stall in seconds)"""
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal stall
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - started - 0.005)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await transcode(uploads)
+    wall = time.perf_counter() - started
+    done.set()
+    await beat
+    return wall, stall
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--size", default="3000x2000", help="upload dimensions, WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    width, height = (int(part) for part in args.size.split("x"))
+    directory = tempfile.TemporaryDirectory()
+    uploads = []
+    for seed in range(max(args.concurrency)):
+        # (staged upload, where its renditions go)
+        source = os.path.join(directory.name, f"{seed}.jpg")
+        with open(source, "wb") as f:
+            f.write(synthetic_photo(width, height, seed))
+        uploads.append((source, os.path.join(directory.name, str(seed))))
+    pool = ImagePool(args.workers, max(args.concurrency))
+    try:
+        # Start the workers outside the timings
+        await pooled(pool)(uploads[:1])
+
+        print(f"\n{width}x{height} JPEG uploads of ~{os.path.getsize(uploads[0][0]) / 1024 / 1024:.1f}MB, "
+              f"{args.workers} pool workers\n")
+        print(f"{'uploads':>7} {'inline':>9} {'pool':>9} {'speedup':>8} {'inline stall':>13} {'pool stall':>11}")
+        for concurrency in args.concurrency:
+            batch = uploads[:concurrency]
+            inline_wall, inline_stall = await timed(inline, batch)
+            pool_wall, pool_stall = await timed(pooled(pool), batch)
+            print(
+                f"{concurrency:>7} {inline_wall:>8.2f}s {pool_wall:>8.2f}s {inline_wall / pool_wall:>7.1f}x "
+                f"{inline_stall * 1000:>11.0f}ms {pool_stall * 1000:>9.0f}ms"
+            )
+        print("\nstall: longest time the event loop could not run anything else.")
+    finally:
+        pool.shutdown()
+        directory.cleanup()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Public Read Path Benchmark
+Compares the blocking SessionLocal/psycopg2 path (run in the threadpool, as
+FastAPI does for sync endpoints) with the async repository path over the
+`databases`/asyncpg pool, reporting requests/sec and latency percentiles.
+
+Usage (from the backend directory, against a seeded database):
+    python -m benchmarks.bench_public_reads --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app import repository
+from app.config import SessionLocal, database
+from app.models import TourPackage
+from app.schemas import TourPackage as TourPackageSchema
+
+def sync_list_tour_packages(limit: int):
+    """The pre-repository implementation of GET /tour-packages/"""
+    db = SessionLocal()
+    try:
+        packages = db.query(TourPackage).filter(TourPackage.is_available == True).limit(limit).all()
+        return [TourPackageSchema.model_validate(package) for package in packages]
+    finally:
+        db.close()
+
+async def async_list_tour_packages(limit: int):
+    """The repository implementation of GET /tour-packages/"""
+    packages = await repository.fetch_all(
+        repository.select_rows(TourPackage).where(TourPackage.is_available == True).limit(limit)
+    )
+    return [TourPackageSchema.model_validate(package) for package in packages]
+
+async def run_sync_request(limit: int):
+    return await run_in_threadpool(sync_list_tour_packages, limit)
+
+async def run_load(label: str, request, total: int, concurrency: int, limit: int):
+    """Fire `total` requests with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await request(limit)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{label:<8} {total / elapsed:>10.1f} req/s   "
+        f"mean {statistics.mean(latencies) * 1000:>7.2f} ms   "
+        f"p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20, help="rows per request")
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        # Warm both pools so connection setup is not measured
+        await run_load("warmup", run_sync_request, 50, 10, args.limit)
+        await run_load("warmup", async_list_tour_packages, 50, 10, args.limit)
+
+        print(f"\n{args.requests} requests, concurrency {args.concurrency}, {args.limit} rows each")
+        await run_load("sync", run_sync_request, args.requests, args.concurrency, args.limit)
+        await run_load("async", async_list_tour_packages, args.requests, args.concurrency, args.limit)
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Recommendation Batch Benchmark
+Compares what a listing page costs with one GET /recommendations/.../mixed
+per card against a single POST /recommendations/batch for the same cards:
+wall-clock latency per page and response bytes. Requests go through the
+ASGI app in-process, so no network time is included.
+
+Usage (from the backend directory, against a seeded database):
+    python -m benchmarks.bench_recommendation_batch --batch-size 50 --rounds 50
+    python -m benchmarks.bench_recommendation_batch --warm-cache
+"""
+
+import argparse
+import asyncio
+import gzip
+import random
+import statistics
+import time
+
+import httpx
+
+from app import repository
+from app.cache import response_cache
+from app.config import database
+from app.main import app
+from app.tag_index import ITEM_MODELS
+
+API = "/api/v1/recommendations"
+
+async def per_card(client: httpx.AsyncClient, cards, limit: int):
+    """One /mixed request per card, all in flight at once like a browser"""
+    responses = await asyncio.gather(*(
+        client.get(f"{API}/{item_type}/{item_id}/mixed", params={"limit_per_type": limit})
+        for item_type, item_id in cards
+    ))
+    return [response.content for response in responses]
+
+async def batched(client: httpx.AsyncClient, cards, limit: int):
+    response = await client.post(f"{API}/batch", json={
+        "items": [{"item_type": item_type, "item_id": str(item_id)} for item_type, item_id in cards],
+        "limit_per_type": limit
+    })
+    return [response.content]
+
+def report(label: str, latencies, sizes, requests: int):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    raw = statistics.mean(size for size, _ in sizes)
+    compressed = statistics.mean(size for _, size in sizes)
+    print(
+        f"{label:<9} {requests:>3} req/page   "
+        f"mean {statistics.mean(latencies) * 1000:>7.2f} ms   p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   "
+        f"{raw / 1024:>7.1f} KiB ({compressed / 1024:.1f} KiB gzip)"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=50, help="cards per page")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--limit-per-type", type=int, default=2)
+    parser.add_argument("--warm-cache", action="store_true", help="keep the response cache between rounds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        catalogue = []
+        for item_type, model in ITEM_MODELS.items():
+            rows = await repository.fetch_all(repository.select_rows(model, model.id))
+            catalogue.extend((item_type, row["id"]) for row in rows)
+        if len(catalogue) < args.batch_size:
+            raise SystemExit(f"Need at least {args.batch_size} visas/tours/umrah packages, found {len(catalogue)}")
+
+        rng = random.Random(args.seed)
+        pages = [rng.sample(catalogue, args.batch_size) for _ in range(args.rounds)]
+
+        async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+            # Warm the tag index and both pools
+            await per_card(client, pages[0], args.limit_per_type)
+            await batched(client, pages[0], args.limit_per_type)
+
+            cache = "warm" if args.warm_cache else "cold"
+            print(f"\n{args.rounds} pages of {args.batch_size} cards, {args.limit_per_type} per type, {cache} response cache")
+            for label, run, requests in (
+                ("per-card", per_card, args.batch_size),
+                ("batch", batched, 1)
+            ):
+                latencies, sizes = [], []
+                for cards in pages:
+                    if not args.warm_cache:
+                        response_cache.clear()
+                    started = time.perf_counter()
+                    bodies = await run(client, cards, args.limit_per_type)
+                    latencies.append(time.perf_counter() - started)
+                    sizes.append((
+                        sum(len(body) for body in bodies),
+                        sum(len(gzip.compress(body)) for body in bodies)
+                    ))
+                report(label, latencies, sizes, requests)
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
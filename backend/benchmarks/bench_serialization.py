@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+Times turning each endpoint's result into JSON bytes, the way stock FastAPI
+does it (response_model validation, dump to Python, stdlib json; or
+jsonable_encoder without a response_model) against the app's path (a
+TypeAdapter compiled once per route writing JSON in pydantic-core; orjson
+without a response_model). Endpoints are called once for their result, so
+only serialization is timed; the two outputs are also checked to be
+byte-identical.
+
+Usage (from the backend directory, against a seeded database):
+    python -m benchmarks.bench_serialization --rounds 200
+    python -m benchmarks.bench_serialization --endpoint /tour-packages/
+"""
+
+import argparse
+import asyncio
+import inspect
+import statistics
+import time
+
+from fastapi import params
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+
+from app import repository
+from app.config import database
+from app.main import app
+from app.models import TourPackage, VisaService
+from app.schemas import RecommendationBatchRequest
+from app.serialization import FastJSONResponse, compile_serializer
+
+API = "/api/v1"
+
+def endpoints(tour_id, visa_id):
+    """(label, method, route path, endpoint arguments)"""
+    return [
+        ("GET /tour-packages/?limit=100", "GET", "/tour-packages/", {"limit": 100}),
+        ("GET /umrah-packages/?limit=100", "GET", "/umrah-packages/", {"limit": 100}),
+        ("GET /visa-services/?limit=100", "GET", "/visa-services/", {"limit": 100}),
+        ("GET /flights/?limit=100", "GET", "/flights/", {"limit": 100}),
+        ("GET /blog-posts/?limit=100", "GET", "/blog-posts/", {"limit": 100}),
+        ("GET /tour-packages/page?limit=50", "GET", "/tour-packages/page", {"limit": 50}),
+        ("GET /bootstrap", "GET", "/bootstrap", {}),
+        ("GET /search?q=tour", "GET", "/search", {"q": "tour", "limit": 100}),
+        ("GET /recommendations/popular", "GET", "/recommendations/popular", {"limit_per_type": 20}),
+        ("GET /recommendations/tour/{id}/mixed", "GET", "/recommendations/{item_type}/{item_id}/mixed",
+         {"item_type": "tour", "item_id": tour_id, "limit_per_type": 10}),
+        ("POST /recommendations/batch", "POST", "/recommendations/batch", {
+            "batch": RecommendationBatchRequest(items=[
+                {"item_type": "tour", "item_id": tour_id},
+                {"item_type": "visa", "item_id": visa_id}
+            ])
+        })
+    ]
+
+def find_route(method: str, path: str):
+    for route in app.routes:
+        if getattr(route, "path", None) == API + path and method in route.methods:
+            return route
+    raise SystemExit(f"No route {method} {path}")
+
+def call_arguments(endpoint, overrides):
+    """Explicit arguments for calling a route function outside FastAPI"""
+    arguments = {}
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        default = parameter.default
+        if isinstance(default, params.Depends):
+            default = None
+        elif isinstance(default, FieldInfo):
+            default = None if default.default is PydanticUndefined else default.default
+        arguments[name] = None if default is inspect.Parameter.empty else default
+    arguments.update(overrides)
+    return arguments
+
+def stock(route, response_class=JSONResponse):
+    """What FastAPI does with a route's return value"""
+    async def serialize(result):
+        content = await serialize_response(
+            field=route.response_field,
+            response_content=result,
+            exclude_unset=route.response_model_exclude_unset
+        )
+        return response_class(content).body
+    return serialize
+
+def compiled(route):
+    serialize = compile_serializer(route.response_model, route.response_model_exclude_unset)
+
+    async def run(result):
+        return serialize(result)
+    return run
+
+async def timed(serialize, result, rounds: int):
+    body = await serialize(result)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await serialize(result)
+        timings.append(time.perf_counter() - started)
+    return body, statistics.median(timings) * 1000
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--endpoint", help="only endpoints whose label contains this")
+    args = parser.parse_args()
+
+    await database.connect()
+    try:
+        tour = await repository.fetch_one(repository.select_rows(TourPackage, TourPackage.id).limit(1))
+        visa = await repository.fetch_one(repository.select_rows(VisaService, VisaService.id).limit(1))
+        if tour is None or visa is None:
+            raise SystemExit("Seed some tour packages and visa services first")
+        tour_id, visa_id = tour["id"], visa["id"]
+
+        print(f"\nMedian of {args.rounds} rounds per endpoint, serialization only\n")
+        print(f"{'endpoint':<40} {'bytes':>8} {'stock':>9} {'+orjson':>9} {'compiled':>9} {'speedup':>8}")
+        for label, method, path, overrides in endpoints(tour_id, visa_id):
+            if args.endpoint and args.endpoint not in label:
+                continue
+            route = find_route(method, path)
+            endpoint = getattr(route.endpoint, "__wrapped__", route.endpoint)
+            result = await endpoint(**call_arguments(endpoint, overrides))
+
+            before, stock_ms = await timed(stock(route), result, args.rounds)
+            orjson_body, orjson_ms = await timed(stock(route, FastJSONResponse), result, args.rounds)
+            cached = hasattr(route.endpoint, "__wrapped__")
+            after, after_ms = await timed(compiled(route), result, args.rounds) if cached else (orjson_body, orjson_ms)
+            identical = before == orjson_body == after
+            print(
+                f"{label:<40} {len(before):>8} {stock_ms:>7.3f}ms {orjson_ms:>7.3f}ms "
+                f"{after_ms:>7.3f}ms {stock_ms / after_ms:>7.1f}x" + ("" if identical else "  OUTPUT DIFFERS")
+            )
+        print("\nstock: FastAPI + stdlib json. +orjson: same with FastJSONResponse (uncached routes).")
+        print("compiled: the cached() serializer (cached routes); uncached routes repeat +orjson.")
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
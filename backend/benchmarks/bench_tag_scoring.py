@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tag Scoring Micro-benchmark
+Times TagMatrix.top_k (the recommendation scorer behind the tag index) for
+each scoring mode over a synthetic catalogue, with a Zipf-like tag
+distribution so a few tags are ubiquitous and most are rare. No database is
+needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_tag_scoring --items 100000 --queries 2000
+    python -m benchmarks.bench_tag_scoring --items 20000 --verify
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+import numpy as np
+
+from app.tag_index import SCORING_MODES, IdfTable, TagMatrix
+
+def synthetic_catalogue(items: int, vocabulary: int, seed: int):
+    rng = random.Random(seed)
+    tags = [f"tag-{n}" for n in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    catalogue = {}
+    for _ in range(items):
+        count = rng.randint(2, 8)
+        catalogue[uuid.UUID(int=rng.getrandbits(128))] = tuple(dict.fromkeys(rng.choices(tags, weights, k=count)))
+    return catalogue, tags, weights
+
+def brute_force(catalogue, query, mode, idf, k):
+    """Reference scorer: the per-row loop the index replaces"""
+    query = set(query)
+    query_norm = sum(idf.weight(tag) ** 2 for tag in query) ** 0.5
+    scored = []
+    for item_id, tags in catalogue.items():
+        shared = query & set(tags)
+        if not shared:
+            continue
+        if mode == "count":
+            score = len(shared)
+        elif mode == "jaccard":
+            score = len(shared) / len(query | set(tags))
+        else:
+            dot = sum(idf.weight(tag) ** 2 for tag in shared)
+            score = dot / (query_norm * sum(idf.weight(tag) ** 2 for tag in tags) ** 0.5)
+        scored.append(score)
+    return sorted(scored, reverse=True)[:k]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verify", action="store_true", help="compare scores with a brute-force loop")
+    args = parser.parse_args()
+
+    catalogue, tags, weights = synthetic_catalogue(args.items, args.vocabulary, args.seed)
+
+    started = time.perf_counter()
+    matrix = TagMatrix(catalogue)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    document_counts = {tag: len(rows) for tag, rows in matrix.postings.items()}
+    idf = IdfTable(document_counts, len(catalogue))
+    matrix.norms(idf)
+
+    rng = random.Random(args.seed + 1)
+    queries = [rng.choices(tags, weights, k=rng.randint(2, 5)) for _ in range(args.queries)]
+
+    print(f"{args.items} items, {len(matrix.vocabulary)} tags, top {args.top_k}; matrix built in {build_ms:.1f} ms\n")
+    for mode in SCORING_MODES:
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            matrix.top_k(query, args.top_k, mode, idf)
+            latencies.append(time.perf_counter() - started)
+        latencies = np.array(latencies) * 1000
+        print(
+            f"{mode:<13} mean {latencies.mean():.3f} ms   "
+            f"p50 {np.percentile(latencies, 50):.3f} ms   p99 {np.percentile(latencies, 99):.3f} ms"
+        )
+
+        if args.verify:
+            for query in queries[:20]:
+                fast = [score for _, score in matrix.top_k(query, args.top_k, mode, idf)]
+                expected = brute_force(catalogue, query, mode, idf, args.top_k)
+                assert np.allclose(fast, expected), (mode, query, fast, expected)
+            print(f"{'':<13} matches brute force on 20 queries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Upload Memory Benchmark
+Calls the multi-file upload route with N large JPEGs held the way Starlette
+hands them over (spooled temporary files already rolled over to disk) and
+reports the peak Python heap the app worker allocates while handling it,
+measured with tracemalloc. Transcoding itself runs in the image pool's
+processes and is not counted; what is counted is every copy of the upload
+the route makes.
+
+Usage (from the backend directory; no database needed):
+    python -m benchmarks.bench_upload_memory --files 10 --size 3500x2600
+"""
+
+import argparse
+import asyncio
+import io
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+from starlette.requests import Request
+
+from app.image_pool import image_pool
+from app.routes.uploads import UPLOAD_DIR, upload_multiple_images
+
+def noisy_jpeg(width: int, height: int, seed: int) -> bytes:
+    image = Image.merge("RGB", [Image.effect_noise((width, height), 60 + seed + band) for band in range(3)])
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+def spooled(content: bytes, name: str) -> UploadFile:
+    """An UploadFile as Starlette's multipart parser builds it"""
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(content)
+    file.seek(0)
+    return UploadFile(file, size=len(content), filename=name, headers=Headers({"content-type": "image/jpeg"}))
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--size", default="3500x2600", help="upload dimensions, WIDTHxHEIGHT")
+    args = parser.parse_args()
+
+    width, height = (int(part) for part in args.size.split("x"))
+    contents = [noisy_jpeg(width, height, seed) for seed in range(args.files)]
+    request = Request({"type": "http", "scheme": "http", "server": ("bench", 80), "path": "/", "headers": []})
+    try:
+        files = [spooled(content, f"{i}.jpg") for i, content in enumerate(contents)]
+        # Start the image pool outside the measurement
+        warmup = await upload_multiple_images(request, [spooled(contents[0], "warmup.jpg")], None)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = await upload_multiple_images(request, files, None)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        total = sum(len(content) for content in contents)
+        print(f"\n{args.files} uploads of {width}x{height} JPEG, {total / 1024 / 1024:.1f}MB in total")
+        print(f"peak Python heap in the app worker: {peak / 1024 / 1024:.1f}MB ({elapsed:.1f}s)")
+        for uploaded in warmup["uploaded_files"] + result["uploaded_files"]:
+            for variant in uploaded.get("variants", [uploaded]):
+                (UPLOAD_DIR / variant["url"].rsplit("/", 1)[1]).unlink(missing_ok=True)
+    finally:
+        image_pool.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Query Plan Test Script
+Seeds every table at scale inside a transaction, EXPLAINs the queries the
+routers build for their hot filters and sorts, and fails if any plan falls
+back to a sequential scan. The transaction is rolled back afterwards, so the
+database is left as it was.
+
+Usage (from the backend directory, against a migrated database):
+    python test_query_plans.py
+    python test_query_plans.py --rows 50000 --verbose
+"""
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import desc, select
+
+from app.config import engine
+from app.models import (
+    TourPackage, UmrahPackage, VisaService, FlightDeal, BlogPost, ContactSubmission,
+    HomepageBanner, HeroScene, HeroContent, ContactInfo, ServiceOption, Profile
+)
+from app.pagination import Keyset
+from app.routes import (
+    banners, blog_posts, contact_submissions, flights, tour_packages, umrah_packages, users, visa_services
+)
+
+# Share of seeded rows with each flag set. Most of the catalogue is
+# available and few items are featured, as on the live site; only one hero
+# content / contact info row is ever active.
+FLAG_RATES = {
+    "is_available": 0.85,
+    "is_featured": 0.05,
+    "is_published": 0.8,
+    "is_read": 0.9,
+    "is_active": 0.5
+}
+RARELY_ACTIVE = (HeroContent, ContactInfo)
+
+SEEDED_MODELS = (
+    Profile, HomepageBanner, TourPackage, UmrahPackage, FlightDeal, BlogPost,
+    ContactSubmission, VisaService, HeroScene, HeroContent, ContactInfo, ServiceOption
+)
+
+def seed_sql(model, rows: int) -> str:
+    """INSERT ... SELECT generate_series() filling every required column"""
+    columns, values = [], []
+    for column in model.__table__.columns:
+        if column.computed is not None:
+            continue
+        name = column.name
+        if name == "id":
+            value = "gen_random_uuid()"
+        elif name in ("created_at", "updated_at"):
+            value = "now() - n * interval '1 minute'"
+        elif name == "order":
+            value = "mod(n, 50)"
+        elif name in FLAG_RATES:
+            rate = 1 / rows if name == "is_active" and model in RARELY_ACTIVE else FLAG_RATES[name]
+            value = f"random() < {rate}"
+        elif name == "role":
+            value = "'moderator'"
+        elif not column.nullable:
+            value = f"'{name} ' || n"
+        else:
+            continue
+        columns.append(f'"{name}"')
+        values.append(value)
+    return (
+        f"INSERT INTO {model.__tablename__} ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM generate_series(1, {rows}) AS n"
+    )
+
+def middle_cursor(connection, keyset: Keyset, model, rows: int) -> str:
+    """A cursor halfway through the table in the keyset's order"""
+    order = [keyset.column.desc(), model.id.desc()] if keyset.descending else [keyset.column, model.id]
+    row = connection.execute(
+        select(keyset.column.label(keyset.column_name), model.id).order_by(*order).offset(rows // 2).limit(1)
+    ).mappings().one()
+    return keyset.encode(row)
+
+def checked_queries(connection, rows: int):
+    """(description, query, strict) for every filter/sort shape the routers run
+
+    Non-strict shapes have no ORDER BY: with a LIMIT, Postgres may rightly
+    prefer a sequential scan that stops at the first matches, so a seq scan
+    there is only reported.
+    """
+    queries = []
+    for label, module, model in (
+        ("tour packages", tour_packages, TourPackage),
+        ("umrah packages", umrah_packages, UmrahPackage),
+        ("flight deals", flights, FlightDeal)
+    ):
+        keyset = module.NEWEST_FIRST
+        cursor = middle_cursor(connection, keyset, model, rows)
+        queries += [
+            (f"{label}: available + featured", module._list_query(True, True).offset(0).limit(100), False),
+            (f"{label}: /page available", keyset.paginate(module._list_query(True, False), None, 20)),
+            (f"{label}: /page available, deep cursor", keyset.paginate(module._list_query(True, False), cursor, 20)),
+            (f"{label}: /page available + featured", keyset.paginate(module._list_query(True, True), None, 20)),
+            (f"{label}: /page all, deep cursor", keyset.paginate(module._list_query(False, False), cursor, 20))
+        ]
+
+    keyset = visa_services.NEWEST_FIRST
+    cursor = middle_cursor(connection, keyset, VisaService, rows)
+    queries += [
+        ("visa services: available + featured",
+         visa_services._list_query(True, True, None, None).offset(0).limit(100), False),
+        ("visa services: /page available",
+         keyset.paginate(visa_services._list_query(True, False, None, None), None, 20)),
+        ("visa services: /page available, deep cursor",
+         keyset.paginate(visa_services._list_query(True, False, None, None), cursor, 20))
+    ]
+
+    keyset = blog_posts.NEWEST_FIRST
+    cursor = middle_cursor(connection, keyset, BlogPost, rows)
+    queries += [
+        ("blog posts: published, newest first",
+         blog_posts._list_query(True).order_by(BlogPost.created_at.desc()).offset(0).limit(100)),
+        ("blog posts: /page published, deep cursor", keyset.paginate(blog_posts._list_query(True), cursor, 20))
+    ]
+
+    queries += [
+        ("contact submissions: unread, newest first",
+         select(ContactSubmission).where(ContactSubmission.is_read == False)
+         .order_by(ContactSubmission.created_at.desc()).offset(0).limit(100)),
+        ("contact submissions: /page all, deep cursor",
+         contact_submissions.NEWEST_FIRST.paginate(
+             select(ContactSubmission), middle_cursor(connection, contact_submissions.NEWEST_FIRST, ContactSubmission, rows), 20
+         )),
+        ("users: /page, deep cursor",
+         users.OLDEST_FIRST.paginate(select(Profile), middle_cursor(connection, users.OLDEST_FIRST, Profile, rows), 20)),
+        ("banners: active, display order",
+         banners._list_query(True).order_by(HomepageBanner.order).offset(0).limit(100)),
+        ("banners: /page active", banners.DISPLAY_ORDER.paginate(banners._list_query(True), None, 20))
+    ]
+
+    for label, model in (("hero scenes", HeroScene), ("service options", ServiceOption)):
+        queries.append((
+            f"{label}: active, display order",
+            select(model).where(model.is_active == True).order_by(model.order).offset(0).limit(100)
+        ))
+    for label, model in (("hero content", HeroContent), ("contact info", ContactInfo)):
+        queries += [
+            (f"{label}: active row", select(model).where(model.is_active == True).limit(1)),
+            (f"{label}: active, newest first",
+             select(model).where(model.is_active == True).order_by(desc(model.created_at)).offset(0).limit(10))
+        ]
+    return [query if len(query) == 3 else (*query, True) for query in queries]
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+def explain(connection, query) -> dict:
+    compiled = query.compile(dialect=engine.dialect)
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+
+def describe(plan: dict) -> str:
+    return " > ".join(
+        f"{node['Node Type']}" + (f" ({node['Index Name']})" if "Index Name" in node else "")
+        for node in plan_nodes(plan)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="rows seeded per table")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+
+    results = {"passed": 0, "failed": 0, "warnings": 0}
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            print(f"🌱 Seeding {args.rows} rows per table (rolled back afterwards)...")
+            connection.exec_driver_sql("SELECT setseed(0.42)")
+            for model in SEEDED_MODELS:
+                connection.exec_driver_sql(seed_sql(model, args.rows))
+            connection.exec_driver_sql("ANALYZE")
+
+            for description, query, strict in checked_queries(connection, args.rows):
+                plan = explain(connection, query)
+                seq_scans = [node["Relation Name"] for node in plan_nodes(plan) if node["Node Type"] == "Seq Scan"]
+                if seq_scans and not strict:
+                    results["warnings"] += 1
+                    print(f"⚠️  {description}: sequential scan on {', '.join(seq_scans)} (unordered, stops at LIMIT)")
+                    print(f"   {describe(plan)}")
+                elif seq_scans:
+                    results["failed"] += 1
+                    print(f"❌ {description}: sequential scan on {', '.join(seq_scans)}")
+                    print(f"   {describe(plan)}")
+                else:
+                    results["passed"] += 1
+                    print(f"✅ {description}")
+                    if args.verbose:
+                        print(f"   {describe(plan)}")
+        finally:
+            transaction.rollback()
+
+    print(f"\n📊 {results['passed']} passed, {results['failed']} failed, {results['warnings']} warnings")
+    sys.exit(1 if results["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -139,6 +139,20 @@ def setup_nginx():
         add_header Cache-Control "public, immutable";
     }
 
+    # Resized uploads: rendered by the backend, cached on disk
+    location /static/img/ {
+        proxy_pass http://127.0.0.1:8000;
+        proxy_set_header Host $host;
+        proxy_set_header X-Forwarded-Proto $scheme;
+    }
+
+    # Cached resized uploads, sent with sendfile when the backend answers
+    # with X-Accel-Redirect (set IMAGE_CACHE_ACCEL_PREFIX=/_image_cache)
+    location /_image_cache/ {
+        internal;
+        alias /path/to/your/backend/cache/images/;
+    }
+
     # Frontend (if serving both from same server)
     location / {
         root /path/to/your/frontend/dist;
@@ -1,3 +1,5 @@
+import type { CursorPage, ImageVariant } from './types';
+
 // Auto-detect API base URL for mobile compatibility
 const getAPIBaseURL = () => {
   // If environment variable is set, use it
@@ -385,9 +387,12 @@ export const authApi = {
 
 // Tour Packages API
 export const tourPackagesApi = {
-  list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean }) =>
+  list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean; fields?: string }) =>
     apiClient.get<any[]>('/tour-packages', params),
   
+  page: (params?: { cursor?: string; limit?: number; available_only?: boolean; featured_only?: boolean; fields?: string }) =>
+    apiClient.get<CursorPage<any>>('/tour-packages/page', params),
+  
   create: (data: any) =>
     apiClient.post<any>('/tour-packages', data),
   
@@ -406,9 +411,12 @@ export const tourPackagesApi = {
 
 // Umrah Packages API
 export const umrahPackagesApi = {
-  list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean }) =>
+  list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean; fields?: string }) =>
     apiClient.get<any[]>('/umrah-packages', params),
   
+  page: (params?: { cursor?: string; limit?: number; available_only?: boolean; featured_only?: boolean; fields?: string }) =>
+    apiClient.get<CursorPage<any>>('/umrah-packages/page', params),
+  
   create: (data: any) =>
     apiClient.post<any>('/umrah-packages', data),
   
@@ -430,6 +438,9 @@ export const flightDealsApi = {
   list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean }) =>
     apiClient.get<any[]>('/flights', params),
   
+  page: (params?: { cursor?: string; limit?: number; available_only?: boolean; featured_only?: boolean }) =>
+    apiClient.get<CursorPage<any>>('/flights/page', params),
+  
   create: (data: any) =>
     apiClient.post<any>('/flights', data),
   
@@ -448,6 +459,9 @@ export const blogPostsApi = {
   list: (params?: { skip?: number; limit?: number; published_only?: boolean }) =>
     apiClient.get<any[]>('/blog-posts', params),
   
+  page: (params?: { cursor?: string; limit?: number; published_only?: boolean }) =>
+    apiClient.get<CursorPage<any>>('/blog-posts/page', params),
+  
   create: (data: any) =>
     apiClient.post<any>('/blog-posts', data),
   
@@ -472,6 +486,9 @@ export const contactSubmissionsApi = {
   list: (params?: { skip?: number; limit?: number; unread_only?: boolean }) =>
     apiClient.get<any[]>('/contact-submissions', params),
   
+  page: (params?: { cursor?: string; limit?: number; unread_only?: boolean }) =>
+    apiClient.get<CursorPage<any>>('/contact-submissions/page', params),
+  
   get: (id: string) =>
     apiClient.get<any>(`/contact-submissions/${id}`),
   
@@ -518,6 +535,35 @@ export const settingsApi = {
     apiClient.put<any>('/settings', data),
 };
 
+// Homepage Bootstrap API (settings, banners, site content and popular items in one request)
+export const bootstrapApi = {
+  get: (params?: { popular_per_type?: number }) =>
+    apiClient.get<any>('/bootstrap', params),
+};
+
+// Search API (tours, umrah packages, visas and blog posts)
+export const searchApi = {
+  search: (params: { q: string; skip?: number; limit?: number }) =>
+    apiClient.get<any>('/search', params),
+  
+  autocomplete: (q: string, limit?: number) =>
+    apiClient.get<any[]>('/search/autocomplete', limit ? { q, limit } : { q }),
+  
+  suggest: (q: string, limit?: number) =>
+    apiClient.get<any[]>('/suggest', limit ? { q, limit } : { q }),
+};
+
+// Recommendations API (one batch request for every card on a listing page)
+export const recommendationsApi = {
+  batch: (data: {
+    items: { item_type: 'visa' | 'tour' | 'umrah'; item_id: string }[];
+    limit_per_type?: number;
+    scoring?: 'count' | 'jaccard' | 'tfidf-cosine';
+    include_same_type?: boolean;
+  }) =>
+    apiClient.post<any>('/recommendations/batch', data),
+};
+
 // Homepage Banners API
 export const bannersApi = {
   list: () =>
@@ -733,6 +779,9 @@ export const visaServicesApi = {
   list: (params?: { skip?: number; limit?: number; available_only?: boolean; featured_only?: boolean; country?: string; tags?: string[] }) =>
     apiClient.get<any[]>('/visa-services', params),
   
+  page: (params?: { cursor?: string; limit?: number; available_only?: boolean; featured_only?: boolean; country?: string; tags?: string[] }) =>
+    apiClient.get<CursorPage<any>>('/visa-services/page', params),
+  
   create: (data: any) =>
     apiClient.post<any>('/visa-services', data),
   
@@ -767,8 +816,12 @@ export const uploadsApi = {
       url: string;
       size: number;
       format: string;
+      width: number;
+      height: number;
       original_size: number;
       compression_ratio: number;
+      variants: ImageVariant[];
+      srcset: { webp: string; avif?: string };
     }>('/uploads/image', file),
   
   uploadImages: (files: File[]) =>
@@ -779,8 +832,12 @@ export const uploadsApi = {
         url: string;
         size: number;
         format: string;
+        width: number;
+        height: number;
         original_size: number;
         compression_ratio: number;
+        variants: ImageVariant[];
+        srcset: { webp: string; avif?: string };
       }>;
       total_files: number;
       message: string;
@@ -197,6 +197,21 @@ export interface ApiListResponse<T> {
   limit: number;
 }
 
+// Keyset-paginated list (the /page endpoints)
+export interface CursorPage<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+// One stored size/format of an uploaded image
+export interface ImageVariant {
+  url: string;
+  width: number;
+  height: number;
+  format: 'webp' | 'avif';
+  size: number;
+}
+
 export interface ApiError {
   detail: string;
   status_code: number;